@@ -0,0 +1,163 @@
+'''
+    Item analysis of a quiz: for every question the percentage of correct answers (difficulty), the point-biserial
+    correlation between answering it correctly and the score of the attempt (discrimination), and how often each
+    choice is picked. The answers of every attempt are loaded in one streamed pass into a NumPy matrix (attempts x
+    choices) and the statistics are computed on whole columns. The analysis is cached per version of the quiz (see
+    Quiz.response_cache), so it is recomputed after the next attempt or change of the quiz.
+
+    The analysis of a quiz whose heavy operations run in the background (see Quiz.jobs) isn't computed in the
+    request: an item_analysis job computes it and stores it with the version of the quiz it reflects, and the page
+    shows the last one computed while a job computes it again.
+
+    NumPy is optional: get_item_analysis returns None without it.
+'''
+from django.conf import settings
+from django.core.cache import cache
+
+from Quiz.models import Choice, Job, StudentAnswer
+from Quiz.response_cache import get_quiz_versions
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ANALYSIS_KEY = 'quiz-item-analysis:%d:%d'
+
+
+def load_answer_matrix(quiz, chunk_size=2000, progress=None):
+    '''
+        Returns (choices, scores, selected): the choices of the quiz as (question pk, question text, choice pk,
+        choice text, is_correct) tuples ordered by question, the score of every attempt and a boolean matrix of
+        the choices selected in every attempt (one row per attempt, one column per choice). ``progress`` is called
+        with the number of selected choices loaded so far, every chunk_size of them, and their total number.
+    '''
+    choices = list(
+        Choice.objects
+        .filter(question__quiz=quiz)
+        .order_by('question__text', 'question_id', 'pk')
+        .values_list('question_id', 'question__text', 'pk', 'text', 'is_correct')
+    )
+    columns = {choice[2]: column for column, choice in enumerate(choices)}
+    attempts = quiz.taken_quizzes.order_by('pk').values_list('student_id', 'score').iterator(chunk_size=chunk_size)
+    rows = {}
+    scores = []
+    for student_pk, score in attempts:
+        rows[student_pk] = len(scores)
+        scores.append(score)
+    selected = np.zeros((len(scores), len(choices)), dtype=bool)
+    selections = StudentAnswer.answer.through.objects.filter(studentanswer__quiz=quiz)
+    total = selections.count() if progress is not None else None
+    loaded = 0
+    for student_pk, choice_pk in selections \
+            .values_list('studentanswer__student_id', 'choice_id') \
+            .iterator(chunk_size=chunk_size):
+        # Answers of students who haven't completed the quiz yet are left out.
+        if student_pk in rows and choice_pk in columns:
+            selected[rows[student_pk], columns[choice_pk]] = True
+        loaded += 1
+        if progress is not None and loaded % chunk_size == 0:
+            progress(min(loaded, total), total)
+    if progress is not None:
+        progress(total, total)
+    return choices, np.array(scores, dtype=float), selected
+
+
+def analyse(choices, scores, selected):
+    '''
+        Computes the item analysis from load_answer_matrix. Returns a list of questions, as dicts with their text,
+        the number of attempts answering them, the percentage of correct answers, the discrimination (None when
+        undefined) and their choices with the number and percentage of attempts picking them.
+    '''
+    if not choices:
+        return []
+    question_ids = np.array([choice[0] for choice in choices])
+    is_correct = np.array([choice[4] for choice in choices], dtype=bool)
+    # The columns of a question are contiguous, reduceat combines them into a column per question.
+    first_columns = np.r_[True, question_ids[1:] != question_ids[:-1]]
+    starts = np.flatnonzero(first_columns)
+    question_of_column = np.cumsum(first_columns) - 1
+    answered = np.logical_or.reduceat(selected, starts, axis=1)
+    correct = answered & ~np.logical_or.reduceat(selected != is_correct, starts, axis=1)
+
+    answered_counts = answered.sum(axis=0)
+    correct_counts = correct.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percent_correct = correct_counts / answered_counts * 100
+        # Point-biserial correlation: Pearson's r between correctness (0/1) and score, over the attempts
+        # answering the question.
+        n = answered_counts
+        sum_x = correct_counts
+        sum_y = scores @ answered
+        sum_y2 = (scores ** 2) @ answered
+        sum_xy = scores @ correct
+        numerator = n * sum_xy - sum_x * sum_y
+        denominator = np.sqrt((n * sum_x - sum_x ** 2) * (n * sum_y2 - sum_y ** 2))
+        discrimination = numerator / denominator
+        picks = selected.sum(axis=0)
+        pick_percent = picks / answered_counts[question_of_column] * 100
+
+    questions = []
+    ends = list(starts[1:]) + [len(choices)]
+    for index, (start, end) in enumerate(zip(starts, ends)):
+        questions.append({
+            'text': choices[start][1],
+            'answered': int(answered_counts[index]),
+            'percent_correct': to_float(percent_correct[index]),
+            'discrimination': to_float(discrimination[index]),
+            'choices': [
+                {
+                    'text': choices[column][3],
+                    'is_correct': choices[column][4],
+                    'picks': int(picks[column]),
+                    'percent': to_float(pick_percent[column]),
+                }
+                for column in range(start, end)
+            ],
+        })
+    return questions
+
+
+def to_float(value):
+    return round(float(value), 2) if np.isfinite(value) else None
+
+
+def get_item_analysis(quiz):
+    '''
+        Returns the cached item analysis of the quiz, computed when missing. None when NumPy isn't installed.
+    '''
+    if np is None:
+        return None
+    key = ANALYSIS_KEY % (quiz.pk, get_quiz_versions([quiz.pk])[quiz.pk])
+    questions = cache.get(key)
+    if questions is None:
+        questions = analyse(*load_answer_matrix(quiz))
+        cache.set(key, questions, getattr(settings, 'QUIZ_CATALOG_TIMEOUT', None))
+    return questions
+
+
+def compute_item_analysis(quiz, chunk_size=2000, progress=None):
+    '''
+        Computes the item analysis of the quiz, without the cache. Returns it with the version of the quiz it reflects.
+        ``progress`` is passed to load_answer_matrix.
+    '''
+    # Read first: an attempt added while the matrix is loaded makes the analysis stale rather than missing.
+    version = get_quiz_versions([quiz.pk])[quiz.pk]
+    return {'version': version, 'questions': analyse(*load_answer_matrix(quiz, chunk_size, progress))}
+
+
+def get_last_item_analysis(quiz):
+    '''
+        Returns the item analysis of the quiz last computed by a job and whether it is up to date: (None, False) when
+        no job computed it yet, (None, True) when NumPy isn't installed.
+    '''
+    if np is None:
+        return None, True
+    job = Job.objects \
+        .filter(quiz=quiz, kind='item_analysis', status=Job.DONE) \
+        .order_by('-finished') \
+        .only('data') \
+        .first()
+    if job is None:
+        return None, False
+    return job.data['questions'], job.data['version'] == get_quiz_versions([quiz.pk])[quiz.pk]
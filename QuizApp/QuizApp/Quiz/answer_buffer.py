@@ -0,0 +1,189 @@
+'''
+    Write-behind buffer of the answers submitted in take_quiz, enabled with QUIZ_ANSWER_BUFFER. Answering a question
+    then only appends the answer to an in-process buffer: a background thread writes the buffered answers of every
+    student at once, with one transaction of bulk inserts every FLUSH_INTERVAL seconds (or as soon as BATCH_SIZE
+    answers are waiting), instead of a write transaction per answer contending for the database lock.
+
+    The progress of an attempt is kept in the session, so the next question is served without reading the answers.
+    The answers of a student are flushed before they are read, i.e. when an attempt starts or is scored. The buffer
+    lives in the process: all the requests of a student must be served by the same process, and the answers
+    buffered when the process is killed are lost (they are flushed on a normal exit).
+'''
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection, connections, transaction
+from django.dispatch import receiver
+
+from Quiz.models import Choice, StudentAnswer
+
+logger = logging.getLogger('Quiz.answers')
+
+DEFAULT_ANSWER_BUFFER = {
+    'ENABLED': False,
+    # Seconds between two flushes of the background thread. None: no thread, answers are flushed on demand.
+    'FLUSH_INTERVAL': 0.2,
+    'BATCH_SIZE': 500,
+}
+
+
+def write_answers(answers):
+    '''
+        Inserts the answers, {(student pk, question pk): (quiz pk, choice pks)}, in a single transaction. Questions
+        already answered by the student are skipped, the first answer stands, and so are the choices deleted since
+        they were picked. The answers are checked before the transaction, so that it starts with a write: on SQLite
+        in WAL mode, a transaction which reads first fails instead of waiting for the lock when another connection
+        writes in between. It must therefore not be called within a transaction.
+    '''
+    choice_ids = set(
+        Choice.objects
+        .filter(pk__in={pk for _, choice_pks in answers.values() for pk in choice_pks})
+        .values_list('pk', flat=True)
+    )
+    existing = set(
+        StudentAnswer.objects
+        .filter(student_id__in={student_pk for student_pk, _ in answers},
+                question_id__in={question_pk for _, question_pk in answers})
+        .values_list('student_id', 'question_id')
+    )
+    answers = [
+        (key, (quiz_pk, [pk for pk in choice_pks if pk in choice_ids]))
+        for key, (quiz_pk, choice_pks) in answers.items()
+        if key not in existing and any(pk in choice_ids for pk in choice_pks)
+    ]
+    if not answers:
+        return 0
+    with transaction.atomic():
+        student_answers = StudentAnswer.objects.bulk_create(
+            StudentAnswer(student_id=student_pk, quiz_id=quiz_pk, question_id=question_pk)
+            for (student_pk, question_pk), (quiz_pk, _) in answers
+        )
+        answer_ids = {(answer.student_id, answer.question_id): answer.pk for answer in student_answers}
+        if not connection.features.can_return_rows_from_bulk_insert:
+            # The primary keys of the inserted rows aren't returned, e.g. on MySQL.
+            answer_ids = {
+                (student_pk, question_pk): pk for pk, student_pk, question_pk in StudentAnswer.objects
+                .filter(student_id__in={key[0] for key, _ in answers}, question_id__in={key[1] for key, _ in answers})
+                .values_list('pk', 'student_id', 'question_id')
+            }
+        StudentAnswer.answer.through.objects.bulk_create(
+            StudentAnswer.answer.through(studentanswer_id=answer_ids[key], choice_id=choice_pk)
+            for key, (_, choice_pks) in answers
+            for choice_pk in choice_pks
+        )
+    return len(answers)
+
+
+class AnswerBuffer:
+    def __init__(self, flush_interval=DEFAULT_ANSWER_BUFFER['FLUSH_INTERVAL'],
+                 batch_size=DEFAULT_ANSWER_BUFFER['BATCH_SIZE']):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.pending = {}
+        # Guards pending; flush_lock serializes the flushes, so that a flush returns once every answer buffered
+        # before it is written, including the answers a concurrent flush took.
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.closed = False
+
+    def add(self, student_pk, quiz_pk, question_pk, choice_pks):
+        with self.lock:
+            # The first answer stands, as with the unique constraint of StudentAnswer.
+            self.pending.setdefault((student_pk, question_pk), (quiz_pk, list(choice_pks)))
+            full = len(self.pending) >= self.batch_size
+            start_thread = self.flush_interval is not None and not self.closed
+            if start_thread and (self.thread is None or not self.thread.is_alive()):
+                self.thread = threading.Thread(target=self.run, name='answer-buffer', daemon=True)
+                self.thread.start()
+        if full:
+            self.wakeup.set()
+
+    def flush(self, student_pk=None):
+        '''
+            Writes the buffered answers, or only those of the given student. Returns the number of answers written.
+        '''
+        with self.flush_lock:
+            with self.lock:
+                if student_pk is None:
+                    answers, self.pending = self.pending, {}
+                else:
+                    answers = {key: value for key, value in self.pending.items() if key[0] == student_pk}
+                    for key in answers:
+                        del self.pending[key]
+            if not answers:
+                return 0
+            try:
+                return write_answers(answers)
+            except Exception:
+                # Kept for the next flush.
+                with self.lock:
+                    for key, value in answers.items():
+                        self.pending.setdefault(key, value)
+                raise
+
+    def close(self):
+        '''
+            Stops the background thread and writes the buffered answers.
+        '''
+        self.closed = True
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.flush()
+
+    def run(self):
+        try:
+            while not self.closed:
+                self.wakeup.wait(self.flush_interval)
+                self.wakeup.clear()
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception('Writing the buffered answers failed, they are kept for the next flush.')
+        finally:
+            connections.close_all()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_answer_buffer():
+    '''
+        Returns the AnswerBuffer of the process, None if QUIZ_ANSWER_BUFFER isn't enabled.
+    '''
+    global _buffer
+    options = {**DEFAULT_ANSWER_BUFFER, **getattr(settings, 'QUIZ_ANSWER_BUFFER', {})}
+    if not options['ENABLED']:
+        return None
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = AnswerBuffer(options['FLUSH_INTERVAL'], options['BATCH_SIZE'])
+            atexit.register(_buffer.close)
+    return _buffer
+
+
+def flush_answers(student_pk):
+    '''
+        Writes the buffered answers of the student, if any, before they are read. Called out of any transaction
+        (see write_answers).
+    '''
+    answer_buffer = get_answer_buffer()
+    if answer_buffer is not None:
+        answer_buffer.flush(student_pk)
+
+
+@receiver(setting_changed)
+def reset_answer_buffer(setting, **kwargs):
+    global _buffer
+    if setting == 'QUIZ_ANSWER_BUFFER':
+        with _buffer_lock:
+            if _buffer is not None:
+                _buffer.close()
+                atexit.unregister(_buffer.close)
+            _buffer = None
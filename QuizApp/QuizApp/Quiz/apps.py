@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class QuizConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Quiz'
+
+    def ready(self):
+        # Connects the signal receivers.
+        from Quiz import db, signals  # noqa: F401
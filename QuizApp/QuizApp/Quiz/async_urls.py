@@ -0,0 +1,12 @@
+'''
+    URLconf of the project serving the asynchronous student views whatever QUIZ_ASYNC_VIEWS, for the tests and the
+    asgi benchmark (ROOT_URLCONF='Quiz.async_urls').
+'''
+from django.urls import include, path
+
+from Quiz.urls import student_urlpatterns
+from QuizApp.urls import urlpatterns as project_urlpatterns
+
+urlpatterns = [
+    path('students/', include((student_urlpatterns(asynchronous=True), 'classroom'), namespace='students')),
+] + project_urlpatterns
@@ -0,0 +1,82 @@
+'''
+    Asynchronous versions of the student quiz-taking views, served instead of the synchronous ones when
+    QUIZ_ASYNC_VIEWS is enabled (see Quiz.urls). Under an ASGI server, a request waiting on the database doesn't hold
+    a thread: reads use the async ORM, while form validation, writes and the rendering of forms (which query the
+    choices) and of the lists (which query the versions of their quizzes, see Quiz.templatetags.quiz_tags) run in
+    a thread through sync_to_async.
+'''
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import Http404
+from django.shortcuts import redirect, render
+
+from Quiz import views
+from Quiz.answer_buffer import flush_answers
+from Quiz.attempts import QuizAttempt
+from Quiz.catalog import available_quizzes
+from Quiz.leaderboard import rank_taken_quizzes
+from Quiz.models import Question, Quiz, Student
+from Quiz.utils import async_student_required
+
+
+async def get_student(request):
+    '''
+        Loads the student of the request with its interests, listed by the header of the student pages.
+    '''
+    student = await Student.objects.prefetch_related('interests').aget(pk=request.user.pk)
+    request.user.student = student
+    return student
+
+
+@async_student_required
+async def quiz_list(request):
+    student = await get_student(request)
+    student_interests = [subject.pk for subject in student.interests.all()]
+    taken_quizzes = {pk async for pk in student.quizzes.values_list('pk', flat=True)}
+    quizzes = await sync_to_async(available_quizzes)(student_interests, taken_quizzes)
+    return await sync_to_async(render)(request, 'students/quiz_list.html', {'quizzes': quizzes})
+
+
+@async_student_required
+async def taken_quiz_list(request):
+    student = await get_student(request)
+    queryset = student.taken_quizzes \
+        .select_related('quiz', 'quiz__subject', 'quiz__stats') \
+        .order_by('quiz__name')
+    taken_quizzes = await sync_to_async(rank_taken_quizzes)([row async for row in queryset])
+    return await sync_to_async(render)(request, 'students/taken_quiz_list.html', {'taken_quizzes': taken_quizzes})
+
+
+@async_student_required
+async def take_quiz(request, pk):
+    '''
+        See Quiz.views.take_quiz.
+    '''
+    try:
+        quiz = await Quiz.objects.aget(pk=pk, deleting=False)
+    except Quiz.DoesNotExist:
+        raise Http404('No quiz matches the given query.')
+    # Loaded with the user (see Quiz.backends).
+    student = request.user.student
+    if quiz.exam_mode:
+        return await sync_to_async(views._take_exam)(request, student, quiz)
+    attempt = QuizAttempt.from_session(request.session, quiz.pk)
+    if attempt is None:
+        if await student.quizzes.filter(pk=pk).aexists():
+            return views._already_taken(request, quiz)
+        await sync_to_async(flush_answers)(student.pk)
+        attempt = await QuizAttempt.astart(student, quiz)
+        if not attempt.question_ids:
+            return views._quiz_without_questions(request, quiz)
+        attempt.save(request.session)
+
+    if attempt.finished:
+        await sync_to_async(flush_answers)(student.pk)
+        return await sync_to_async(transaction.atomic(views._complete_quiz))(request, student, quiz, attempt)
+
+    question = await Question.objects.filter(pk=attempt.question_id, quiz=quiz).afirst()
+    if not question:
+        # The question was deleted since the attempt started.
+        (await QuizAttempt.astart(student, quiz)).save(request.session)
+        return redirect('students:take_quiz', pk)
+    return await sync_to_async(views._answer_question)(request, student, quiz, attempt, question)
@@ -0,0 +1,79 @@
+'''
+    State of the quizzes being taken by a student, kept in the session so that every step of take_quiz knows the
+    next question and the progress without counting the answered questions again. The attempt also fixes the
+    questions asked when they are sampled from the quiz.
+'''
+from Quiz.sampling import aget_question_ids, get_question_ids, sample_questions
+
+
+class QuizAttempt:
+    '''
+        Ordered pks of the questions of a quiz and a cursor on the next question to answer. Questions answered
+        before the attempt was (re)built come first, so the cursor also is the number of answered questions.
+    '''
+    SESSION_KEY = 'quiz_attempts'
+
+    def __init__(self, quiz_pk, question_ids, cursor=0):
+        self.quiz_pk = quiz_pk
+        self.question_ids = question_ids
+        self.cursor = cursor
+
+    @classmethod
+    def start(cls, student, quiz):
+        '''
+            Every question of the quiz, by text, or a random sample of them when the quiz has a sample_size (see
+            Quiz.sampling).
+        '''
+        answered_ids = student.quiz_answers.filter(quiz=quiz).values_list('question_id', flat=True)
+        answered_ids = list(answered_ids)
+        if quiz.sample_size:
+            question_ids = sample_questions(get_question_ids(quiz.pk), quiz.sample_size, answered_ids)
+        else:
+            question_ids = student.get_unanswered_questions(quiz).values_list('pk', flat=True)
+        return cls(quiz.pk, answered_ids + list(question_ids), len(answered_ids))
+
+    @classmethod
+    async def astart(cls, student, quiz):
+        answered_ids = student.quiz_answers.filter(quiz=quiz).values_list('question_id', flat=True)
+        answered_ids = [pk async for pk in answered_ids]
+        if quiz.sample_size:
+            question_ids = sample_questions(await aget_question_ids(quiz.pk), quiz.sample_size, answered_ids)
+        else:
+            question_ids = [pk async for pk in student.get_unanswered_questions(quiz).values_list('pk', flat=True)]
+        return cls(quiz.pk, answered_ids + question_ids, len(answered_ids))
+
+    @classmethod
+    def from_session(cls, session, quiz_pk):
+        state = session.get(cls.SESSION_KEY, {}).get(str(quiz_pk))
+        if state is None:
+            return None
+        return cls(quiz_pk, state['question_ids'], state['cursor'])
+
+    def save(self, session):
+        attempts = session.setdefault(self.SESSION_KEY, {})
+        attempts[str(self.quiz_pk)] = {'question_ids': self.question_ids, 'cursor': self.cursor}
+        session.modified = True
+
+    def discard(self, session):
+        session.get(self.SESSION_KEY, {}).pop(str(self.quiz_pk), None)
+        session.modified = True
+
+    @property
+    def total_questions(self):
+        return len(self.question_ids)
+
+    @property
+    def finished(self):
+        return self.cursor >= self.total_questions
+
+    @property
+    def question_id(self):
+        return None if self.finished else self.question_ids[self.cursor]
+
+    @property
+    def progress(self):
+        total_unanswered_questions = self.total_questions - self.cursor
+        return 100 - round(((total_unanswered_questions - 1) / self.total_questions) * 100)
+
+    def advance(self):
+        self.cursor += 1
@@ -0,0 +1,20 @@
+'''
+    Authentication backend of the app.
+'''
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+UserModel = get_user_model()
+
+
+class QuizBackend(ModelBackend):
+    '''
+        ModelBackend loading the user of a request together with its student profile, in a single joined query, so
+        that request.user.student doesn't cost another query in the student views.
+    '''
+    def get_user(self, user_id):
+        try:
+            user = UserModel._default_manager.select_related('student').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
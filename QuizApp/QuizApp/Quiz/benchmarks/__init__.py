@@ -0,0 +1,107 @@
+'''
+    Benchmarks for the Quiz app. Every benchmark is a module of this package exposing ``SIZES`` and
+    ``run(sizes, repeat)``, which returns the table headers and rows to report. They are run with
+    ``python manage.py benchmark <name>`` against a throwaway test database.
+
+    A benchmark can also be checked against a stored baseline (baselines/<name>.json) by exposing
+    ``baseline(rows)``, which returns the JSON-serializable baseline of a run, and ``regressions(rows, baseline)``,
+    which returns the descriptions of the regressions of a run: they fail it. Measures depending on the host, such as
+    latencies, are rather reported by ``slowdowns(rows, baseline, tolerance)``, without failing the run.
+'''
+import json
+import logging
+import math
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+BENCHMARKS = {
+    'answers': 'Quiz.benchmarks.answers',
+    'asgi': 'Quiz.benchmarks.asgi',
+    'exports': 'Quiz.benchmarks.exports',
+    'scoring': 'Quiz.benchmarks.scoring',
+    'submissions': 'Quiz.benchmarks.submissions',
+    'views': 'Quiz.benchmarks.views',
+}
+
+BASELINES_DIR = os.path.join(os.path.dirname(__file__), 'baselines')
+
+
+@contextmanager
+def benchmark_database():
+    '''
+        Runs the benchmark against a test database and the cache of the tests (QUIZ_TEST_CACHES). SQLite test
+        databases are stored in a temporary file rather than in memory, so that the connection settings and concurrent
+        connections behave as in production.
+    '''
+    with tempfile.TemporaryDirectory() as directory, override_settings(CACHES=settings.QUIZ_TEST_CACHES):
+        if connection.vendor == 'sqlite':
+            connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+
+@contextmanager
+def quiet_query_log():
+    '''
+        Silences the log of the slow queries (Quiz.queries) within the block, e.g. under the contention a benchmark
+        creates on purpose. It is restored even when the benchmark fails.
+    '''
+    logger = logging.getLogger('Quiz.queries')
+    disabled, logger.disabled = logger.disabled, True
+    try:
+        yield
+    finally:
+        logger.disabled = disabled
+
+
+def measure(function, repeat=5):
+    '''
+        Calls ``function`` ``repeat`` times. Returns the number of queries of one call and the median latency in ms.
+    '''
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            function()
+            timings.append((time.perf_counter() - start) * 1000)
+    return len(context.captured_queries), round(statistics.median(timings), 2)
+
+
+def percentile(timings, percent):
+    '''
+        Nearest-rank percentile of a non-empty list of timings.
+    '''
+    timings = sorted(timings)
+    return timings[max(math.ceil(percent / 100 * len(timings)) - 1, 0)]
+
+
+def baseline_path(name):
+    return os.path.join(BASELINES_DIR, '%s.json' % name)
+
+
+def load_baseline(name):
+    try:
+        with open(baseline_path(name)) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(name, baseline):
+    os.makedirs(BASELINES_DIR, exist_ok=True)
+    with open(baseline_path(name), 'w') as file:
+        json.dump(baseline, file, indent=2, sort_keys=True)
+        file.write('\n')
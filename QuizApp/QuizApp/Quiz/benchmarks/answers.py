@@ -0,0 +1,83 @@
+'''
+    Answer writes per second of concurrent take_quiz submissions: every thread is a student answering a quiz one
+    question at a time through the test client, with the answers written by the request (direct) or buffered and
+    written in batches by the background thread of Quiz.answer_buffer (buffered). The time runs until every answer
+    is in the database. The sizes are the numbers of threads.
+'''
+import statistics
+import threading
+import time
+
+from django.db import connections
+from django.test import override_settings
+from django.urls import reverse
+
+from Quiz.answer_buffer import get_answer_buffer
+from Quiz.benchmarks import quiet_query_log
+from Quiz.benchmarks.data import create_quiz
+from Quiz.benchmarks.submissions import prepare_clients, submit_answers
+from Quiz.models import StudentAnswer
+
+SIZES = (1, 4, 16)
+
+QUESTIONS = 20
+
+MODES = (
+    ('direct', {'ENABLED': False}),
+    ('buffered', {'ENABLED': True, 'FLUSH_INTERVAL': 0.2, 'BATCH_SIZE': 500}),
+)
+
+
+def measure_writes(threads):
+    '''
+        Returns the answers written per second, the latencies (ms) of the successful submissions and the number of
+        failed ones.
+    '''
+    quiz = create_quiz(questions=QUESTIONS)
+    url = reverse('students:take_quiz', args=(quiz.pk, ))
+    clients, submissions = prepare_clients(quiz, threads)
+    # The first request starts the attempt, it isn't timed.
+    for client in clients:
+        client.get(url)
+    connections.close_all()
+    barrier = threading.Barrier(threads + 1)
+    latencies, errors = [], []
+    workers = [
+        threading.Thread(target=submit_answers, args=(client, url, submissions, barrier, latencies, errors))
+        for client in clients
+    ]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    answer_buffer = get_answer_buffer()
+    if answer_buffer is not None:
+        answer_buffer.flush()
+    seconds = time.perf_counter() - start
+    written = StudentAnswer.objects.filter(quiz=quiz).count()
+    # A failed submission may still have written its answer, e.g. when saving the session failed.
+    if written + len(errors) < threads * QUESTIONS:
+        raise RuntimeError('%d answers written out of %d.' % (written, threads * QUESTIONS - len(errors)))
+    return written / seconds, latencies, len(errors)
+
+
+def run(sizes=SIZES, repeat=5):
+    rows = []
+    # Slow queries are expected under contention, they aren't logged.
+    with quiet_query_log():
+        for name, options in MODES:
+            with override_settings(QUIZ_ANSWER_BUFFER=options):
+                for threads in sizes:
+                    throughputs, latencies, errors = [], [], 0
+                    for _ in range(repeat):
+                        throughput, run_latencies, run_errors = measure_writes(threads)
+                        throughputs.append(throughput)
+                        latencies += run_latencies
+                        errors += run_errors
+                    rows.append((
+                        name, threads, round(statistics.median(throughputs), 1),
+                        round(statistics.median(latencies), 2) if latencies else '-', errors,
+                    ))
+    return ('answers', 'threads', 'writes/s', 'median ms', 'errors'), rows
@@ -0,0 +1,116 @@
+'''
+    Throughput of concurrent quiz sessions (quiz list, quiz page, then every question answered): the synchronous
+    views on the WSGI handler, served by a pool of WORKERS threads, against the asynchronous views (Quiz.async_views)
+    on the ASGI handler, every session running concurrently on a single event loop. The sizes are the numbers of
+    concurrent sessions.
+'''
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from Quiz.benchmarks import quiet_query_log
+from Quiz.benchmarks.data import create_quiz, create_student
+from Quiz.models import Choice, Subject
+from Quiz.stats import rebuild_quiz_stats
+
+SIZES = (10, 100)
+
+REPEAT = 3
+
+WORKERS = 4
+
+QUESTIONS = 5
+
+FORM_CONTENT_TYPE = 'application/x-www-form-urlencoded'
+
+
+def prepare(client_class, sessions):
+    '''
+        Returns the quiz, a logged in client per session, the URL of the quiz and the answers to submit, in question
+        order.
+    '''
+    subject = Subject.objects.create(name='asgi-benchmark')
+    quiz = create_quiz(questions=QUESTIONS, subject=subject)
+    rebuild_quiz_stats(quiz.pk)
+    choices = Choice.objects.filter(question__quiz=quiz, is_correct=True).order_by('question__text')
+    answers = [urlencode({'question': choice.question_id, 'answer': choice.pk}) for choice in choices]
+    clients = []
+    for _ in range(sessions):
+        client = client_class()
+        client.force_login(create_student(subject).user)
+        clients.append(client)
+    return quiz, clients, reverse('students:take_quiz', args=(quiz.pk, )), answers
+
+
+def check_completed(quiz, sessions):
+    completed = quiz.taken_quizzes.count()
+    if completed != sessions:
+        raise RuntimeError('%d sessions out of %d completed the quiz.' % (completed, sessions))
+
+
+def sync_session(client, url, answers):
+    start = time.perf_counter()
+    try:
+        client.get(reverse('students:quiz_list'))
+        client.get(url)
+        for data in answers:
+            client.post(url, data, content_type=FORM_CONTENT_TYPE)
+    finally:
+        connections.close_all()
+    return time.perf_counter() - start
+
+
+async def async_session(client, url, answers):
+    start = time.perf_counter()
+    await client.get(reverse('students:quiz_list'))
+    await client.get(url)
+    for data in answers:
+        await client.post(url, data, content_type=FORM_CONTENT_TYPE)
+    return time.perf_counter() - start
+
+
+def run_sync(sessions):
+    quiz, clients, url, answers = prepare(Client, sessions)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        durations = list(executor.map(lambda client: sync_session(client, url, answers), clients))
+    seconds = time.perf_counter() - start
+    check_completed(quiz, sessions)
+    return seconds, durations
+
+
+def run_async(sessions):
+    quiz, clients, url, answers = prepare(AsyncClient, sessions)
+
+    async def run_sessions():
+        try:
+            return await asyncio.gather(*(async_session(client, url, answers) for client in clients))
+        finally:
+            await sync_to_async(connections.close_all)()
+
+    with override_settings(ROOT_URLCONF='Quiz.async_urls'):
+        start = time.perf_counter()
+        durations = asyncio.run(run_sessions())
+    seconds = time.perf_counter() - start
+    check_completed(quiz, sessions)
+    return seconds, durations
+
+
+def run(sizes=SIZES, repeat=REPEAT):
+    rows = []
+    with quiet_query_log():
+        for sessions in sizes:
+            requests = sessions * (QUESTIONS + 2)
+            for name, function in (('wsgi sync', run_sync), ('asgi async', run_async)):
+                results = [function(sessions) for _ in range(repeat)]
+                seconds = statistics.median(seconds for seconds, _ in results)
+                session_ms = statistics.median(duration for _, durations in results for duration in durations) * 1000
+                rows.append((name, sessions, requests, round(requests / seconds, 1), round(session_ms, 2)))
+    return ('handler', 'sessions', 'requests', 'requests/s', 'median session ms'), rows
@@ -0,0 +1,170 @@
+'''
+    Builders of benchmark data. Rows are inserted with bulk_create so that large volumes stay cheap to generate.
+'''
+import itertools
+import uuid
+
+from django.contrib.auth.hashers import make_password
+
+from Quiz.catalog import invalidate_subject_catalogs
+from Quiz.leaderboard import invalidate_scores
+from Quiz.models import Choice, Question, Quiz, QuizStats, Student, StudentAnswer, Subject, TakenQuiz, User
+from Quiz.sampling import invalidate_question_ids
+
+_sequence = itertools.count()
+
+COLORS = ('#007bff', '#28a745', '#dc3545', '#ffc107', '#17a2b8', '#6f42c1')
+
+
+def create_teacher():
+    return User.objects.create(username='bench-teacher-%d' % next(_sequence), is_teacher=True)
+
+
+def create_student(subject=None):
+    user = User.objects.create(username='bench-student-%d' % next(_sequence), is_student=True)
+    student = Student.objects.create(user=user)
+    if subject is not None:
+        student.interests.add(subject)
+    return student
+
+
+def create_quiz(questions=10, choices=4, owner=None, subject=None):
+    '''
+        Creates a quiz with ``questions`` questions of ``choices`` choices each. The first choice of every
+        question is correct.
+    '''
+    owner = owner or create_teacher()
+    subject = subject or Subject.objects.create(name='bench-%d' % next(_sequence))
+    quiz = Quiz.objects.create(owner=owner, name='bench-quiz-%d' % next(_sequence), subject=subject)
+    Question.objects.bulk_create(Question(quiz=quiz, text='question %05d' % i) for i in range(questions))
+    Choice.objects.bulk_create(
+        Choice(question_id=question_pk, text='choice %d' % i, is_correct=(i == 0))
+        for question_pk in quiz.questions.values_list('pk', flat=True)
+        for i in range(choices)
+    )
+    return quiz
+
+
+def answer_quiz(student, quiz, correct=True):
+    '''
+        Stores an answer of ``student`` to every question of ``quiz``, all correct or all wrong.
+    '''
+    selected = Choice.objects.filter(question__quiz=quiz, is_correct=correct).values_list('question_id', 'pk')
+    answers_by_question = {}
+    for question_pk, choice_pk in selected:
+        answers_by_question.setdefault(question_pk, choice_pk)
+    answers = StudentAnswer.objects.bulk_create(
+        StudentAnswer(student=student, quiz=quiz, question_id=question_pk) for question_pk in answers_by_question
+    )
+    StudentAnswer.answer.through.objects.bulk_create(
+        StudentAnswer.answer.through(studentanswer_id=answer.pk, choice_id=choice_pk)
+        for answer, choice_pk in zip(answers, answers_by_question.values())
+    )
+
+
+
+def create_attempts(quiz, count, batch_size=2000):
+    '''
+        Creates ``count`` students who took ``quiz``, with scores spread over 0-100.
+    '''
+    prefix = 'bench-%d-' % next(_sequence)
+    users = User.objects.bulk_create(
+        (User(username=prefix + str(i), is_student=True) for i in range(count)), batch_size=batch_size
+    )
+    students = Student.objects.bulk_create((Student(user=user) for user in users), batch_size=batch_size)
+    TakenQuiz.objects.bulk_create(
+        (TakenQuiz(student=student, quiz=quiz, score=float(i % 101)) for i, student in enumerate(students)),
+        batch_size=batch_size
+    )
+    invalidate_scores(quiz.pk)
+    return students
+
+
+def seed(teachers=10, students=1000, subjects=5, quizzes=50, questions=20, choices=4, attempts=100, password=None,
+         batch_size=2000):
+    '''
+        Generates a whole data set with bulk inserts: every student is interested in two subjects, the quizzes are
+        spread over the teachers and subjects, and each quiz is taken by ``attempts`` distinct students (at most
+        all of them). ``password`` is the password of every user, unusable by default.
+        Returns the created teachers, students, subjects and quizzes.
+    '''
+    prefix = 'seed-%s-' % uuid.uuid4().hex[:8]
+    password = make_password(password)
+    subject_objects = Subject.objects.bulk_create(
+        Subject(name=prefix + str(i), color=COLORS[i % len(COLORS)]) for i in range(subjects)
+    )
+    teacher_users = User.objects.bulk_create(
+        (User(username=prefix + 'teacher-%d' % i, password=password, is_teacher=True) for i in range(teachers)),
+        batch_size=batch_size
+    )
+    student_users = User.objects.bulk_create(
+        (User(username=prefix + 'student-%d' % i, password=password, is_student=True) for i in range(students)),
+        batch_size=batch_size
+    )
+    student_objects = Student.objects.bulk_create((Student(user=user) for user in student_users),
+                                                  batch_size=batch_size)
+    Student.interests.through.objects.bulk_create(
+        (
+            Student.interests.through(student_id=student.pk, subject_id=subject_objects[(i + offset) % subjects].pk)
+            for i, student in enumerate(student_objects)
+            for offset in range(min(2, subjects))
+        ),
+        batch_size=batch_size
+    )
+    quiz_objects = Quiz.objects.bulk_create(
+        (
+            Quiz(owner=teacher_users[i % teachers], subject=subject_objects[i % subjects], name=prefix + 'quiz-%d' % i)
+            for i in range(quizzes)
+        ),
+        batch_size=batch_size
+    )
+    question_objects = Question.objects.bulk_create(
+        (Question(quiz=quiz, text='question %05d' % i) for quiz in quiz_objects for i in range(questions)),
+        batch_size=batch_size
+    )
+    Choice.objects.bulk_create(
+        (
+            Choice(question=question, text='choice %d' % i, is_correct=(i == 0))
+            for question in question_objects
+            for i in range(choices)
+        ),
+        batch_size=batch_size
+    )
+
+    # bulk_create doesn't send post_save: the statistics are computed here from the generated scores.
+    attempts = min(attempts, students)
+    stats = []
+    taken_quizzes = []
+    for q, quiz in enumerate(quiz_objects):
+        scores = [float((q + i * 37) % 101) for i in range(attempts)]
+        taken_quizzes += [
+            TakenQuiz(student=student_objects[(q * attempts + i) % students], quiz=quiz, score=score)
+            for i, score in enumerate(scores)
+        ]
+        stats.append(QuizStats(
+            quiz=quiz,
+            questions_count=questions,
+            attempts_count=attempts,
+            score_sum=sum(scores),
+            score_sum_squares=sum(score ** 2 for score in scores),
+            score_min=min(scores, default=None),
+            score_max=max(scores, default=None),
+        ))
+        if len(taken_quizzes) >= batch_size:
+            TakenQuiz.objects.bulk_create(taken_quizzes, batch_size=batch_size)
+            taken_quizzes = []
+    TakenQuiz.objects.bulk_create(taken_quizzes, batch_size=batch_size)
+    QuizStats.objects.bulk_create(stats, batch_size=batch_size)
+    invalidate_subject_catalogs(*(subject.pk for subject in subject_objects))
+    # The pks of rolled back quizzes can be reused, e.g. from one test to the next. Their pages and answer keys are
+    # cached under new versions.
+    quiz_ids = [quiz.pk for quiz in quiz_objects]
+    invalidate_scores(*quiz_ids)
+    for quiz_id in quiz_ids:
+        invalidate_question_ids(quiz_id)
+    return {
+        'teachers': teacher_users,
+        'students': student_objects,
+        'subjects': subject_objects,
+        'quizzes': quiz_objects,
+    }
@@ -0,0 +1,26 @@
+'''
+    Streaming export of quiz results: peak memory and duration against the number of attempts.
+'''
+import time
+import tracemalloc
+
+from Quiz.benchmarks.data import create_attempts, create_quiz
+from Quiz.exports import export_results
+
+SIZES = (1000, 10000, 100000)
+
+
+def run(sizes=SIZES, repeat=1):
+    rows = []
+    for size in sizes:
+        quiz = create_quiz(questions=10)
+        create_attempts(quiz, size)
+        for export_format in ('csv', 'jsonl'):
+            tracemalloc.start()
+            start = time.perf_counter()
+            lines = sum(1 for _ in export_results(quiz, quiz.taken_quizzes.all(), export_format))
+            duration = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            rows.append((size, export_format, lines, round(duration * 1000, 2), round(peak / 1024 / 1024, 2)))
+    return ('attempts', 'format', 'lines', 'ms', 'peak MiB'), rows
@@ -0,0 +1,34 @@
+'''
+    Scoring of a completed attempt: the former per-question loop against the set-based scoring engine.
+'''
+from Quiz.benchmarks import measure
+from Quiz.benchmarks.data import answer_quiz, create_quiz, create_student
+from Quiz.models import Choice, StudentAnswer
+from Quiz.scoring import AllOrNothingScheme, score_quiz
+
+SIZES = (10, 50, 200)
+
+
+def legacy_score(student, quiz):
+    # The scoring loop take_quiz used to run: two queries per question.
+    total_questions = quiz.questions.count()
+    student_correct_answers = 0
+    for question in quiz.questions.values_list('pk', flat=True):
+        if set(Choice.objects.filter(question=question, is_correct=True).values_list('pk', flat=True))\
+            == set(StudentAnswer.objects.filter(answer__question=question).distinct(). \
+                   first().answer.values_list('pk', flat=True)):
+            student_correct_answers += 1
+    return round((student_correct_answers / total_questions) * 100.0, 2)
+
+
+def run(sizes=SIZES, repeat=5):
+    scheme = AllOrNothingScheme()
+    rows = []
+    for size in sizes:
+        quiz = create_quiz(questions=size)
+        student = create_student()
+        answer_quiz(student, quiz)
+        legacy_queries, legacy_ms = measure(lambda: legacy_score(student, quiz), repeat)
+        queries, ms = measure(lambda: score_quiz(student, quiz, scheme), repeat)
+        rows.append((size, legacy_queries, legacy_ms, queries, ms))
+    return ('questions', 'legacy queries', 'legacy ms', 'engine queries', 'engine ms'), rows
@@ -0,0 +1,109 @@
+'''
+    Throughput of concurrent take_quiz submissions: every thread is a student answering a quiz one question at a
+    time through the test client, with its own database connection. On SQLite, the default journaling is compared
+    with the tuned QUIZ_SQLITE_PRAGMAS; on other databases the configured profile is measured.
+'''
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from Quiz.benchmarks import quiet_query_log
+from Quiz.benchmarks.data import create_quiz, create_student
+from Quiz.models import Choice
+
+SIZES = (1, 4, 16)
+
+QUESTIONS = 20
+
+SQLITE_DEFAULT_PRAGMAS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+}
+
+
+def prepare_clients(quiz, count):
+    '''
+        Returns a logged in client per student and the form data of the answers to submit, in question order.
+    '''
+    choices = Choice.objects.filter(question__quiz=quiz, is_correct=True).order_by('question__text')
+    submissions = [{'question': choice.question_id, 'answer': choice.pk} for choice in choices]
+    clients = []
+    for _ in range(count):
+        client = Client()
+        client.force_login(create_student().user)
+        clients.append(client)
+    return clients, submissions
+
+
+def submit_answers(client, url, submissions, barrier, latencies, errors):
+    barrier.wait()
+    try:
+        for data in submissions:
+            start = time.perf_counter()
+            try:
+                response = client.post(url, data)
+            except OperationalError:
+                errors.append(data)
+                continue
+            if response.status_code == 302:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                errors.append(data)
+    finally:
+        connections.close_all()
+
+
+def measure_throughput(threads):
+    '''
+        Returns the submissions per second, the latencies (ms) of the successful submissions and the number of
+        failed ones.
+    '''
+    quiz = create_quiz(questions=QUESTIONS)
+    url = reverse('students:take_quiz', args=(quiz.pk, ))
+    clients, submissions = prepare_clients(quiz, threads)
+    barrier = threading.Barrier(threads + 1)
+    latencies, errors = [], []
+    workers = [
+        threading.Thread(target=submit_answers, args=(client, url, submissions, barrier, latencies, errors))
+        for client in clients
+    ]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    seconds = time.perf_counter() - start
+    return len(latencies) / seconds, latencies, len(errors)
+
+
+def run(sizes=SIZES, repeat=5):
+    if connection.vendor == 'sqlite':
+        profiles = [('sqlite default', SQLITE_DEFAULT_PRAGMAS), ('sqlite tuned', settings.QUIZ_SQLITE_PRAGMAS)]
+    else:
+        profiles = [(connection.vendor, getattr(settings, 'QUIZ_SQLITE_PRAGMAS', {}))]
+    rows = []
+    # Slow queries are expected under contention, they aren't logged.
+    with quiet_query_log():
+        for name, pragmas in profiles:
+            with override_settings(QUIZ_SQLITE_PRAGMAS=pragmas):
+                # The PRAGMAs are applied to new connections, and the journal mode can only change without any other
+                # connection open.
+                connection.close()
+                for threads in sizes:
+                    throughputs, latencies, errors = [], [], 0
+                    for _ in range(repeat):
+                        throughput, run_latencies, run_errors = measure_throughput(threads)
+                        throughputs.append(throughput)
+                        latencies += run_latencies
+                        errors += run_errors
+                    rows.append((
+                        name, threads, round(statistics.median(throughputs), 1),
+                        round(statistics.median(latencies), 2) if latencies else '-', errors,
+                    ))
+    return ('database', 'threads', 'submissions/s', 'median ms', 'errors'), rows
@@ -0,0 +1,122 @@
+'''
+    Latency percentiles and query counts of the student and teacher pages, requested through the test client
+    against a seeded data set. The sizes are the number of attempts of the benchmarked quiz.
+'''
+import time
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from Quiz.benchmarks import percentile, quiet_query_log
+from Quiz.benchmarks.data import seed
+
+SIZES = (100, 1000)
+
+REPEAT = 20
+
+# Latency increases smaller than this are treated as noise, whatever the tolerance.
+LATENCY_MARGIN_MS = 2
+
+
+def student_urls(quiz):
+    return [
+        ('students:quiz_list', reverse('students:quiz_list')),
+        ('students:taken_quiz_list', reverse('students:taken_quiz_list')),
+        ('students:student_interests', reverse('students:student_interests')),
+        ('students:take_quiz', reverse('students:take_quiz', args=(quiz.pk, ))),
+    ]
+
+
+def teacher_urls(quiz, question):
+    return [
+        ('teachers:quiz_change_list', reverse('teachers:quiz_change_list')),
+        ('teachers:quiz_add', reverse('teachers:quiz_add')),
+        ('teachers:quiz_change', reverse('teachers:quiz_change', args=(quiz.pk, ))),
+        ('teachers:quiz_delete', reverse('teachers:quiz_delete', args=(quiz.pk, ))),
+        ('teachers:quiz_results', reverse('teachers:quiz_results', args=(quiz.pk, ))),
+        ('teachers:quiz_results_export', reverse('teachers:quiz_results_export', args=(quiz.pk, ))),
+        ('teachers:quiz_item_analysis', reverse('teachers:quiz_item_analysis', args=(quiz.pk, ))),
+        ('teachers:quiz_leaderboard', reverse('teachers:quiz_leaderboard', args=(quiz.pk, ))),
+        ('teachers:question_add', reverse('teachers:question_add', args=(quiz.pk, ))),
+        ('teachers:quiz_import', reverse('teachers:quiz_import', args=(quiz.pk, ))),
+        ('teachers:quiz_share', reverse('teachers:quiz_share', args=(quiz.pk, ))),
+        ('teachers:question_change', reverse('teachers:question_change', args=(quiz.pk, question.pk))),
+        ('teachers:question_delete', reverse('teachers:question_delete', args=(quiz.pk, question.pk))),
+    ]
+
+
+def request(client, url):
+    response = client.get(url)
+    if response.streaming:
+        # The rows of a streaming response are queried while it is consumed.
+        b''.join(response.streaming_content)
+    if response.status_code != 200:
+        raise RuntimeError('GET %s returned %d' % (url, response.status_code))
+
+
+def measure_view(client, url, repeat):
+    '''
+        Requests ``url`` once to warm up (e.g. the session and the caches), then ``repeat`` times. Returns the
+        number of queries of one request and the latency percentiles in ms.
+    '''
+    request(client, url)
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            request(client, url)
+            timings.append((time.perf_counter() - start) * 1000)
+    return (len(context.captured_queries), *(round(percentile(timings, percent), 2) for percent in (50, 95, 99)))
+
+
+def run(sizes=SIZES, repeat=REPEAT):
+    rows = []
+    with quiet_query_log():
+        for size in sizes:
+            # Twice as many students as attempts: the first student took every other quiz and can take the second one.
+            data = seed(teachers=5, students=2 * size, subjects=5, quizzes=20, questions=20, attempts=size)
+            quiz = data['quizzes'][1]
+            student_client, teacher_client = Client(), Client()
+            student_client.force_login(data['students'][0].user)
+            teacher_client.force_login(quiz.owner)
+            urls = [(student_client, name, url) for name, url in student_urls(quiz)]
+            urls += [(teacher_client, name, url) for name, url in teacher_urls(quiz, quiz.questions.first())]
+            for client, name, url in urls:
+                rows.append((size, name, *measure_view(client, url, repeat)))
+    return ('attempts', 'view', 'queries', 'p50 ms', 'p95 ms', 'p99 ms'), rows
+
+
+def baseline(rows):
+    return {
+        '%s %s' % (size, view): {'queries': queries, 'p95_ms': p95}
+        for size, view, queries, _, p95, _ in rows
+    }
+
+
+def regressions(rows, baseline):
+    '''
+        A view regressed when it runs more queries than in the baseline. Query counts don't depend on the host,
+        unlike latencies (see slowdowns).
+    '''
+    found = []
+    for size, view, queries, _, _, _ in rows:
+        expected = baseline.get('%s %s' % (size, view))
+        if expected is not None and queries > expected['queries']:
+            found.append('%s with %s attempts: %d queries instead of %d.' % (view, size, queries, expected['queries']))
+    return found
+
+
+def slowdowns(rows, baseline, tolerance):
+    '''
+        Views whose p95 latency exceeds the baseline by more than ``tolerance`` (0.5 = 50 %) and LATENCY_MARGIN_MS.
+        Only meaningful against a baseline saved on the same host, they are reported without failing the run.
+    '''
+    found = []
+    for size, view, _, _, p95, _ in rows:
+        expected = baseline.get('%s %s' % (size, view))
+        if expected is not None and p95 > expected['p95_ms'] * (1 + tolerance) + LATENCY_MARGIN_MS:
+            found.append('%s with %s attempts: p95 of %.2f ms instead of %.2f ms.' % (view, size, p95,
+                                                                                      expected['p95_ms']))
+    return found
@@ -0,0 +1,54 @@
+'''
+    Catalog of the quizzes students can take, cached per subject: the quizzes of the subject having at least one
+    question and not being deleted, with their subject and question count. Entries are invalidated by signals (see
+    Quiz.signals) when a quiz, one of its questions or a subject changes.
+'''
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from Quiz.models import Quiz
+
+CATALOG_KEY = 'quiz-catalog:subject:%d'
+
+
+def get_subject_catalogs(subject_ids):
+    '''
+        Returns {subject pk: list of quizzes}. Subjects missing from the cache are loaded with a single query.
+    '''
+    keys = {CATALOG_KEY % pk: pk for pk in subject_ids}
+    catalogs = {keys[key]: quizzes for key, quizzes in cache.get_many(keys).items()}
+    missing = [pk for pk in subject_ids if pk not in catalogs]
+    if missing:
+        loaded = {pk: [] for pk in missing}
+        quizzes = Quiz.objects \
+            .filter(subject__in=missing, stats__questions_count__gt=0, deleting=False) \
+            .select_related('subject', 'stats') \
+            .order_by('name')
+        for quiz in quizzes:
+            quiz.questions_count = quiz.get_questions_count(quiz.stats.questions_count)
+            loaded[quiz.subject_id].append(quiz)
+        cache.set_many({CATALOG_KEY % pk: quizzes for pk, quizzes in loaded.items()},
+                       getattr(settings, 'QUIZ_CATALOG_TIMEOUT', None))
+        catalogs.update(loaded)
+    return catalogs
+
+
+def available_quizzes(subject_ids, taken_quiz_ids):
+    '''
+        The quizzes of the given subjects a student can still take, sorted by name.
+    '''
+    catalogs = get_subject_catalogs(subject_ids)
+    quizzes = [quiz for pk in subject_ids for quiz in catalogs[pk] if quiz.pk not in taken_quiz_ids]
+    return sorted(quizzes, key=lambda quiz: quiz.name)
+
+
+def invalidate_subject_catalogs(*subject_ids):
+    keys = [CATALOG_KEY % pk for pk in subject_ids if pk is not None]
+    cache.delete_many(keys)
+    # Deleted again on commit, in case a concurrent request cached the catalog before the change was committed.
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_quiz_catalog(quiz_id):
+    invalidate_subject_catalogs(*Quiz.objects.filter(pk=quiz_id).values_list('subject_id', flat=True))
@@ -0,0 +1,73 @@
+'''
+    Deletion of a quiz in chunks. Deleting a quiz through the ORM collects every related question, choice, attempt
+    and answer in memory and deletes them in one transaction, which blocks a worker and the database for seconds on
+    a heavily used quiz. Here the related rows are deleted bottom-up by raw DELETE statements of chunk_size rows,
+    each committed on its own, then the emptied quiz is deleted through the ORM. Raw deletes don't send signals: the
+    caches of the quiz are invalidated by the signals of the quiz deletion (see Quiz.signals).
+'''
+from Quiz.catalog import invalidate_quiz_catalog
+from Quiz.models import Choice, Question, Quiz, StudentAnswer, TakenQuiz, new_version
+from Quiz.signals import end_quiz_deletion
+
+
+def delete_in_chunks(queryset, chunk_size=2000, progress=None):
+    '''
+        Deletes the rows of the queryset, chunk_size at a time, without loading them nor sending signals: rows
+        referencing them must be deleted first. ``progress`` is called with the number of rows of every chunk.
+        Returns the number of rows deleted.
+    '''
+    model = queryset.model
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    deleted = 0
+    while True:
+        chunk = list(pks[:chunk_size])
+        if not chunk:
+            return deleted
+        # The DELETE statement QuerySet.delete() runs for rows without relations nor signals.
+        model.objects.filter(pk__in=chunk)._raw_delete(queryset.db)
+        deleted += len(chunk)
+        if progress is not None:
+            progress(len(chunk))
+
+
+def hide_quiz(quiz):
+    '''
+        Marks the quiz as being deleted, before delete_quiz runs in the background: it leaves the catalog and can
+        no longer be taken nor edited, so that nobody sees it half deleted.
+    '''
+    Quiz.objects.filter(pk=quiz.pk).update(deleting=True, version=new_version())
+    invalidate_quiz_catalog(quiz.pk)
+
+
+def delete_quiz(quiz, chunk_size=2000, progress=None):
+    '''
+        Deletes the quiz with its questions, choices, attempts and answers. ``progress`` is called with the number
+        of rows deleted so far and the total number of rows to delete.
+    '''
+    querysets = [
+        StudentAnswer.answer.through.objects.filter(studentanswer__quiz=quiz),
+        StudentAnswer.objects.filter(quiz=quiz),
+        TakenQuiz.objects.filter(quiz=quiz),
+        Choice.objects.filter(question__quiz=quiz),
+        Question.objects.filter(quiz=quiz),
+    ]
+    total = sum(queryset.count() for queryset in querysets)
+    done = 0
+
+    def report(count):
+        nonlocal done
+        done += count
+        if progress is not None:
+            progress(done, total)
+
+    if progress is not None:
+        progress(done, total)
+    for queryset in querysets:
+        delete_in_chunks(queryset, chunk_size, report)
+    # Rows added meanwhile (e.g. by a student completing the quiz) are deleted with it.
+    quiz_pk = quiz.pk
+    try:
+        quiz.delete()
+    finally:
+        end_quiz_deletion(quiz_pk)
+    return total
@@ -0,0 +1,78 @@
+'''
+    Export of quiz results. Attempts are read with a server-side iterator and rendered row by row, so the memory
+    used by an export doesn't grow with the number of attempts.
+'''
+import csv
+import json
+from itertools import islice
+
+from Quiz.scoring import get_answer_key, load_students_selections
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def iter_results(quiz, taken_quizzes, questions=(), chunk_size=2000):
+    '''
+        Yields (student username, date, score, correctness of each question) per attempt. The correctness (1 or 0)
+        is given for ``questions``, a list of question pks; their answers are loaded with one query per chunk.
+    '''
+    rows = taken_quizzes \
+        .order_by('pk') \
+        .values_list('student_id', 'student__user__username', 'date', 'score') \
+        .iterator(chunk_size=chunk_size)
+    answer_key = get_answer_key(quiz) if questions else None
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        selections = {}
+        if questions:
+            selections = load_students_selections(quiz, [student_pk for student_pk, *_ in chunk])
+        for student_pk, username, date, score in chunk:
+            student_selections = selections.get(student_pk, {})
+            correctness = [
+                int(answer_key.is_correct(question_pk, student_selections.get(question_pk, ())))
+                for question_pk in questions
+            ]
+            yield (username, date, score, correctness)
+
+
+class _Echo:
+    # Pseudo-buffer handing back what the csv writer writes, see the Django docs on streaming large CSV files.
+    def write(self, value):
+        return value
+
+
+def render_csv(results, questions):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(['student', 'date', 'score'] + [text for _, text in questions])
+    for username, date, score, correctness in results:
+        yield writer.writerow([username, date.isoformat(), score] + correctness)
+
+
+def render_jsonl(results, questions):
+    for username, date, score, correctness in results:
+        result = {'student': username, 'date': date.isoformat(), 'score': score}
+        if questions:
+            result['correct'] = {str(pk): correct for (pk, _), correct in zip(questions, correctness)}
+        yield json.dumps(result) + '\n'
+
+
+RENDERERS = {
+    'csv': render_csv,
+    'jsonl': render_jsonl,
+}
+
+
+def export_results(quiz, taken_quizzes, export_format, per_question=False, chunk_size=2000):
+    '''
+        Returns an iterator over the lines of the export of ``taken_quizzes`` in ``export_format``.
+    '''
+    questions = []
+    if per_question:
+        questions = list(quiz.questions.order_by('text').values_list('pk', 'text'))
+    results = iter_results(quiz, taken_quizzes, [pk for pk, _ in questions], chunk_size)
+    return RENDERERS[export_format](results, questions)
@@ -1,7 +1,10 @@
+from datetime import datetime, time, timedelta
+
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.db import transaction
 from django.forms.utils import ValidationError
+from django.utils import timezone
 
 from Quiz.models import (Question, Student, StudentAnswer,
                               Subject, User)
@@ -66,18 +69,70 @@ class ShareTeacherForm(forms.ModelForm):
         fields = ('username', )
 
 
+class QuizImportForm(forms.Form):
+    '''
+        Form for importing questions into a quiz from a file (see Quiz.importers for the formats).
+    '''
+    file = forms.FileField()
+    format = forms.ChoiceField(choices=[('csv', 'CSV'), ('json', 'JSON'), ('jsonl', 'JSON lines')])
+
+
+class QuizResultsFilterForm(forms.Form):
+    '''
+        Filters of the quiz results: date range of the attempts and score band.
+    '''
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+    score_min = forms.FloatField(required=False, min_value=0, max_value=100)
+    score_max = forms.FloatField(required=False, min_value=0, max_value=100)
+
+    def filter(self, queryset):
+        # Dates are turned into datetime bounds so that the index on the attempt date can be used.
+        data = self.cleaned_data
+        if data.get('date_from'):
+            queryset = queryset.filter(date__gte=_start_of_day(data['date_from']))
+        if data.get('date_to'):
+            queryset = queryset.filter(date__lt=_start_of_day(data['date_to'] + timedelta(days=1)))
+        if data.get('score_min') is not None:
+            queryset = queryset.filter(score__gte=data['score_min'])
+        if data.get('score_max') is not None:
+            queryset = queryset.filter(score__lte=data['score_max'])
+        return queryset
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+# Number of choices a question must have, both in the question form and in quiz imports.
+MIN_CHOICES = 2
+MAX_CHOICES = 5
+
+
+def validate_choices(is_correct_flags):
+    '''
+        Validates the choices of a question, given as the list of their is_correct flags.
+    '''
+    if not MIN_CHOICES <= len(is_correct_flags) <= MAX_CHOICES:
+        raise ValidationError('A question must have between %d and %d choices.' % (MIN_CHOICES, MAX_CHOICES),
+                              code='choices_count')
+    validate_correct_choice(is_correct_flags)
+
+
+def validate_correct_choice(is_correct_flags):
+    if not any(is_correct_flags):
+        raise ValidationError('Mark at least one answer as correct.', code='no_correct_answer')
+
+
 class BaseAnswerInlineFormSet(forms.BaseInlineFormSet):
     def clean(self):
         super().clean()
-
-        has_one_correct_answer = False
-        for form in self.forms:
-            if not form.cleaned_data.get('DELETE', False):
-                if form.cleaned_data.get('is_correct', False):
-                    has_one_correct_answer = True
-                    break
-        if not has_one_correct_answer:
-            raise ValidationError('Mark at least one answer as correct.', code='no_correct_answer')
+        # The number of choices is validated by the formset (validate_min/validate_max).
+        validate_correct_choice([
+            form.cleaned_data.get('is_correct', False)
+            for form in self.forms
+            if not form.cleaned_data.get('DELETE', False)
+        ])
 
 class TakeQuizForm(forms.ModelForm):
     '''
@@ -93,13 +148,39 @@ class TakeQuizForm(forms.ModelForm):
         fields = ('answer', )
 
     def __init__(self, *args, **kwargs):
-        question = kwargs.pop('question')
+        self.question = kwargs.pop('question')
         super().__init__(*args, **kwargs)
-        self.fields['answer'].queryset = question.choices
+        self.fields['answer'].queryset = self.question.choices
 
     def save(self, commit=True, student=None, *args, **kwargs):
-        model = StudentAnswer.objects.create(student=student)
+        model = StudentAnswer.objects.create(student=student, quiz_id=self.question.quiz_id, question=self.question)
         model.answer.add(*self.cleaned_data.get('answer'))
-        if commit:
-            model.save()
-        return model
\ No newline at end of file
+        return model
+
+
+class TakeExamForm(forms.Form):
+    '''
+        Form for students to take a whole quiz at once (exam mode). There is one field per question, built from the
+        prefetched choices so that neither rendering nor validation queries the choices again.
+    '''
+    def __init__(self, *args, **kwargs):
+        self.questions = list(kwargs.pop('questions'))
+        super().__init__(*args, **kwargs)
+        for question in self.questions:
+            self.fields['question_%d' % question.pk] = forms.TypedMultipleChoiceField(
+                label=question.text,
+                choices=[(choice.pk, choice.text) for choice in question.choices.all()],
+                coerce=int,
+                widget=forms.CheckboxSelectMultiple,
+                required=True)
+
+    def save(self, student):
+        answers = StudentAnswer.objects.bulk_create(
+            StudentAnswer(student=student, quiz_id=question.quiz_id, question=question) for question in self.questions
+        )
+        StudentAnswer.answer.through.objects.bulk_create(
+            StudentAnswer.answer.through(studentanswer_id=answer.pk, choice_id=choice_pk)
+            for answer, question in zip(answers, self.questions)
+            for choice_pk in self.cleaned_data['question_%d' % question.pk]
+        )
+        return answers
@@ -0,0 +1,177 @@
+'''
+    Bulk import of questions into a quiz. Files are parsed one question at a time, validated with the rules of the
+    question form and inserted with bulk_create, one transaction per batch of questions.
+
+    Every question is {"text": ..., "choices": [{"text": ..., "is_correct": true}, ...]}, either one per line
+    (jsonl) or in a JSON array (json). CSV files have a question,choice,is_correct header and one row per choice;
+    consecutive rows with the same question text are the choices of one question.
+'''
+import csv
+import json
+import time
+from itertools import groupby, islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from Quiz.catalog import invalidate_subject_catalogs
+from Quiz.forms import validate_choices
+from Quiz.models import Choice, Question
+from Quiz.response_cache import bump_quiz_versions
+from Quiz.sampling import invalidate_question_ids
+from Quiz.scoring import invalidate_answer_key
+from Quiz.stats import record_questions
+
+TRUE_VALUES = ('1', 'true', 'yes', 'y')
+FALSE_VALUES = ('', '0', 'false', 'no', 'n')
+
+
+def parse_jsonl(file):
+    for line_number, line in enumerate(file, start=1):
+        if line.strip():
+            try:
+                yield line_number, json.loads(line)
+            except ValueError:
+                raise ValidationError('Line %d: invalid JSON.' % line_number)
+
+
+def parse_json(file, chunk_size=64 * 1024):
+    '''
+        Parses a JSON array of questions incrementally, without loading the whole file.
+    '''
+    decoder = json.JSONDecoder()
+    buffer = file.read(chunk_size).lstrip()
+    if not buffer.startswith('['):
+        raise ValidationError('Expected a JSON array of questions.')
+    buffer = buffer[1:]
+    position = 0
+    end_of_file = False
+    while True:
+        buffer = buffer.lstrip()
+        if position and buffer.startswith(','):
+            buffer = buffer[1:].lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except ValueError:
+            if end_of_file:
+                raise ValidationError('Question %d: invalid JSON.' % (position + 1))
+            data = file.read(chunk_size)
+            end_of_file = not data
+            buffer += data
+            continue
+        position += 1
+        yield position, item
+        buffer = buffer[end:]
+
+
+def parse_csv(file):
+    reader = csv.DictReader(file)
+    if not reader.fieldnames or not {'question', 'choice', 'is_correct'} <= set(reader.fieldnames):
+        raise ValidationError('Expected a question,choice,is_correct header.')
+    rows = enumerate(reader, start=2)
+    for position, (text, group) in enumerate(groupby(rows, key=lambda row: row[1]['question']), start=1):
+        choices = [{'text': row['choice'], 'is_correct': row['is_correct'] or ''} for _, row in group]
+        yield position, {'text': text, 'choices': choices}
+
+
+PARSERS = {
+    'csv': parse_csv,
+    'json': parse_json,
+    'jsonl': parse_jsonl,
+}
+
+
+def parse_is_correct(value):
+    '''
+        A boolean, or one of the strings of TRUE_VALUES and FALSE_VALUES. Raises ValueError otherwise: e.g. "false"
+        or 0 must not be taken for a correct choice, nor "maybe" for a wrong one.
+    '''
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in TRUE_VALUES:
+            return True
+        if value in FALSE_VALUES:
+            return False
+    raise ValueError(value)
+
+
+def clean_question(position, item):
+    '''
+        Validates a parsed question. Returns (text, [(choice text, is_correct), ...]).
+    '''
+    try:
+        text = item['text']
+        choices = [(choice['text'], choice.get('is_correct', False)) for choice in item['choices']]
+    except (KeyError, TypeError, AttributeError):
+        raise ValidationError('Question %d: expected a text and a list of choices with a text.' % position)
+    try:
+        choices = [(choice_text, parse_is_correct(is_correct)) for choice_text, is_correct in choices]
+    except ValueError:
+        raise ValidationError('Question %d: is_correct must be true or false.' % position)
+    values = [(Question._meta.get_field('text'), text)]
+    values += [(Choice._meta.get_field('text'), choice_text) for choice_text, _ in choices]
+    for field, value in values:
+        if not isinstance(value, str) or not value.strip() or len(value) > field.max_length:
+            raise ValidationError('Question %d: texts must be non-empty strings of at most %d characters.'
+                                  % (position, field.max_length))
+    try:
+        validate_choices([is_correct for _, is_correct in choices])
+    except ValidationError as error:
+        raise ValidationError('Question %d: %s' % (position, error.messages[0]))
+    return text, choices
+
+
+class ImportResult:
+    def __init__(self):
+        self.questions = 0
+        self.choices = 0
+        self.seconds = 0.0
+
+    @property
+    def questions_per_second(self):
+        return self.questions / self.seconds if self.seconds else 0.0
+
+
+def import_questions(quiz, file, file_format, batch_size=500):
+    '''
+        Imports the questions of ``file`` into ``quiz``. Each batch of ``batch_size`` questions is inserted in its
+        own transaction; on an invalid question, the batches before it stay imported and ValidationError is raised.
+    '''
+    result = ImportResult()
+    start = time.perf_counter()
+    questions = (clean_question(position, item) for position, item in PARSERS[file_format](file))
+    try:
+        while True:
+            batch = list(islice(questions, batch_size))
+            if not batch:
+                break
+            _insert_batch(quiz, batch)
+            result.questions += len(batch)
+            result.choices += sum(len(choices) for _, choices in batch)
+    except ValidationError as error:
+        raise ValidationError('%s %d questions were imported before this error.'
+                              % (error.messages[0], result.questions))
+    finally:
+        result.seconds = time.perf_counter() - start
+    return result
+
+
+@transaction.atomic
+def _insert_batch(quiz, batch):
+    questions = Question.objects.bulk_create([Question(quiz=quiz, text=text) for text, _ in batch])
+    Choice.objects.bulk_create([
+        Choice(question=question, text=text, is_correct=is_correct)
+        for question, (_, choices) in zip(questions, batch)
+        for text, is_correct in choices
+    ])
+    # bulk_create doesn't send post_save, the quiz statistics, the catalog, the question pks, the answer key and the
+    # cached pages are updated here.
+    record_questions(quiz.pk, len(questions))
+    invalidate_subject_catalogs(quiz.subject_id)
+    invalidate_question_ids(quiz.pk)
+    invalidate_answer_key(quiz.pk)
+    bump_quiz_versions(quiz.pk)
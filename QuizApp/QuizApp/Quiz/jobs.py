@@ -0,0 +1,201 @@
+'''
+    Queue of the heavy teacher operations, kept in the database (Quiz.models.Job) and run by
+    ``python manage.py run_worker``, without any broker. enqueue() adds a job; a worker claims the oldest queued job
+    with a conditional update, so that several workers never run the same job, and runs the function registered for
+    its kind, which reports its progress on the job. The operations work in chunks committed one by one (see
+    Quiz.deletion and Quiz.regrading), so the progress is visible to the teacher while the job runs.
+
+    Deleting and regrading a quiz with up to QUIZ_JOBS['INLINE_ATTEMPTS'] attempts still run in the request, and
+    so does its item analysis.
+
+    A job whose worker died (e.g. killed, or its host lost) stays running: it is queued again once it hasn't
+    reported any progress for QUIZ_JOBS['STALE_AFTER'] seconds.
+'''
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from Quiz.analysis import compute_item_analysis
+from Quiz.deletion import delete_quiz
+from Quiz.exports import EXPORT_FORMATS, export_results
+from Quiz.forms import QuizResultsFilterForm
+from Quiz.models import Job, QuizStats
+from Quiz.regrading import regrade_quiz
+
+logger = logging.getLogger('Quiz.jobs')
+
+DEFAULT_JOBS = {
+    'INLINE_ATTEMPTS': 1000,
+    'POLL_INTERVAL': 1.0,
+    'CHUNK_SIZE': 2000,
+    'STALE_AFTER': 60 * 10,
+    'OUTPUT_DIR': os.path.join(settings.BASE_DIR, 'job_output'),
+}
+
+JOB_KINDS = {}
+
+
+def get_jobs_settings():
+    return {**DEFAULT_JOBS, **getattr(settings, 'QUIZ_JOBS', {})}
+
+
+def job_kind(name):
+    '''
+        Registers the decorated function as the runner of the jobs of the given kind. It is called with the job and
+        its params, and returns the message shown to the teacher once the job is done.
+    '''
+    def register(function):
+        JOB_KINDS[name] = function
+        return function
+    return register
+
+
+def runs_in_background(quiz):
+    '''
+        Whether the heavy operations on the quiz are queued rather than run in the request.
+    '''
+    attempts_count = QuizStats.objects.filter(quiz=quiz).values_list('attempts_count', flat=True).first() or 0
+    return attempts_count > get_jobs_settings()['INLINE_ATTEMPTS']
+
+
+def find_job(kind, quiz, statuses, **params):
+    '''
+        Returns a job of the kind, quiz and params with one of the statuses, None if there is none.
+    '''
+    for job in Job.objects.filter(kind=kind, quiz=quiz, status__in=statuses):
+        if job.params == params:
+            return job
+    return None
+
+
+def enqueue(kind, owner, description, quiz=None, **params):
+    '''
+        Queues a job and returns it. A job of the same kind, quiz and params still queued is returned instead.
+    '''
+    return find_job(kind, quiz, [Job.QUEUED], **params) or \
+        Job.objects.create(kind=kind, owner=owner, description=description, quiz=quiz, params=params)
+
+
+def requeue_stale_jobs():
+    '''
+        Queues again the running jobs without progress for QUIZ_JOBS['STALE_AFTER'] seconds. Returns their number.
+    '''
+    stale_before = timezone.now() - timedelta(seconds=get_jobs_settings()['STALE_AFTER'])
+    requeued = Job.objects \
+        .filter(status=Job.RUNNING, heartbeat__lt=stale_before) \
+        .update(status=Job.QUEUED, progress=0, started=None, heartbeat=None)
+    if requeued:
+        logger.warning('%d stale running jobs were queued again.', requeued)
+    return requeued
+
+
+def claim_job():
+    '''
+        Returns the oldest queued job, now running, or None when the queue is empty. Stale running jobs are queued
+        again first.
+    '''
+    requeue_stale_jobs()
+    while True:
+        job = Job.objects.filter(status=Job.QUEUED).order_by('pk').first()
+        if job is None:
+            return None
+        started = timezone.now()
+        # Another worker may have claimed it in the meantime.
+        if Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(status=Job.RUNNING, started=started,
+                                                                  heartbeat=started):
+            job.status, job.started, job.heartbeat = Job.RUNNING, started, started
+            return job
+
+
+def release_job(job):
+    '''
+        Queues again a job interrupted with its worker. The operations can be resumed, they start over.
+    '''
+    update_job(job, status=Job.QUEUED, progress=0, started=None, heartbeat=None)
+
+
+def update_job(job, **fields):
+    # Updated rather than saved: the quiz of the job may have just been deleted by the job.
+    for name, value in fields.items():
+        setattr(job, name, value)
+    Job.objects.filter(pk=job.pk).update(**fields)
+
+
+def report_progress(job, progress, total):
+    update_job(job, progress=progress, total=total, heartbeat=timezone.now())
+
+
+def run_job(job):
+    '''
+        Runs a claimed job and records its outcome.
+    '''
+    try:
+        result, status = JOB_KINDS[job.kind](job, **job.params) or '', Job.DONE
+    except Exception as error:
+        logger.exception('Job %d (%s) failed.', job.pk, job.kind)
+        result, status = str(error) or error.__class__.__name__, Job.FAILED
+    update_job(job, status=status, result=result, output=job.output, finished=timezone.now())
+    return job
+
+
+def get_output_path(job):
+    return os.path.join(get_jobs_settings()['OUTPUT_DIR'], job.output)
+
+
+@job_kind('delete_quiz')
+def run_delete_quiz(job):
+    if job.quiz is None:
+        return 'The quiz was already deleted.'
+    delete_quiz(job.quiz, get_jobs_settings()['CHUNK_SIZE'], lambda done, total: report_progress(job, done, total))
+    return 'The quiz was deleted.'
+
+
+@job_kind('regrade_quiz')
+def run_regrade_quiz(job):
+    if job.quiz is None:
+        return 'The quiz was deleted.'
+    regraded = regrade_quiz(job.quiz, chunk_size=get_jobs_settings()['CHUNK_SIZE'],
+                            progress=lambda done, total: report_progress(job, done, total))
+    return '%d attempts were regraded.' % regraded
+
+
+@job_kind('export_results')
+def run_export_results(job, export_format, per_question=False, filters=None):
+    '''
+        Writes the export of the results to a file of QUIZ_JOBS['OUTPUT_DIR'], downloaded from the job page.
+    '''
+    if job.quiz is None:
+        return 'The quiz was deleted.'
+    filter_form = QuizResultsFilterForm(filters or {})
+    if export_format not in EXPORT_FORMATS or not filter_form.is_valid():
+        raise ValueError('Invalid export parameters')
+    chunk_size = get_jobs_settings()['CHUNK_SIZE']
+    taken_quizzes = filter_form.filter(job.quiz.taken_quizzes.all())
+    total = taken_quizzes.count()
+    report_progress(job, 0, total)
+    job.output = 'job-%d-quiz-%d-results.%s' % (job.pk, job.quiz_id, export_format)
+    os.makedirs(get_jobs_settings()['OUTPUT_DIR'], exist_ok=True)
+    lines = export_results(job.quiz, taken_quizzes, export_format, per_question=per_question, chunk_size=chunk_size)
+    with open(get_output_path(job), 'w', encoding='utf-8', newline='') as output:
+        for count, line in enumerate(lines, 1):
+            output.write(line)
+            if count % chunk_size == 0:
+                report_progress(job, min(count, total), total)
+    report_progress(job, total, total)
+    return '%d attempts were exported.' % total
+
+
+@job_kind('item_analysis')
+def run_item_analysis(job):
+    '''
+        Computes the item analysis of the quiz, stored in the data of the job and shown in the item analysis page.
+    '''
+    if job.quiz is None:
+        return 'The quiz was deleted.'
+    analysis = compute_item_analysis(job.quiz, chunk_size=get_jobs_settings()['CHUNK_SIZE'],
+                                     progress=lambda done, total: report_progress(job, done, total))
+    update_job(job, data=analysis)
+    return 'The item analysis of %d questions was computed.' % len(analysis['questions'])
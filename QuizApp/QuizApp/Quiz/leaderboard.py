@@ -0,0 +1,93 @@
+'''
+    Ranks and percentiles of the attempts of a quiz, looked up by bisection in the sorted list of its scores. The
+    lists are cached per quiz, loaded with a single query for any number of quizzes, and kept up to date by inserting
+    the score of every new attempt (see Quiz.signals); they are dropped when scores are deleted or regraded.
+'''
+from bisect import bisect_left, bisect_right, insort
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from Quiz.models import TakenQuiz
+from Quiz.stats import get_quiz_stats
+
+SCORES_KEY = 'quiz-scores:%d'
+
+
+def get_sorted_scores(quiz_ids, attempts_counts=None):
+    '''
+        Returns {quiz pk: ascending list of the scores of its attempts}. ``attempts_counts``, {quiz pk: number of
+        attempts} (e.g. from QuizStats), detects lists which missed an attempt: they are loaded again.
+    '''
+    keys = {SCORES_KEY % pk: pk for pk in quiz_ids}
+    scores = {keys[key]: quiz_scores for key, quiz_scores in cache.get_many(keys).items()}
+    if attempts_counts:
+        scores = {pk: quiz_scores for pk, quiz_scores in scores.items()
+                  if attempts_counts.get(pk, len(quiz_scores)) == len(quiz_scores)}
+    missing = [pk for pk in keys.values() if pk not in scores]
+    if missing:
+        loaded = {pk: [] for pk in missing}
+        rows = TakenQuiz.objects.filter(quiz_id__in=missing).order_by('quiz_id', 'score').values_list('quiz_id', 'score')
+        for quiz_pk, score in rows:
+            loaded[quiz_pk].append(score)
+        cache.set_many({SCORES_KEY % pk: quiz_scores for pk, quiz_scores in loaded.items()},
+                       getattr(settings, 'QUIZ_CATALOG_TIMEOUT', None))
+        scores.update(loaded)
+    return scores
+
+
+def get_rank(scores, score):
+    '''
+        Rank of ``score`` in the ascending ``scores``: 1 + the number of higher scores, ties share their rank.
+    '''
+    return len(scores) - bisect_right(scores, score) + 1
+
+
+def get_percentile(scores, score):
+    '''
+        Percentile rank of ``score``: the percentage of scores below it, ties counting for half.
+    '''
+    if not scores:
+        return None
+    below = bisect_left(scores, score)
+    ties = bisect_right(scores, score) - below
+    return round((below + ties / 2) / len(scores) * 100, 1)
+
+
+def rank_taken_quizzes(taken_quizzes):
+    '''
+        Sets the rank, percentile and number of attempts of the quiz on every taken quiz, with their quiz and
+        quiz statistics loaded (select_related('quiz__stats')).
+    '''
+    taken_quizzes = list(taken_quizzes)
+    scores = get_sorted_scores(
+        {taken_quiz.quiz_id for taken_quiz in taken_quizzes},
+        {taken_quiz.quiz_id: get_quiz_stats(taken_quiz.quiz).attempts_count for taken_quiz in taken_quizzes},
+    )
+    for taken_quiz in taken_quizzes:
+        quiz_scores = scores[taken_quiz.quiz_id]
+        taken_quiz.rank = get_rank(quiz_scores, taken_quiz.score)
+        taken_quiz.percentile = get_percentile(quiz_scores, taken_quiz.score)
+        taken_quiz.attempts = len(quiz_scores)
+    return taken_quizzes
+
+
+def record_score(quiz_id, score):
+    '''
+        Inserts the score of a new attempt into the cached list of the quiz, once committed.
+    '''
+    def insert():
+        key = SCORES_KEY % quiz_id
+        scores = cache.get(key)
+        if scores is not None:
+            insort(scores, score)
+            cache.set(key, scores, getattr(settings, 'QUIZ_CATALOG_TIMEOUT', None))
+    transaction.on_commit(insert)
+
+
+def invalidate_scores(*quiz_ids):
+    keys = [SCORES_KEY % pk for pk in quiz_ids]
+    cache.delete_many(keys)
+    # Deleted again on commit, in case a concurrent request cached the scores before the change was committed.
+    transaction.on_commit(lambda: cache.delete_many(keys))
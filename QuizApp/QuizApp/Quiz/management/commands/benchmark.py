@@ -0,0 +1,49 @@
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Quiz.benchmarks import BENCHMARKS, benchmark_database, load_baseline, save_baseline
+
+
+class Command(BaseCommand):
+    help = 'Runs a benchmark of the Quiz app against a throwaway test database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=sorted(BENCHMARKS))
+        parser.add_argument('--sizes', nargs='+', type=int, help='Data sizes to benchmark.')
+        parser.add_argument('--repeat', type=int, help='Runs per measurement (5 by default).')
+        parser.add_argument('--save-baseline', action='store_true',
+                            help='Stores the results as the new baseline instead of checking them against it.')
+        parser.add_argument('--tolerance', type=float, default=0.5,
+                            help='Latency increase over the baseline reported as a slowdown (0.5 = 50%%).')
+
+    def handle(self, *args, **options):
+        benchmark = import_module(BENCHMARKS[options['name']])
+        repeat = options['repeat'] or getattr(benchmark, 'REPEAT', 5)
+        with benchmark_database():
+            headers, rows = benchmark.run(sizes=options['sizes'] or benchmark.SIZES, repeat=repeat)
+        self.write_table(headers, rows)
+        if hasattr(benchmark, 'baseline'):
+            self.check_baseline(options['name'], benchmark, rows, options)
+
+    def check_baseline(self, name, benchmark, rows, options):
+        if options['save_baseline']:
+            save_baseline(name, benchmark.baseline(rows))
+            self.stdout.write(self.style.SUCCESS('Saved the baseline of %s.' % name))
+            return
+        baseline = load_baseline(name)
+        if baseline is None:
+            self.stdout.write('No baseline for %s, run with --save-baseline to store one.' % name)
+            return
+        if hasattr(benchmark, 'slowdowns'):
+            for slowdown in benchmark.slowdowns(rows, baseline, options['tolerance']):
+                self.stdout.write(self.style.WARNING('Slower than the baseline: %s' % slowdown))
+        regressions = benchmark.regressions(rows, baseline)
+        if regressions:
+            raise CommandError('Regressions against the baseline:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regression against the baseline.'))
+
+    def write_table(self, headers, rows):
+        widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+        for row in (headers, *rows):
+            self.stdout.write('  '.join(str(value).rjust(width) for value, width in zip(row, widths)))
@@ -0,0 +1,49 @@
+import os
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from Quiz.importers import PARSERS, import_questions
+from Quiz.models import Quiz, Subject, User
+
+
+class Command(BaseCommand):
+    help = 'Imports questions from a CSV, JSON or JSON lines file into an existing or a new quiz.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file')
+        parser.add_argument('--format', choices=sorted(PARSERS), help='Defaults to the extension of the file.')
+        parser.add_argument('--quiz', type=int, help='Pk of the quiz to import into.')
+        parser.add_argument('--owner', help='Username of the teacher owning the new quiz.')
+        parser.add_argument('--subject', help='Name of the subject of the new quiz.')
+        parser.add_argument('--name', help='Name of the new quiz.')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or os.path.splitext(options['file'])[1].lstrip('.').lower()
+        if file_format not in PARSERS:
+            raise CommandError('Unknown format %r, use --format.' % file_format)
+        quiz = self.get_quiz(options)
+        with open(options['file'], encoding='utf-8', newline='') as file:
+            try:
+                result = import_questions(quiz, file, file_format, batch_size=options['batch_size'])
+            except ValidationError as error:
+                raise CommandError(error.messages[0])
+        self.stdout.write(self.style.SUCCESS(
+            'Imported %d questions and %d choices into quiz %d in %.2f s (%d questions/s).'
+            % (result.questions, result.choices, quiz.pk, result.seconds, result.questions_per_second)
+        ))
+
+    def get_quiz(self, options):
+        if options['quiz']:
+            try:
+                return Quiz.objects.get(pk=options['quiz'])
+            except Quiz.DoesNotExist:
+                raise CommandError('Quiz %d does not exist.' % options['quiz'])
+        if not (options['owner'] and options['subject'] and options['name']):
+            raise CommandError('Give either --quiz or --owner, --subject and --name.')
+        owner = User.objects.filter(username=options['owner'], is_teacher=True).first()
+        subject = Subject.objects.filter(name=options['subject']).first()
+        if not owner or not subject:
+            raise CommandError('Unknown teacher or subject.')
+        return Quiz.objects.create(owner=owner, subject=subject, name=options['name'])
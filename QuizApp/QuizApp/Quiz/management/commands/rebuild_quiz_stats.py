@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from Quiz.models import Quiz
+from Quiz.stats import rebuild_quiz_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the statistics of the given quizzes (all quizzes by default) from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_ids', nargs='*', type=int)
+
+    def handle(self, *args, **options):
+        quiz_ids = options['quiz_ids'] or Quiz.objects.values_list('pk', flat=True)
+        for quiz_id in quiz_ids:
+            rebuild_quiz_stats(quiz_id)
+        self.stdout.write(self.style.SUCCESS('Rebuilt the statistics of %d quizzes.' % len(quiz_ids)))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from Quiz.models import Quiz
+from Quiz.regrading import regrade_quiz
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the scores of the attempts of the given quizzes (all quizzes by default) from their answers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_ids', nargs='*', type=int)
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Attempts graded per query.')
+
+    def handle(self, *args, **options):
+        quizzes = Quiz.objects.order_by('pk')
+        if options['quiz_ids']:
+            quizzes = quizzes.filter(pk__in=options['quiz_ids'])
+        quizzes = list(quizzes)
+        changed = sum(regrade_quiz(quiz, chunk_size=options['chunk_size']) for quiz in quizzes)
+        self.stdout.write(self.style.SUCCESS('Regraded %d quizzes, %d scores changed.' % (len(quizzes), changed)))
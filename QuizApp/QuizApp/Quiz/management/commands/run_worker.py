@@ -0,0 +1,45 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from Quiz.jobs import claim_job, get_jobs_settings, release_job, run_job
+
+
+class Command(BaseCommand):
+    help = ('Runs the queued jobs (deleting, regrading and exporting quizzes, computing their item analysis), polling the '
+            'queue until interrupted.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Runs the queued jobs, then exits.')
+
+    def handle(self, *args, **options):
+        poll_interval = get_jobs_settings()['POLL_INTERVAL']
+        job = None
+        # Stopped by the process manager (SIGTERM) as with Ctrl+C: the running job is queued again.
+        previous_handler = signal.signal(signal.SIGTERM, self.interrupt)
+        try:
+            while True:
+                # Connections are reused between jobs as between requests.
+                close_old_connections()
+                job = claim_job()
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                self.stdout.write('Running job %d: %s' % (job.pk, job.description))
+                run_job(job)
+                style = self.style.SUCCESS if job.status == job.DONE else self.style.ERROR
+                self.stdout.write(style('Job %d %s: %s' % (job.pk, job.status, job.result)))
+                job = None
+        except KeyboardInterrupt:
+            if job is not None:
+                release_job(job)
+                self.stdout.write('Job %d queued again.' % job.pk)
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
+
+    def interrupt(self, signum, frame):
+        raise KeyboardInterrupt
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from Quiz.benchmarks.data import seed
+
+
+class Command(BaseCommand):
+    help = 'Fills the database with generated teachers, students, subjects, quizzes and attempts for load testing.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teachers', type=int, default=10)
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--subjects', type=int, default=5)
+        parser.add_argument('--quizzes', type=int, default=50)
+        parser.add_argument('--questions', type=int, default=20, help='Questions per quiz.')
+        parser.add_argument('--choices', type=int, default=4, help='Choices per question, the first one is correct.')
+        parser.add_argument('--attempts', type=int, default=100, help='Students who took each quiz.')
+        parser.add_argument('--password', help='Password of the generated users, unusable by default.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        counts = {name: options[name] for name in ('teachers', 'students', 'subjects', 'quizzes', 'questions',
+                                                   'choices', 'attempts')}
+        if min(counts.values()) < 0 or min(counts['teachers'], counts['subjects']) < 1:
+            raise CommandError('Counts must be positive, with at least one teacher and one subject.')
+        start = time.perf_counter()
+        with transaction.atomic():
+            seed(password=options['password'], batch_size=options['batch_size'], **counts)
+        self.stdout.write(self.style.SUCCESS(
+            'Created %(teachers)d teachers, %(students)d students, %(subjects)d subjects and %(quizzes)d quizzes '
+            'of %(questions)d questions taken by %(attempts)d students each' % counts
+            + ' in %.2f s.' % (time.perf_counter() - start)
+        ))
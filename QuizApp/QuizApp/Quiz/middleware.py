@@ -0,0 +1,128 @@
+import asyncio
+import heapq
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('Quiz.queries')
+
+DEFAULT_QUERY_INSTRUMENTATION = {
+    'SLOWEST_QUERIES': 3,
+    'SLOW_QUERY_MS': 100,
+    'N_PLUS_ONE_THRESHOLD': 10,
+}
+
+
+class QueryRecorder:
+    '''
+        Database execute wrapper recording the number of queries, their total duration, the slowest statements and
+        how many times each statement was run.
+    '''
+    def __init__(self, slowest_queries):
+        self.slowest_queries = slowest_queries
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.duration += duration
+            # Parameters are left out: the same statement run with different values counts as a repeat.
+            self.statements[sql] += 1
+            entry = (duration, self.count, sql)
+            if len(self.slowest) < self.slowest_queries:
+                heapq.heappush(self.slowest, entry)
+            elif self.slowest and entry > self.slowest[0]:
+                heapq.heapreplace(self.slowest, entry)
+
+
+class QueryInstrumentationMiddleware:
+    '''
+        Records the SQL queries of every request. The query count and database time are sent in a Server-Timing
+        header and logged as a JSON line on the Quiz.queries logger: at INFO level, or at WARNING level when a query
+        is slower than SLOW_QUERY_MS or the same statement is run at least N_PLUS_ONE_THRESHOLD times (a probable
+        N+1 pattern). Configured with the QUIZ_QUERY_INSTRUMENTATION setting.
+        Queries run while a streaming response is consumed are not recorded.
+        Supports both sync and async middleware chains, so that async views are served without a thread under ASGI.
+    '''
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = dict(DEFAULT_QUERY_INSTRUMENTATION, **getattr(settings, 'QUIZ_QUERY_INSTRUMENTATION', {}))
+        if asyncio.iscoroutinefunction(self.get_response):
+            # Marks the instance as a coroutine function for the handler, as django.utils.deprecation.MiddlewareMixin.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        recorder = QueryRecorder(self.config['SLOWEST_QUERIES'])
+        start = time.perf_counter()
+        with self.record(recorder):
+            response = self.get_response(request)
+        return self.process_response(request, response, recorder, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder(self.config['SLOWEST_QUERIES'])
+        start = time.perf_counter()
+        # Async views run their queries through sync_to_async, on the connections of the thread it runs the request's
+        # sync code in: the recorder is installed there rather than on the event loop thread.
+        stack = await sync_to_async(self.record)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.process_response(request, response, recorder, time.perf_counter() - start)
+
+    def record(self, recorder):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def process_response(self, request, response, recorder, duration):
+        response['Server-Timing'] = 'db;dur=%.2f;desc="%d queries", total;dur=%.2f' % (
+            recorder.duration * 1000, recorder.count, duration * 1000
+        )
+        self.log(request, response, recorder, duration)
+        return response
+
+    def log(self, request, response, recorder, duration):
+        repeated = [
+            {'count': count, 'sql': sql}
+            for sql, count in recorder.statements.most_common()
+            if count >= self.config['N_PLUS_ONE_THRESHOLD']
+        ]
+        slowest = [
+            {'ms': round(query_duration * 1000, 2), 'sql': sql}
+            for query_duration, _, sql in sorted(recorder.slowest, reverse=True)
+        ]
+        slow = any(query['ms'] >= self.config['SLOW_QUERY_MS'] for query in slowest)
+        level = logging.WARNING if repeated or slow else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        logger.log(level, json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': getattr(request.resolver_match, 'view_name', None),
+            'status': response.status_code,
+            'ms': round(duration * 1000, 2),
+            'queries': recorder.count,
+            'db_ms': round(recorder.duration * 1000, 2),
+            'slowest': slowest,
+            'n_plus_one': repeated,
+        }))
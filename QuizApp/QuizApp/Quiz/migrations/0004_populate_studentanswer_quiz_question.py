@@ -0,0 +1,46 @@
+from django.db import migrations
+
+
+def populate_quiz_and_question(apps, schema_editor):
+    '''
+        Every answer gets the question (and quiz) of its chosen choices. Answers without any choice can't be
+        linked to a question and are deleted. If a student answered the same question more than once, only the
+        first answer is kept.
+    '''
+    StudentAnswer = apps.get_model('Quiz', 'StudentAnswer')
+    Choice = StudentAnswer.answer.through
+    rows = Choice.objects \
+        .order_by('studentanswer_id') \
+        .values_list('studentanswer_id', 'choice__question_id', 'choice__question__quiz_id') \
+        .distinct()
+    questions = {}
+    for answer_pk, question_pk, quiz_pk in rows.iterator():
+        questions.setdefault(answer_pk, (question_pk, quiz_pk))
+
+    seen = set()
+    duplicates = []
+    batch = []
+    for answer in StudentAnswer.objects.filter(pk__in=questions.keys()).order_by('pk').iterator():
+        answer.question_id, answer.quiz_id = questions[answer.pk]
+        if (answer.student_id, answer.question_id) in seen:
+            duplicates.append(answer.pk)
+            continue
+        seen.add((answer.student_id, answer.question_id))
+        batch.append(answer)
+        if len(batch) >= 500:
+            StudentAnswer.objects.bulk_update(batch, ['question', 'quiz'])
+            batch = []
+    StudentAnswer.objects.bulk_update(batch, ['question', 'quiz'])
+    StudentAnswer.objects.filter(pk__in=duplicates).delete()
+    StudentAnswer.objects.filter(question__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Quiz', '0003_studentanswer_quiz_question'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_quiz_and_question, migrations.RunPython.noop),
+    ]
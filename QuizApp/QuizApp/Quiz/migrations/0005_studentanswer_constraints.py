@@ -0,0 +1,32 @@
+# Generated by Django 4.1.7 on 2026-10-18 09:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Quiz', '0004_populate_studentanswer_quiz_question'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studentanswer',
+            name='question',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_answers', to='Quiz.question'),
+        ),
+        migrations.AlterField(
+            model_name='studentanswer',
+            name='quiz',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_answers', to='Quiz.quiz'),
+        ),
+        migrations.AddIndex(
+            model_name='studentanswer',
+            index=models.Index(fields=['student', 'quiz'], name='studentanswer_student_quiz_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='studentanswer',
+            constraint=models.UniqueConstraint(fields=('student', 'question'), name='unique_student_question_answer'),
+        ),
+    ]
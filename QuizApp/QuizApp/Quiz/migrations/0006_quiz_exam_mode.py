@@ -0,0 +1,18 @@
+# Generated by Django 4.1.7 on 2026-10-18 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Quiz', '0005_studentanswer_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='exam_mode',
+            field=models.BooleanField(default=False, help_text='Show all the questions on a single page, submitted at once.', verbose_name='Exam mode'),
+        ),
+    ]
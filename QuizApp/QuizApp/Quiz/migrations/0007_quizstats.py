@@ -0,0 +1,26 @@
+# Generated by Django 4.1.7 on 2026-10-18 10:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Quiz', '0006_quiz_exam_mode'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizStats',
+            fields=[
+                ('quiz', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='Quiz.quiz')),
+                ('questions_count', models.PositiveIntegerField(default=0)),
+                ('attempts_count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0.0)),
+                ('score_sum_squares', models.FloatField(default=0.0)),
+                ('score_min', models.FloatField(null=True)),
+                ('score_max', models.FloatField(null=True)),
+            ],
+        ),
+    ]
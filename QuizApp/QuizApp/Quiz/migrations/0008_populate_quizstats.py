@@ -0,0 +1,32 @@
+from django.db import migrations
+from django.db.models import Count, F, Max, Min, Sum
+
+
+def populate_quiz_stats(apps, schema_editor):
+    Quiz = apps.get_model('Quiz', 'Quiz')
+    QuizStats = apps.get_model('Quiz', 'QuizStats')
+    TakenQuiz = apps.get_model('Quiz', 'TakenQuiz')
+    scores = TakenQuiz.objects.values('quiz_id').annotate(
+        attempts_count=Count('pk'),
+        score_sum=Sum('score'),
+        score_sum_squares=Sum(F('score') * F('score')),
+        score_min=Min('score'),
+        score_max=Max('score'),
+    )
+    scores = {row.pop('quiz_id'): row for row in scores}
+    quizzes = Quiz.objects.annotate(questions_count=Count('questions')).values_list('pk', 'questions_count')
+    QuizStats.objects.bulk_create(
+        [QuizStats(quiz_id=pk, questions_count=questions_count, **scores.get(pk, {})) for pk, questions_count in quizzes],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Quiz', '0007_quizstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_quiz_stats, migrations.RunPython.noop),
+    ]
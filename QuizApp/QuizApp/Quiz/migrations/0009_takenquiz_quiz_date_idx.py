@@ -0,0 +1,17 @@
+# Generated by Django 4.1.7 on 2026-10-18 10:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Quiz', '0008_populate_quizstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='takenquiz',
+            index=models.Index(fields=['quiz', '-date', '-id'], name='takenquiz_quiz_date_idx'),
+        ),
+    ]
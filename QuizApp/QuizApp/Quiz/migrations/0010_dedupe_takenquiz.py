@@ -0,0 +1,38 @@
+from django.db import migrations
+from django.db.models import Count, F, Max, Min, Sum
+
+
+def delete_duplicate_taken_quizzes(apps, schema_editor):
+    '''
+        Keeps the first attempt of every student at a quiz, before the unique constraint is added. The statistics
+        of the quizzes that had duplicates are recomputed.
+    '''
+    QuizStats = apps.get_model('Quiz', 'QuizStats')
+    TakenQuiz = apps.get_model('Quiz', 'TakenQuiz')
+    duplicates = TakenQuiz.objects.values('student_id', 'quiz_id').annotate(count=Count('pk'), first=Min('pk')) \
+        .filter(count__gt=1)
+    quiz_ids = set()
+    for row in duplicates.iterator():
+        TakenQuiz.objects.filter(student_id=row['student_id'], quiz_id=row['quiz_id']) \
+            .exclude(pk=row['first']).delete()
+        quiz_ids.add(row['quiz_id'])
+    for quiz_id in quiz_ids:
+        scores = TakenQuiz.objects.filter(quiz_id=quiz_id).aggregate(
+            attempts_count=Count('pk'),
+            score_sum=Sum('score'),
+            score_sum_squares=Sum(F('score') * F('score')),
+            score_min=Min('score'),
+            score_max=Max('score'),
+        )
+        QuizStats.objects.filter(quiz_id=quiz_id).update(**scores)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Quiz', '0009_takenquiz_quiz_date_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_taken_quizzes, migrations.RunPython.noop),
+    ]
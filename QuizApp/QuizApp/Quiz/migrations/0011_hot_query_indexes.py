@@ -0,0 +1,21 @@
+# Generated by Django 4.1.7 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Quiz', '0010_dedupe_takenquiz'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='choice',
+            index=models.Index(fields=['question', 'is_correct'], name='choice_question_correct_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='takenquiz',
+            constraint=models.UniqueConstraint(fields=('student', 'quiz'), name='unique_student_taken_quiz'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.1.13 on 2026-10-18 05:45
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Quiz', '0011_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='sample_size',
+            field=models.PositiveIntegerField(blank=True, help_text='Draw this many questions at random for every attempt. Leave empty to ask all the questions.', null=True, validators=[django.core.validators.MinValueValidator(1)], verbose_name='Questions per attempt'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-18 05:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Quiz', '0012_quiz_sample_size'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='takenquiz',
+            index=models.Index(fields=['quiz', '-score'], name='takenquiz_quiz_score_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.1.13 on 2026-10-18 06:15
+
+import Quiz.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Quiz', '0014_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='answer_key_version',
+            field=models.BigIntegerField(default=Quiz.models.new_version, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.1.13 on 2026-10-18 06:18
+
+import Quiz.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Quiz', '0015_quiz_answer_key_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='version',
+            field=models.BigIntegerField(default=Quiz.models.new_version, editable=False),
+        ),
+    ]
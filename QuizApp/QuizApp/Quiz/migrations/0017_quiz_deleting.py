@@ -0,0 +1,18 @@
+# Generated by Django 4.1.13 on 2026-10-18 06:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Quiz', '0016_quiz_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='deleting',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.13 on 2026-10-18 06:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Quiz', '0018_job_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='data',
+            field=models.JSONField(null=True),
+        ),
+    ]
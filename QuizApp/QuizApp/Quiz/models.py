@@ -1,4 +1,9 @@
+import math
+import time
+from functools import lru_cache
+
 from django.contrib.auth.models import AbstractUser
+from django.core.validators import MinValueValidator
 from django.db import models
 from django.utils.html import escape, mark_safe
 
@@ -22,10 +27,36 @@ class Subject(models.Model):
         return self.name
 
     def get_html_badge(self):
-        name = escape(self.name)
-        color = escape(self.color)
-        html = '<span class="badge badge-primary" style="background-color: %s">%s</span>' % (color, name)
-        return mark_safe(html)
+        return render_badge(self.name, self.color)
+
+
+@lru_cache(maxsize=1024)
+def render_badge(name, color):
+    '''
+        HTML badge of a subject, rendered once per process for every name and color: the lists show it on every row.
+        A renamed or recolored subject gets a new entry, so a saved subject never shows a stale badge.
+    '''
+    html = '<span class="badge badge-primary" style="background-color: %s">%s</span>' % (escape(color), escape(name))
+    return mark_safe(html)
+
+
+def new_version():
+    '''
+        A new value for a version column of Quiz: the time in nanoseconds, so that a quiz reusing the pk of a deleted
+        one doesn't reuse its versions.
+    '''
+    return time.time_ns()
+
+
+class QuizQuerySet(models.QuerySet):
+    def editable_by(self, user):
+        '''
+            Quizzes owned by or shared with the user, except those being deleted. Shared quizzes are matched with an
+            indexed subquery on the shared owners table, so this is a single query without joins nor duplicates,
+            whatever the number of quizzes shared with the user.
+        '''
+        shared_quizzes = self.model.shared_owners.through.objects.filter(user=user).values('quiz_id')
+        return self.filter(models.Q(owner=user) | models.Q(pk__in=shared_quizzes), deleting=False)
 
 
 class Quiz(models.Model):
@@ -36,10 +67,42 @@ class Quiz(models.Model):
     name = models.CharField(max_length=255)
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='quizzes')
     shared_owners = models.ManyToManyField(User, related_name='shared_quizzes')
+    exam_mode = models.BooleanField('Exam mode', default=False,
+                                    help_text='Show all the questions on a single page, submitted at once.')
+    sample_size = models.PositiveIntegerField('Questions per attempt', null=True, blank=True,
+                                              validators=[MinValueValidator(1)],
+                                              help_text='Draw this many questions at random for every attempt. '
+                                                        'Leave empty to ask all the questions.')
+    # Version of the quiz, set to a new value when the quiz, its questions, choices or attempts change: the cached
+    # pages showing the quiz are keyed by it (see Quiz.response_cache).
+    version = models.BigIntegerField(default=new_version, editable=False)
+    # Version of the answer key, set to a new value when a question or a choice of the quiz changes: the cached
+    # answer key is keyed by it (see Quiz.scoring.get_answer_key).
+    answer_key_version = models.BigIntegerField(default=new_version, editable=False)
+    # Set while the quiz is deleted by a background job (see Quiz.deletion.hide_quiz): it is hidden from the
+    # students and the teachers.
+    deleting = models.BooleanField(default=False, editable=False)
+
+    # Only changed with update(), so that saving a quiz loaded before a change doesn't revert them.
+    UPDATE_ONLY_FIELDS = ('version', 'answer_key_version', 'deleting')
+
+    objects = QuizQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        if update_fields is None and not force_insert and not self._state.adding:
+            update_fields = [field.name for field in self._meta.concrete_fields
+                             if not field.primary_key and field.name not in self.UPDATE_ONLY_FIELDS]
+        super().save(force_insert, force_update, using, update_fields)
+
+    def get_questions_count(self, pool_size):
+        '''
+            Number of questions of an attempt, given the number of questions of the quiz.
+        '''
+        return pool_size if self.sample_size is None else min(self.sample_size, pool_size)
+
 
 class Question(models.Model):
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='questions')
@@ -56,6 +119,12 @@ class Choice(models.Model):
     text = models.CharField('Choice', max_length=255)
     is_correct = models.BooleanField('Correct choice', default=False)
 
+    class Meta:
+        indexes = [
+            # Answer key of the questions when scoring: the correct choices of a question are read from the index.
+            models.Index(fields=['question', 'is_correct'], name='choice_question_correct_idx'),
+        ]
+
     def __str__(self):
         return self.text
 
@@ -66,9 +135,7 @@ class Student(models.Model):
     interests = models.ManyToManyField(Subject, related_name='interested_students')
 
     def get_unanswered_questions(self, quiz):
-        answered_questions = self.quiz_answers \
-            .filter(answer__question__quiz=quiz) \
-            .values_list('answer__question__pk', flat=True)
+        answered_questions = self.quiz_answers.filter(quiz=quiz).values_list('question_id', flat=True)
         questions = quiz.questions.exclude(pk__in=answered_questions).order_by('text')
         return questions
 
@@ -85,12 +152,115 @@ class TakenQuiz(models.Model):
     score = models.FloatField()
     date = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Results of a quiz, most recent first (keyset pagination on date and id).
+            models.Index(fields=['quiz', '-date', '-id'], name='takenquiz_quiz_date_idx'),
+            # Leaderboard of a quiz, best scores first.
+            models.Index(fields=['quiz', '-score'], name='takenquiz_quiz_score_idx'),
+        ]
+        constraints = [
+            # A quiz is taken once; also the index of the "already taken" checks.
+            models.UniqueConstraint(fields=['student', 'quiz'], name='unique_student_taken_quiz'),
+        ]
+
+
+class QuizStats(models.Model):
+    '''
+        Statistics of a quiz, maintained incrementally when a TakenQuiz is created or a question is added or deleted
+        (see Quiz.signals) so that listing and results pages don't aggregate over every attempt.
+        Rebuilt from scratch with the rebuild_quiz_stats management command.
+    '''
+    quiz = models.OneToOneField(Quiz, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    questions_count = models.PositiveIntegerField(default=0)
+    attempts_count = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0.0)
+    score_sum_squares = models.FloatField(default=0.0)
+    score_min = models.FloatField(null=True)
+    score_max = models.FloatField(null=True)
+
+    @property
+    def average_score(self):
+        if not self.attempts_count:
+            return None
+        return self.score_sum / self.attempts_count
+
+    @property
+    def score_stddev(self):
+        if not self.attempts_count:
+            return None
+        variance = self.score_sum_squares / self.attempts_count - self.average_score ** 2
+        return math.sqrt(max(variance, 0.0))
+
 
 class StudentAnswer(models.Model):
     '''
         This refers to Student's answer in quiz. The answer can have multiple choices. Score is awarded based on this answer.
         The Answer is correct only if all the choices marked by the student are correct choices and no correct choice is left in the actual answer.
-        No partial marking/negative marking .
+        No partial marking/negative marking by default (see Quiz.scoring).
+        The quiz and the question are stored on the answer so that answered questions, progress and scoring are
+        looked up by index instead of joining through the chosen choices.
     '''
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='quiz_answers')
-    answer = models.ManyToManyField(Choice, related_name='+')
\ No newline at end of file
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='student_answers')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='student_answers')
+    answer = models.ManyToManyField(Choice, related_name='+')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'question'], name='unique_student_question_answer'),
+        ]
+        indexes = [
+            models.Index(fields=['student', 'quiz'], name='studentanswer_student_quiz_idx'),
+        ]
+
+
+class Job(models.Model):
+    '''
+        Heavy teacher operation (deleting or regrading a quiz, exporting its results, computing its item analysis)
+        queued in the database and run by the run_worker management command (see Quiz.jobs). The worker reports the
+        progress of the job as the number of rows processed out of total.
+    '''
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    kind = models.CharField(max_length=30)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='jobs')
+    # Kept when the job deletes the quiz, the description names it.
+    quiz = models.ForeignKey(Quiz, on_delete=models.SET_NULL, null=True, related_name='jobs')
+    description = models.CharField(max_length=255)
+    params = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True)
+    result = models.TextField(blank=True)
+    # Name of the file written by the job in QUIZ_JOBS['OUTPUT_DIR'], e.g. an export.
+    output = models.CharField(max_length=255, blank=True)
+    # Result computed by the job and shown in a page, e.g. an item analysis.
+    data = models.JSONField(null=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True)
+    # Last sign of life of the worker running the job, updated with its progress.
+    heartbeat = models.DateTimeField(null=True)
+    finished = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            # Next queued job of the worker.
+            models.Index(fields=['status', 'id'], name='job_status_idx'),
+        ]
+
+    @property
+    def percent(self):
+        if self.status == self.DONE:
+            return 100
+        if not self.total:
+            return 0
+        return min(100, self.progress * 100 // self.total)
+
+    @property
+    def finished_running(self):
+        return self.status in (self.DONE, self.FAILED)
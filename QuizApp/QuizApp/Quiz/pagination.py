@@ -0,0 +1,46 @@
+'''
+    Keyset (cursor) pagination. Pages are fetched with a WHERE clause on the last row of the previous page instead of
+    an OFFSET, so every page costs the same whatever its position, as long as an index covers the ordering.
+'''
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from django.http import Http404
+
+
+def encode_cursor(date, pk):
+    value = '%s|%d' % (date.isoformat(), pk)
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        date, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(date), int(pk)
+    except ValueError:
+        raise Http404('Invalid cursor')
+
+
+class DateKeysetPaginator:
+    '''
+        Paginates a queryset from the most recent ``date`` backwards, ties broken by descending pk.
+    '''
+    def __init__(self, queryset, page_size):
+        self.queryset = queryset.order_by('-date', '-pk')
+        self.page_size = page_size
+
+    def page(self, cursor=None):
+        '''
+            Returns the rows after ``cursor`` (the first page if None) and the cursor of the next page, None on the
+            last page.
+        '''
+        queryset = self.queryset
+        if cursor:
+            date, pk = decode_cursor(cursor)
+            queryset = queryset.filter(Q(date__lt=date) | Q(date=date, pk__lt=pk))
+        rows = list(queryset[:self.page_size + 1])
+        if len(rows) <= self.page_size:
+            return rows, None
+        last = rows[self.page_size - 1]
+        return rows[:self.page_size], encode_cursor(last.date, last.pk)
@@ -0,0 +1,55 @@
+'''
+    Regrading of the attempts of a quiz after its answer key changed, e.g. when a choice wrongly marked as correct
+    is fixed. Attempts are read in chunks of pks: the choices selected in a chunk are loaded with one query, graded
+    with the compiled answer key (see Quiz.scoring) and the changed scores are written with one bulk_update.
+'''
+from Quiz.leaderboard import invalidate_scores
+from Quiz.models import TakenQuiz
+from Quiz.response_cache import bump_quiz_versions
+from Quiz.scoring import get_answer_key, get_scoring_scheme, load_students_selections
+from Quiz.stats import rebuild_quiz_stats
+
+
+def regrade_quiz(quiz, scheme=None, chunk_size=2000, progress=None):
+    '''
+        Recomputes the score of every attempt of the quiz and its statistics. Returns the number of attempts whose
+        score changed. Every attempt is graded over the questions it answered: questions added to the quiz
+        since weren't shown to the student.
+        Every chunk is committed on its own, so that regrading a large quiz doesn't hold the database lock; callers
+        wanting all or nothing run it in a transaction. ``progress`` is called with the number of attempts graded
+        so far and the number of attempts.
+    '''
+    if scheme is None:
+        scheme = get_scoring_scheme()
+    # The answer key may have changed since the quiz was loaded, e.g. by the view saving the choices.
+    quiz.refresh_from_db(fields=['answer_key_version'])
+    answer_key = get_answer_key(quiz)
+    attempts = TakenQuiz.objects.filter(quiz=quiz).order_by('pk').only('pk', 'student_id', 'score')
+    total = attempts.count() if progress is not None else None
+    changed = graded = 0
+    last_pk = 0
+    while True:
+        chunk = list(attempts.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+        selections = load_students_selections(quiz, [attempt.student_id for attempt in chunk])
+        regraded = []
+        for attempt in chunk:
+            student_selections = selections.get(attempt.student_id, {})
+            score = answer_key.score(student_selections, scheme, student_selections)
+            if score != attempt.score:
+                attempt.score = score
+                regraded.append(attempt)
+        # bulk_update doesn't send post_save, the statistics, the sorted scores and the cached pages are updated
+        # below.
+        TakenQuiz.objects.bulk_update(regraded, ['score'])
+        changed += len(regraded)
+        graded += len(chunk)
+        if progress is not None:
+            progress(graded, max(total, graded))
+    if changed:
+        rebuild_quiz_stats(quiz.pk)
+        invalidate_scores(quiz.pk)
+        bump_quiz_versions(quiz.pk)
+    return changed
@@ -0,0 +1,78 @@
+'''
+    Caching of the rendered teacher pages. A page is cached per teacher, URL and CSRF cookie (the rendered forms
+    embed a CSRF token) and versioned by the quizzes it shows: the version of a quiz, stored in the database, changes
+    whenever the quiz, its questions, choices or attempts change (see Quiz.signals), which changes the key of every
+    page showing it in every process. The key is also sent as ETag, so that a browser revalidating an unchanged page
+    gets a 304 without the page being rendered or even read from the cache.
+'''
+import hashlib
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+from Quiz.models import Quiz, new_version
+
+RESPONSE_KEY = 'quiz-response:%s'
+
+
+def get_quiz_versions(quiz_ids):
+    '''
+        Returns {quiz pk: version}, in a single query. Deleted quizzes are left out.
+    '''
+    return dict(Quiz.objects.filter(pk__in=quiz_ids).values_list('pk', 'version'))
+
+
+def bump_quiz_versions(*quiz_ids):
+    # Changed in the transaction of the change: a page rendered before it commits is cached under the old version.
+    quiz_ids = [pk for pk in quiz_ids if pk is not None]
+    if quiz_ids:
+        Quiz.objects.filter(pk__in=quiz_ids).update(version=new_version())
+
+
+def cached_response(request, quiz_ids, render):
+    '''
+        Returns the cached response of the page if any, else the response returned by ``render``, cached if
+        successful. Pages showing messages are neither cached nor served from the cache.
+    '''
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+    if list(get_messages(request)):
+        return render()
+    versions = sorted(get_quiz_versions(quiz_ids).items())
+    key = hashlib.sha256(repr((request.user.pk, request.get_full_path(), csrf_cookie, versions)).encode()).hexdigest()
+    etag = '"%s"' % key
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        cached = cache.get(RESPONSE_KEY % key)
+        if cached is not None:
+            response = HttpResponse(cached['content'], content_type=cached['content_type'])
+        else:
+            response = render()
+            if hasattr(response, 'render'):
+                response.render()
+            if response.status_code != 200 or (not csrf_cookie and request.META.get('CSRF_COOKIE_NEEDS_UPDATE')):
+                # The page embeds a CSRF token of a cookie the browser doesn't have yet, it can't be reused.
+                return response
+            cache.set(RESPONSE_KEY % key, {'content': response.content, 'content_type': response['Content-Type']},
+                      getattr(settings, 'QUIZ_RESPONSE_CACHE_TIMEOUT', None))
+    response['ETag'] = etag
+    # Browsers keep the page but revalidate it on every request.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class CachedResponseMixin:
+    '''
+        Serves the GET requests of a view through cached_response, versioned by the quizzes of get_cached_quiz_ids().
+    '''
+    def get_cached_quiz_ids(self):
+        return [self.kwargs['pk']]
+
+    def get(self, request, *args, **kwargs):
+        return cached_response(request, self.get_cached_quiz_ids(), lambda: super(CachedResponseMixin, self).get(
+            request, *args, **kwargs
+        ))
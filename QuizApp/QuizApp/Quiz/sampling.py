@@ -0,0 +1,59 @@
+'''
+    Random sampling of the questions of an attempt, for quizzes with a sample_size (question banks). The pks of the
+    questions of a quiz are cached as a list, so a sample of K questions is drawn in O(K) without scanning the
+    questions table (ORDER BY RANDOM() reads and sorts the whole pool). The list is invalidated by signals
+    (see Quiz.signals) when a question is added or deleted.
+'''
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from Quiz.models import Question
+
+QUESTION_IDS_KEY = 'quiz-question-ids:%d'
+
+
+def get_question_ids(quiz_id):
+    '''
+        Returns the pks of the questions of the quiz. Loaded with a single query when missing from the cache.
+    '''
+    key = QUESTION_IDS_KEY % quiz_id
+    question_ids = cache.get(key)
+    if question_ids is None:
+        question_ids = list(Question.objects.filter(quiz_id=quiz_id).order_by('pk').values_list('pk', flat=True))
+        cache.set(key, question_ids, getattr(settings, 'QUIZ_CATALOG_TIMEOUT', None))
+    return question_ids
+
+
+async def aget_question_ids(quiz_id):
+    key = QUESTION_IDS_KEY % quiz_id
+    question_ids = await cache.aget(key)
+    if question_ids is None:
+        queryset = Question.objects.filter(quiz_id=quiz_id).order_by('pk').values_list('pk', flat=True)
+        question_ids = [pk async for pk in queryset]
+        await cache.aset(key, question_ids, getattr(settings, 'QUIZ_CATALOG_TIMEOUT', None))
+    return question_ids
+
+
+def sample_questions(question_ids, sample_size, answered_ids=(), rng=random):
+    '''
+        Draws the questions still to answer in an attempt of ``sample_size`` questions out of ``question_ids``, in
+        random order. The questions already answered count towards the sample and are never drawn again.
+    '''
+    count = sample_size - len(answered_ids)
+    if count <= 0:
+        return []
+    if answered_ids:
+        # Only when an attempt is rebuilt, e.g. after a question of the quiz was deleted.
+        answered_ids = set(answered_ids)
+        question_ids = [pk for pk in question_ids if pk not in answered_ids]
+    return rng.sample(question_ids, min(count, len(question_ids)))
+
+
+def invalidate_question_ids(quiz_id):
+    key = QUESTION_IDS_KEY % quiz_id
+    cache.delete(key)
+    # Deleted again on commit, in case a concurrent request cached the list before the change was committed.
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,179 @@
+'''
+    Scoring of quiz attempts. The answer key of a quiz is compiled to bitmasks and cached (see CompiledAnswerKey);
+    the choices selected by a student are loaded with a single query and graded in memory.
+'''
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from Quiz.models import Question, Quiz, StudentAnswer, new_version
+
+ANSWER_KEY_KEY = 'quiz-answer-key:%d:%d'
+
+
+class ScoringScheme:
+    '''
+        Base class for scoring schemes. For every question ``mark`` receives the number of correct choices the
+        student selected, the number of wrong choices selected, the number of correct choices of the question and
+        its total number of choices. It returns the marks awarded for the question, 1.0 being full marks.
+    '''
+    def mark(self, hits, wrong, correct_count, choices_count):
+        raise NotImplementedError
+
+
+class AllOrNothingScheme(ScoringScheme):
+    '''
+        The answer is correct only if all the correct choices and no wrong choice are selected.
+    '''
+    def mark(self, hits, wrong, correct_count, choices_count):
+        return 1.0 if hits == correct_count and not wrong else 0.0
+
+
+class PartialScheme(ScoringScheme):
+    '''
+        Every correct choice selected is worth a fraction of the question, every wrong choice selected cancels
+        one correct choice. A question never scores below zero.
+    '''
+    def mark(self, hits, wrong, correct_count, choices_count):
+        if not correct_count:
+            return 0.0
+        return max(hits - wrong, 0) / correct_count
+
+
+class NegativeMarkingScheme(AllOrNothingScheme):
+    '''
+        All or nothing, but a wrong answer costs ``penalty`` marks. The total score of a quiz never goes below zero.
+    '''
+    def __init__(self, penalty=0.25):
+        self.penalty = penalty
+
+    def mark(self, hits, wrong, correct_count, choices_count):
+        if super().mark(hits, wrong, correct_count, choices_count):
+            return 1.0
+        return -self.penalty
+
+
+def get_scoring_scheme():
+    return import_string(getattr(settings, 'QUIZ_SCORING_SCHEME', 'Quiz.scoring.AllOrNothingScheme'))()
+
+
+def load_selections(student, quiz):
+    '''
+        Returns {question pk: set of choice pks selected by the student} for the quiz, in a single query.
+    '''
+    selections = {}
+    rows = StudentAnswer.answer.through.objects \
+        .filter(studentanswer__student=student, studentanswer__quiz=quiz) \
+        .values_list('studentanswer__question_id', 'choice_id')
+    for question_pk, choice_pk in rows:
+        selections.setdefault(question_pk, set()).add(choice_pk)
+    return selections
+
+
+def load_students_selections(quiz, student_ids):
+    '''
+        Returns {student pk: {question pk: set of selected choice pks}} for the given students, in a single query.
+        Every question answered is included, with an empty set if the choices selected were deleted since.
+    '''
+    selections = {}
+    rows = StudentAnswer.objects \
+        .filter(student_id__in=student_ids, quiz=quiz) \
+        .values_list('student_id', 'question_id', 'answer')
+    for student_pk, question_pk, choice_pk in rows:
+        question_selections = selections.setdefault(student_pk, {}).setdefault(question_pk, set())
+        if choice_pk is not None:
+            question_selections.add(choice_pk)
+    return selections
+
+
+class CompiledAnswerKey:
+    '''
+        Answer key of a quiz compiled to bitmasks. The choices of every question are numbered in pk order, a set of
+        choices of a question is the int with the bits of these choices set: grading a selection takes two bitwise
+        operations and two bit counts, whatever the number of choices.
+    '''
+    def __init__(self, rows):
+        '''
+            ``rows`` are (question pk, choice pk or None, is_correct) tuples, ordered by choice pk.
+        '''
+        self.bits = {}
+        self.correct = {}
+        self.choices_count = {}
+        for question_pk, choice_pk, is_correct in rows:
+            self.correct.setdefault(question_pk, 0)
+            self.choices_count.setdefault(question_pk, 0)
+            if choice_pk is None:
+                continue
+            bit = 1 << self.choices_count[question_pk]
+            self.bits[choice_pk] = bit
+            self.choices_count[question_pk] += 1
+            if is_correct:
+                self.correct[question_pk] |= bit
+
+    def is_correct(self, question_pk, choice_pks):
+        '''
+            Whether the choices are exactly the correct choices of the question.
+        '''
+        return question_pk in self.correct and self.mask(choice_pks) == self.correct[question_pk]
+
+    def mask(self, choice_pks):
+        mask = 0
+        for choice_pk in choice_pks:
+            mask |= self.bits.get(choice_pk, 0)
+        return mask
+
+    def score(self, selections, scheme, question_ids=None):
+        '''
+            Score in percent, rounded to two decimals, of the selections {question pk: selected choice pks} over
+            every question of the quiz, or only the given ``question_ids``.
+        '''
+        if question_ids is None:
+            question_ids = self.correct
+        else:
+            question_ids = [pk for pk in question_ids if pk in self.correct]
+        if not question_ids:
+            return 0.0
+        marks = 0.0
+        for question_pk in question_ids:
+            correct = self.correct[question_pk]
+            selected = self.mask(selections.get(question_pk, ()))
+            marks += scheme.mark((selected & correct).bit_count(), (selected & ~correct).bit_count(),
+                                 correct.bit_count(), self.choices_count[question_pk])
+        return round((max(marks, 0) / len(question_ids)) * 100.0, 2)
+
+
+def answer_key_rows(quiz_id):
+    # The rows of CompiledAnswerKey, in a single query.
+    return Question.objects \
+        .filter(quiz_id=quiz_id) \
+        .order_by('choices__pk') \
+        .values_list('pk', 'choices__pk', 'choices__is_correct')
+
+
+def get_answer_key(quiz):
+    '''
+        Returns the CompiledAnswerKey of the quiz, loaded with a single query when missing from the cache. It is
+        cached under the answer_key_version of the quiz, which the signals (see Quiz.signals) change in the database
+        when a question or a choice of the quiz changes: every process then loads the new key, whatever the cache
+        backend. The quiz must have been loaded after the change.
+    '''
+    key = ANSWER_KEY_KEY % (quiz.pk, quiz.answer_key_version)
+    answer_key = cache.get(key)
+    if answer_key is None:
+        answer_key = CompiledAnswerKey(answer_key_rows(quiz.pk))
+        cache.set(key, answer_key, getattr(settings, 'QUIZ_CATALOG_TIMEOUT', None))
+    return answer_key
+
+
+def invalidate_answer_key(*quiz_ids):
+    # The keys of the previous versions are no longer read, they expire.
+    Quiz.objects.filter(pk__in=quiz_ids).update(answer_key_version=new_version())
+
+
+def score_quiz(student, quiz, scheme=None, question_ids=None):
+    '''
+        Score of the student on the quiz, over ``question_ids`` only if given (the questions of the attempt).
+    '''
+    if scheme is None:
+        scheme = get_scoring_scheme()
+    return get_answer_key(quiz).score(load_selections(student, quiz), scheme, question_ids)
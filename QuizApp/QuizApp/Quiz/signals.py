@@ -0,0 +1,192 @@
+import threading
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from Quiz.catalog import invalidate_quiz_catalog, invalidate_subject_catalogs
+from Quiz.leaderboard import invalidate_scores, record_score
+from Quiz.models import Choice, Question, Quiz, QuizStats, Subject, TakenQuiz
+from Quiz.response_cache import bump_quiz_versions
+from Quiz.sampling import invalidate_question_ids
+from Quiz.scoring import invalidate_answer_key
+from Quiz.stats import rebuild_quiz_stats, record_attempt, record_questions
+
+
+class DeletingQuizzes(threading.local):
+    '''
+        Quizzes being deleted by the thread, with the pks of their questions. The attempts, questions and choices
+        deleted with a quiz don't update its statistics and caches one row at a time: they are dropped with the quiz.
+    '''
+    def __init__(self):
+        self.quizzes = {}
+
+
+_deleting = DeletingQuizzes()
+
+
+def deleted_with_quiz(instance):
+    if isinstance(instance, Choice):
+        return any(instance.question_id in question_ids for question_ids in _deleting.quizzes.values())
+    return instance.quiz_id in _deleting.quizzes
+
+
+def end_quiz_deletion(quiz_pk):
+    '''
+        Forgets that the quiz is being deleted. Called in a finally clause around the delete: a failed delete
+        doesn't send post_delete, and the rows of the quiz would otherwise never update its caches again.
+    '''
+    _deleting.quizzes.pop(quiz_pk, None)
+
+
+@receiver(pre_delete, sender=Quiz)
+def mark_quiz_deleting(sender, instance, **kwargs):
+    # Sent before any related row is deleted.
+    _deleting.quizzes[instance.pk] = set(Question.objects.filter(quiz=instance).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Quiz)
+def clear_quiz_on_delete(sender, instance, **kwargs):
+    end_quiz_deletion(instance.pk)
+    invalidate_question_ids(instance.pk)
+    invalidate_scores(instance.pk)
+
+
+@receiver(post_save, sender=Quiz)
+def create_quiz_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        QuizStats.objects.get_or_create(quiz=instance)
+
+
+@receiver(post_save, sender=TakenQuiz)
+def update_stats_on_attempt(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_attempt(instance)
+
+
+@receiver(post_delete, sender=TakenQuiz)
+def update_stats_on_attempt_delete(sender, instance, **kwargs):
+    # Minimum and maximum can't be maintained on removal, the stats of the quiz are recomputed.
+    if not deleted_with_quiz(instance) and QuizStats.objects.filter(quiz_id=instance.quiz_id).exists():
+        rebuild_quiz_stats(instance.quiz_id)
+
+
+@receiver(post_save, sender=TakenQuiz)
+def update_scores_on_attempt(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_score(instance.quiz_id, instance.score)
+
+
+@receiver(post_delete, sender=TakenQuiz)
+def invalidate_scores_on_attempt_delete(sender, instance, **kwargs):
+    if not deleted_with_quiz(instance):
+        invalidate_scores(instance.quiz_id)
+
+
+@receiver(post_save, sender=Question)
+def update_stats_on_question_add(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_questions(instance.quiz_id, 1)
+
+
+@receiver(post_delete, sender=Question)
+def update_stats_on_question_delete(sender, instance, **kwargs):
+    if not deleted_with_quiz(instance):
+        record_questions(instance.quiz_id, -1)
+
+
+@receiver(pre_save, sender=Quiz)
+def invalidate_catalog_on_quiz_move(sender, instance, raw=False, **kwargs):
+    # The quiz leaves the catalog of its former subject.
+    if instance.pk and not raw:
+        invalidate_quiz_catalog(instance.pk)
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def invalidate_catalog_on_quiz_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_subject_catalogs(instance.subject_id)
+
+
+@receiver(post_save, sender=Question)
+def invalidate_catalog_on_question_add(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        invalidate_quiz_catalog(instance.quiz_id)
+
+
+@receiver(post_delete, sender=Question)
+def invalidate_catalog_on_question_delete(sender, instance, **kwargs):
+    if not deleted_with_quiz(instance):
+        invalidate_quiz_catalog(instance.quiz_id)
+
+
+@receiver(post_save, sender=Question)
+def invalidate_question_ids_on_add(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        invalidate_question_ids(instance.quiz_id)
+
+
+@receiver(post_delete, sender=Question)
+def invalidate_question_ids_on_delete(sender, instance, **kwargs):
+    if not deleted_with_quiz(instance):
+        invalidate_question_ids(instance.quiz_id)
+
+
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def invalidate_catalog_on_subject_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_subject_catalogs(instance.pk)
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+@receiver(post_save, sender=TakenQuiz)
+@receiver(post_delete, sender=TakenQuiz)
+def bump_version_on_change(sender, instance, raw=False, **kwargs):
+    if sender is Quiz:
+        # A new quiz starts with a new version.
+        if not raw and not kwargs.get('created'):
+            bump_quiz_versions(instance.pk)
+    elif not raw and not deleted_with_quiz(instance):
+        bump_quiz_versions(instance.quiz_id)
+
+
+@receiver(m2m_changed, sender=Quiz.shared_owners.through)
+def bump_version_on_share(sender, instance, action, reverse, pk_set, **kwargs):
+    if action.startswith('post_'):
+        # Also sent from the teacher side (user.shared_quizzes), instance is then a user.
+        bump_quiz_versions(*(pk_set or []) if reverse else [instance.pk])
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def invalidate_quiz_on_choice_change(sender, instance, raw=False, **kwargs):
+    # The cached pages and the answer key of the quiz.
+    if raw or deleted_with_quiz(instance):
+        return
+    if Choice.question.is_cached(instance):
+        quiz_ids = [instance.question.quiz_id]
+    else:
+        quiz_ids = list(Question.objects.filter(pk=instance.question_id).values_list('quiz_id', flat=True))
+    bump_quiz_versions(*quiz_ids)
+    invalidate_answer_key(*quiz_ids)
+
+
+@receiver(post_save, sender=Question)
+def invalidate_answer_key_on_question_add(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        invalidate_answer_key(instance.quiz_id)
+
+
+@receiver(post_delete, sender=Question)
+def invalidate_answer_key_on_question_delete(sender, instance, **kwargs):
+    if not deleted_with_quiz(instance):
+        invalidate_answer_key(instance.quiz_id)
+
+
+@receiver(post_save, sender=Subject)
+def bump_version_on_subject_change(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        bump_quiz_versions(*instance.quizzes.values_list('pk', flat=True))
@@ -0,0 +1,55 @@
+'''
+    Maintenance of the QuizStats records. Incremental updates are single UPDATE statements with F() expressions,
+    so concurrent attempts never overwrite each other's counts.
+'''
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Max, Min, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from Quiz.models import Question, QuizStats, TakenQuiz
+
+
+def record_attempt(taken_quiz):
+    score = Value(taken_quiz.score, output_field=FloatField())
+    QuizStats.objects.filter(quiz_id=taken_quiz.quiz_id).update(
+        attempts_count=F('attempts_count') + 1,
+        score_sum=F('score_sum') + score,
+        score_sum_squares=F('score_sum_squares') + Value(taken_quiz.score ** 2, output_field=FloatField()),
+        score_min=Least(Coalesce('score_min', score), score),
+        score_max=Greatest(Coalesce('score_max', score), score),
+    )
+
+
+def record_questions(quiz_id, delta):
+    QuizStats.objects.filter(quiz_id=quiz_id).update(questions_count=F('questions_count') + delta)
+
+
+def rebuild_quiz_stats(quiz_id):
+    '''
+        Recomputes the statistics of a quiz from its questions and attempts. Returns them.
+    '''
+    with transaction.atomic():
+        scores = TakenQuiz.objects.filter(quiz_id=quiz_id).aggregate(
+            attempts_count=Count('pk'),
+            score_sum=Coalesce(Sum('score'), 0.0),
+            score_sum_squares=Coalesce(Sum(F('score') * F('score')), 0.0),
+            score_min=Min('score'),
+            score_max=Max('score'),
+        )
+        stats, _ = QuizStats.objects.update_or_create(
+            quiz_id=quiz_id,
+            defaults=dict(scores, questions_count=Question.objects.filter(quiz_id=quiz_id).count())
+        )
+    return stats
+
+
+def get_quiz_stats(quiz):
+    '''
+        The statistics of the quiz, built if it has none: quizzes loaded with loaddata don't get them, raw saves
+        don't send the signal creating them.
+    '''
+    try:
+        return quiz.stats
+    except QuizStats.DoesNotExist:
+        quiz.stats = rebuild_quiz_stats(quiz.pk)
+        return quiz.stats
@@ -0,0 +1,34 @@
+'''
+    Template tags of the quiz pages.
+'''
+from django import template
+from django.conf import settings
+
+from Quiz.response_cache import get_quiz_versions
+
+register = template.Library()
+
+
+@register.simple_tag
+def fragment_cache_timeout():
+    '''
+        Lifetime of the cached blocks of rows, QUIZ_FRAGMENT_CACHE_TIMEOUT seconds.
+    '''
+    return getattr(settings, 'QUIZ_FRAGMENT_CACHE_TIMEOUT', 600)
+
+
+@register.simple_tag
+def quiz_versions(objects):
+    '''
+        Cache key part of a block of rows, for the {% cache %} tag: the pk of every row and the version of its quiz
+        (see Quiz.response_cache), which changes whenever anything a row shows of the quiz changes. The rows are
+        quizzes or objects of a quiz, e.g. taken quizzes. The versions are read with one query. A quiz deleted since
+        its rows were cached (e.g. by another process, whose invalidation this one didn't see) counts as version 0.
+
+            {% quiz_versions quizzes as versions %}
+            {% fragment_cache_timeout as timeout %}
+            {% cache timeout 'quiz-rows' versions %}...{% endcache %}
+    '''
+    rows = [(row.pk, getattr(row, 'quiz_id', row.pk)) for row in objects]
+    versions = get_quiz_versions({quiz_id for _, quiz_id in rows})
+    return ','.join('%d:%d' % (pk, versions.get(quiz_id, 0)) for pk, quiz_id in rows)
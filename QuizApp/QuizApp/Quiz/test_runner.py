@@ -0,0 +1,18 @@
+'''
+    Test runner of the project (TEST_RUNNER), running the tests against the cache of QUIZ_TEST_CACHES rather than the
+    cache of the server: the tests clear the cache and fill it with rows of the test database.
+'''
+from django.conf import settings
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class QuizTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.test_caches = override_settings(CACHES=settings.QUIZ_TEST_CACHES)
+        self.test_caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.test_caches.disable()
+        super().teardown_test_environment(**kwargs)
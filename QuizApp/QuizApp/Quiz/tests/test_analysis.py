@@ -0,0 +1,108 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from Quiz.analysis import get_item_analysis
+from Quiz.jobs import claim_job, run_job
+from Quiz.models import (Quiz, Question, Choice, Job, Student, StudentAnswer,
+                              Subject, User, TakenQuiz)
+
+class ItemAnalysisTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.question1 = Question.objects.create(quiz=self.quiz1, text='question1')
+        self.choice11 = Choice.objects.create(question=self.question1, text='choice11', is_correct=True)
+        self.choice12 = Choice.objects.create(question=self.question1, text='choice12', is_correct=False)
+        self.question2 = Question.objects.create(quiz=self.quiz1, text='question2')
+        self.choice21 = Choice.objects.create(question=self.question2, text='choice21', is_correct=True)
+        self.choice22 = Choice.objects.create(question=self.question2, text='choice22', is_correct=False)
+        # The students answering the first question correctly score higher.
+        self.take(1, 100.0, self.choice11, self.choice21)
+        self.take(2, 50.0, self.choice11, self.choice22)
+        self.take(3, 50.0, self.choice12, self.choice21)
+        self.take(4, 0.0, self.choice12, self.choice22)
+        self.url = reverse('teachers:quiz_item_analysis', args=[self.quiz1.pk])
+        self.client.force_login(self.teacher1)
+
+    def take(self, number, score, *choices):
+        student = Student.objects.create(user=User.objects.create(username='student%d' % number, is_student=True))
+        for choice in choices:
+            student_answer = StudentAnswer.objects.create(student=student, quiz=self.quiz1, question=choice.question)
+            student_answer.answer.add(choice)
+        TakenQuiz.objects.create(student=student, quiz=self.quiz1, score=score)
+        return student
+
+    def test_analysis(self):
+        question1, question2 = get_item_analysis(self.quiz1)
+        self.assertEqual(question1['text'], 'question1')
+        self.assertEqual(question1['answered'], 4)
+        self.assertEqual(question1['percent_correct'], 50.0)
+        self.assertEqual(question1['discrimination'], 0.71)
+        self.assertEqual([(choice['picks'], choice['percent']) for choice in question1['choices']],
+                         [(2, 50.0), (2, 50.0)])
+        self.assertEqual(question2['discrimination'], 0.71)
+
+    def test_cached_until_the_next_attempt(self):
+        get_item_analysis(self.quiz1)
+        # The version of the quiz only.
+        with self.assertNumQueries(1):
+            get_item_analysis(self.quiz1)
+        # Didn't answer the second question.
+        self.take(5, 0.0, self.choice12)
+        question1, question2 = get_item_analysis(self.quiz1)
+        self.assertEqual(question1['answered'], 5)
+        self.assertEqual(question1['percent_correct'], 40.0)
+        self.assertEqual(question2['answered'], 4)
+
+    def test_undefined_statistics(self):
+        TakenQuiz.objects.all().delete()
+        question1, _ = get_item_analysis(self.quiz1)
+        self.assertIsNone(question1['percent_correct'])
+        self.assertIsNone(question1['discrimination'])
+
+    def test_view(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Discrimination: 0.71')
+        self.assertContains(response, 'choice12')
+        other_teacher = User.objects.create(username='teacher2', is_teacher=True)
+        self.client.force_login(other_teacher)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_without_numpy(self):
+        with mock.patch('Quiz.analysis.np', None):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'requires NumPy')
+
+    @override_settings(QUIZ_JOBS={'INLINE_ATTEMPTS': 0})
+    def test_computed_in_background(self):
+        self.assertContains(self.client.get(self.url), 'is being computed')
+        # Already queued, then running.
+        self.assertContains(self.client.get(self.url), 'is being computed')
+        job = claim_job()
+        self.assertContains(self.client.get(self.url), 'is being computed')
+        self.assertEqual(Job.objects.get(kind='item_analysis'), job)
+        run_job(job)
+        job.refresh_from_db()
+        # 8 selected choices.
+        self.assertEqual((job.progress, job.total), (8, 8))
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Discrimination: 0.71')
+        self.assertNotContains(response, 'is being updated')
+        self.assertEqual(Job.objects.filter(status=Job.QUEUED).count(), 0)
+
+        # The last analysis is shown until the next one is computed.
+        self.take(5, 0.0, self.choice12)
+        response = self.client.get(self.url)
+        self.assertContains(response, 'is being updated')
+        self.assertContains(response, 'Answered in <strong>4</strong> attempts')
+        call_command('run_worker', '--once', stdout=StringIO())
+        self.assertEqual(Job.objects.filter(kind='item_analysis', status=Job.DONE).exclude(pk=job.pk).count(), 1)
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Answered in <strong>5</strong> attempts')
+        self.assertNotContains(response, 'is being updated')
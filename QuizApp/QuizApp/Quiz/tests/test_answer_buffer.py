@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from Quiz.answer_buffer import AnswerBuffer, get_answer_buffer
+from Quiz.models import (Quiz, Question, Choice, Student, StudentAnswer,
+                              Subject, User, TakenQuiz)
+
+BUFFERED = {'ENABLED': True, 'FLUSH_INTERVAL': None, 'BATCH_SIZE': 500}
+
+
+class AnswerBufferTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.user = User.objects.create(username='student1', is_student=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.student1 = Student.objects.create(user=self.user)
+        self.student2 = Student.objects.create(user=User.objects.create(username='student2', is_student=True))
+        self.questions = [Question.objects.create(quiz=self.quiz1, text='question%d' % i) for i in range(3)]
+        self.correct_choices = [
+            Choice.objects.create(question=question, text='correct', is_correct=True) for question in self.questions
+        ]
+        self.wrong_choices = [
+            Choice.objects.create(question=question, text='wrong', is_correct=False) for question in self.questions
+        ]
+        self.url = reverse('students:take_quiz', args=[self.quiz1.pk])
+
+    def test_flush(self):
+        answer_buffer = AnswerBuffer(flush_interval=None)
+        question1, question2, question3 = self.questions
+        answer_buffer.add(self.student1.pk, self.quiz1.pk, question1.pk, [self.correct_choices[0].pk])
+        # The first answer stands.
+        answer_buffer.add(self.student1.pk, self.quiz1.pk, question1.pk, [self.wrong_choices[0].pk])
+        answer_buffer.add(self.student2.pk, self.quiz1.pk, question1.pk, [self.wrong_choices[0].pk])
+        answer_buffer.add(self.student2.pk, self.quiz1.pk, question2.pk, [self.correct_choices[1].pk])
+        self.assertEqual(answer_buffer.flush(self.student1.pk), 1)
+        self.assertEqual(list(self.student1.quiz_answers.values_list('answer', flat=True)),
+                         [self.correct_choices[0].pk])
+        self.assertFalse(self.student2.quiz_answers.exists())
+        # Answers already written and choices deleted since are skipped.
+        StudentAnswer.objects.create(student=self.student2, quiz=self.quiz1, question=question2)
+        answer_buffer.add(self.student2.pk, self.quiz1.pk, question3.pk, [self.correct_choices[2].pk])
+        question3.delete()
+        with self.assertNumQueries(6):
+            self.assertEqual(answer_buffer.flush(), 1)
+        self.assertEqual(answer_buffer.pending, {})
+        self.assertEqual(self.student2.quiz_answers.count(), 2)
+
+    @override_settings(QUIZ_ANSWER_BUFFER=BUFFERED)
+    def test_take_quiz(self):
+        self.client.force_login(self.user)
+        self.client.get(self.url)
+        for question, choice in zip(self.questions[:2], self.correct_choices):
+            self.client.post(self.url, {'question': question.pk, 'answer': [choice.pk]})
+        # Buffered until the attempt is scored.
+        self.assertFalse(self.student1.quiz_answers.exists())
+        self.assertEqual(len(get_answer_buffer().pending), 2)
+        self.client.post(self.url, {'question': self.questions[2].pk, 'answer': [self.wrong_choices[2].pk]})
+        self.assertEqual(self.student1.quiz_answers.count(), 3)
+        self.assertEqual(TakenQuiz.objects.get(student=self.student1, quiz=self.quiz1).score, 66.67)
+
+    @override_settings(QUIZ_ANSWER_BUFFER=BUFFERED)
+    def test_answers_are_flushed_when_an_attempt_starts(self):
+        self.client.force_login(self.user)
+        self.client.get(self.url)
+        self.client.post(self.url, {'question': self.questions[0].pk, 'answer': [self.correct_choices[0].pk]})
+        # The attempt is lost, e.g. with the session: the next one skips the answered question.
+        session = self.client.session
+        session.flush()
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(self.student1.quiz_answers.count(), 1)
+        self.assertEqual(response.context['question'], self.questions[1])
@@ -0,0 +1,67 @@
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from Quiz.backends import QuizBackend
+from Quiz.models import (Quiz, Question, Choice, Student,
+                              Subject, User, TakenQuiz)
+
+class QuizBackendTestCase(TestCase):
+    def setUp(self):
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.user = User.objects.create(username='student1', is_student=True)
+        self.student1 = Student.objects.create(user=self.user)
+
+    def test_student_is_loaded_with_the_user(self):
+        with self.assertNumQueries(1):
+            user = QuizBackend().get_user(self.user.pk)
+            self.assertEqual(user.student, self.student1)
+        with self.assertNumQueries(1):
+            self.assertFalse(hasattr(QuizBackend().get_user(self.teacher1.pk), 'student'))
+
+    def test_sessions_of_model_backend_stay_logged_in(self):
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        self.assertEqual(self.client.get(reverse('students:quiz_list')).status_code, 200)
+        # New logins go through QuizBackend.
+        self.user.set_password('secret')
+        self.user.save()
+        self.assertTrue(self.client.login(username='student1', password='secret'))
+        self.assertEqual(self.client.session[BACKEND_SESSION_KEY], 'Quiz.backends.QuizBackend')
+
+    def test_inactive_or_missing_user(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(QuizBackend().get_user(self.user.pk))
+        self.assertIsNone(QuizBackend().get_user(0))
+
+
+class SessionEnginesTestCase(TestCase):
+    def setUp(self):
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.user = User.objects.create(username='student1', is_student=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.student1 = Student.objects.create(user=self.user)
+        self.question1 = Question.objects.create(quiz=self.quiz1, text='question1')
+        self.choice11 = Choice.objects.create(question=self.question1, text='choice11', is_correct=True)
+        self.url = reverse('students:take_quiz', args=[self.quiz1.pk])
+
+    def take_quiz(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.url).context['question'], self.question1)
+        self.client.post(self.url, {'question': self.question1.pk, 'answer': [self.choice11.pk]})
+        self.assertEqual(TakenQuiz.objects.get(student=self.student1, quiz=self.quiz1).score, 100.0)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+    def test_cached_db(self):
+        self.take_quiz()
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookies(self):
+        self.take_quiz()
+        url = reverse('students:taken_quiz_list')
+        # The first request caches the scores of the quiz.
+        self.client.get(url)
+        # The session is read from the cookie: the user and its student, the interests (header), the taken quizzes,
+        # the versions of their quizzes.
+        with self.assertNumQueries(4):
+            self.client.get(url)
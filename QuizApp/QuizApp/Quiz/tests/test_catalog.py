@@ -0,0 +1,63 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from Quiz.catalog import CATALOG_KEY, get_subject_catalogs
+from Quiz.models import (Quiz, Question, Student,
+                              Subject, User, TakenQuiz)
+
+class CatalogTestCase(TestCase):
+    def setUp(self):
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.user = User.objects.create(username='student1', is_student=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.subject2 = Subject.objects.create(name='subject2')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.quiz2 = Quiz.objects.create(owner=self.teacher1, name='quiz2', subject=self.subject1)
+        self.quiz3 = Quiz.objects.create(owner=self.teacher1, name='quiz3', subject=self.subject2)
+        for quiz in (self.quiz1, self.quiz2, self.quiz3):
+            Question.objects.create(quiz=quiz, text='question1')
+        self.student1 = Student.objects.create(user=self.user)
+        self.student1.interests.add(self.subject1, self.subject2)
+        self.url = reverse('students:quiz_list')
+        self.client.force_login(self.user)
+
+    def catalog(self, subject):
+        return [quiz.name for quiz in get_subject_catalogs([subject.pk])[subject.pk]]
+
+    def test_catalog_is_cached(self):
+        self.assertEqual(self.catalog(self.subject1), ['quiz1', 'quiz2'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.catalog(self.subject1), ['quiz1', 'quiz2'])
+
+    def test_invalidation(self):
+        self.catalog(self.subject1)
+        empty_quiz = Quiz.objects.create(owner=self.teacher1, name='quiz0', subject=self.subject1)
+        self.assertEqual(self.catalog(self.subject1), ['quiz1', 'quiz2'])
+        question = Question.objects.create(quiz=empty_quiz, text='question1')
+        self.assertEqual(self.catalog(self.subject1), ['quiz0', 'quiz1', 'quiz2'])
+        question.delete()
+        self.assertEqual(self.catalog(self.subject1), ['quiz1', 'quiz2'])
+
+        self.catalog(self.subject2)
+        self.quiz2.subject = self.subject2
+        self.quiz2.save()
+        self.assertEqual(self.catalog(self.subject1), ['quiz1'])
+        self.assertEqual(self.catalog(self.subject2), ['quiz2', 'quiz3'])
+
+    def test_student_quiz_list(self):
+        TakenQuiz.objects.create(student=self.student1, quiz=self.quiz2, score=100.0)
+        response = self.client.get(self.url)
+        self.assertEqual([quiz.name for quiz in response.context['quizzes']], ['quiz1', 'quiz3'])
+        self.assertContains(response, '1 questions')
+        # Session, user and student, interests (header and view), taken quizzes, versions of the quizzes, no catalog
+        # query.
+        with self.assertNumQueries(6):
+            self.client.get(self.url)
+
+    def test_stale_catalog_with_a_deleted_quiz(self):
+        self.client.get(self.url)
+        catalog = cache.get(CATALOG_KEY % self.subject1.pk)
+        self.quiz2.delete()
+        # The invalidation didn't reach the cache of this process.
+        cache.set(CATALOG_KEY % self.subject1.pk, catalog)
+        self.assertContains(self.client.get(self.url), 'quiz1')
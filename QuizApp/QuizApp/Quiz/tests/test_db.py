@@ -0,0 +1,24 @@
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import TestCase, override_settings
+
+class SQLitePragmasTestCase(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA %s' % name)
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connection(self):
+        # synchronous=NORMAL was set when the test database connection was opened.
+        self.assertEqual(self.pragma('synchronous'), 1)
+
+    @override_settings(QUIZ_SQLITE_PRAGMAS={'busy_timeout': 1234})
+    def test_pragmas_read_from_settings(self):
+        connection_created.send(sender=connection.__class__, connection=connection)
+        self.assertEqual(self.pragma('busy_timeout'), 1234)
+
+    @override_settings(QUIZ_SQLITE_PRAGMAS={})
+    def test_no_pragmas(self):
+        timeout = self.pragma('busy_timeout')
+        connection_created.send(sender=connection.__class__, connection=connection)
+        self.assertEqual(self.pragma('busy_timeout'), timeout)
@@ -0,0 +1,73 @@
+import io
+import json
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+from Quiz.importers import import_questions, parse_json
+from Quiz.models import Quiz, Question, Choice, QuizStats, Subject, User
+
+class ImportQuestionsTestCase(TestCase):
+    def setUp(self):
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.questions = [
+            {'text': 'question%d' % i, 'choices': [{'text': 'right', 'is_correct': True}, {'text': 'wrong'}]}
+            for i in range(5)
+        ]
+
+    def test_json(self):
+        result = import_questions(self.quiz1, io.StringIO(json.dumps(self.questions, indent=2)), 'json', batch_size=2)
+        self.assertEqual((result.questions, result.choices), (5, 10))
+        self.assertEqual(Question.objects.filter(quiz=self.quiz1).count(), 5)
+        self.assertEqual(Choice.objects.filter(question__quiz=self.quiz1, is_correct=True).count(), 5)
+        self.assertEqual(QuizStats.objects.get(quiz=self.quiz1).questions_count, 5)
+
+    def test_json_streaming(self):
+        items = list(parse_json(io.StringIO(json.dumps(self.questions)), chunk_size=7))
+        self.assertEqual([item for _, item in items], self.questions)
+
+    def test_jsonl(self):
+        data = '\n'.join(json.dumps(question) for question in self.questions)
+        self.assertEqual(import_questions(self.quiz1, io.StringIO(data), 'jsonl').questions, 5)
+
+    def test_csv(self):
+        data = 'question,choice,is_correct\nq1,a,1\nq1,b,0\nq2,c,false\nq2,d,yes\nq2,e,\n'
+        result = import_questions(self.quiz1, io.StringIO(data), 'csv')
+        self.assertEqual((result.questions, result.choices), (2, 5))
+        self.assertEqual(list(Choice.objects.filter(is_correct=True).values_list('text', flat=True)), ['a', 'd'])
+
+    def test_is_correct_strings(self):
+        self.questions[0]['choices'] = [
+            {'text': 'right', 'is_correct': 'True'},
+            {'text': 'wrong', 'is_correct': 'false'},
+            {'text': 'wrong', 'is_correct': '0'},
+        ]
+        import_questions(self.quiz1, io.StringIO(json.dumps(self.questions[:1])), 'json')
+        self.assertEqual(list(Choice.objects.filter(is_correct=True).values_list('text', flat=True)), ['right'])
+
+        for value in ('maybe', 0, None):
+            self.questions[1]['choices'][1]['is_correct'] = value
+            with self.assertRaisesMessage(ValidationError, 'Question 1: is_correct must be true or false.'):
+                import_questions(self.quiz1, io.StringIO(json.dumps(self.questions[1:2])), 'json')
+
+    def test_validation(self):
+        self.questions[3]['choices'] = [{'text': 'wrong'}, {'text': 'wrong'}]
+        with self.assertRaisesMessage(ValidationError, 'Question 4: Mark at least one answer as correct. '
+                                                       '2 questions were imported before this error.'):
+            import_questions(self.quiz1, io.StringIO(json.dumps(self.questions)), 'json', batch_size=2)
+        self.assertEqual(Question.objects.count(), 2)
+
+        self.questions[3]['choices'] = [{'text': 'right', 'is_correct': True}]
+        with self.assertRaisesMessage(ValidationError, 'between 2 and 5 choices'):
+            import_questions(self.quiz1, io.StringIO(json.dumps(self.questions[3:])), 'json')
+
+    def test_import_view(self):
+        self.client.force_login(self.teacher1)
+        file = io.BytesIO('\n'.join(json.dumps(question) for question in self.questions).encode())
+        file.name = 'questions.jsonl'
+        response = self.client.post(reverse('teachers:quiz_import', args=[self.quiz1.pk]),
+                                    {'file': file, 'format': 'jsonl'})
+        self.assertRedirects(response, reverse('teachers:quiz_change', args=[self.quiz1.pk]), fetch_redirect_response=False)
+        self.assertEqual(Question.objects.filter(quiz=self.quiz1).count(), 5)
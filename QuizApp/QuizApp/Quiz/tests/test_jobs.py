@@ -0,0 +1,170 @@
+import os
+import signal
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from Quiz.catalog import available_quizzes
+from Quiz.jobs import JOB_KINDS, claim_job, enqueue
+from Quiz.models import (Quiz, Question, Choice, Job, Student, StudentAnswer,
+                              Subject, User, TakenQuiz)
+from Quiz.sampling import get_question_ids
+from Quiz.scoring import score_quiz
+
+# Every operation runs as a job, in chunks of 2 rows.
+BACKGROUND = {'INLINE_ATTEMPTS': 0, 'CHUNK_SIZE': 2}
+
+
+@override_settings(QUIZ_JOBS=BACKGROUND)
+class JobsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.teacher2 = User.objects.create(username='teacher2', is_teacher=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.quiz2 = Quiz.objects.create(owner=self.teacher1, name='quiz2', subject=self.subject1)
+        self.questions = [Question.objects.create(quiz=self.quiz1, text='question%d' % i) for i in range(3)]
+        self.correct_choices = [
+            Choice.objects.create(question=question, text='correct', is_correct=True) for question in self.questions
+        ]
+        self.wrong_choices = [
+            Choice.objects.create(question=question, text='wrong', is_correct=False) for question in self.questions
+        ]
+        Question.objects.create(quiz=self.quiz2, text='question')
+        self.students = [
+            Student.objects.create(user=User.objects.create(username='student%d' % i, is_student=True))
+            for i in range(3)
+        ]
+        for student in self.students:
+            for question, choice in zip(self.questions, self.correct_choices):
+                StudentAnswer.objects.create(student=student, quiz=self.quiz1, question=question).answer.add(choice)
+            TakenQuiz.objects.create(student=student, quiz=self.quiz1, score=score_quiz(student, self.quiz1))
+        self.client.force_login(self.teacher1)
+
+    def run_worker(self):
+        out = StringIO()
+        call_command('run_worker', '--once', stdout=out)
+        return out.getvalue()
+
+    def test_queue(self):
+        job = enqueue('regrade_quiz', self.teacher1, 'Regrade', quiz=self.quiz1)
+        # Already queued.
+        self.assertEqual(enqueue('regrade_quiz', self.teacher1, 'Regrade', quiz=self.quiz1), job)
+        other_job = enqueue('regrade_quiz', self.teacher1, 'Regrade', quiz=self.quiz2)
+        self.assertEqual(claim_job(), job)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.RUNNING)
+        self.assertEqual(claim_job(), other_job)
+        self.assertIsNone(claim_job())
+
+    def test_stale_job_is_queued_again(self):
+        job = enqueue('regrade_quiz', self.teacher1, 'Regrade', quiz=self.quiz1)
+        self.assertEqual(claim_job(), job)
+        self.assertIsNone(claim_job())
+        # Its worker was killed 20 minutes ago.
+        Job.objects.filter(pk=job.pk).update(heartbeat=timezone.now() - timedelta(minutes=20))
+        with self.assertLogs('Quiz.jobs', 'WARNING'):
+            self.assertEqual(claim_job(), job)
+
+    def test_worker_stopped_with_sigterm(self):
+        JOB_KINDS['stop_worker'] = lambda job: os.kill(os.getpid(), signal.SIGTERM)
+        self.addCleanup(JOB_KINDS.pop, 'stop_worker')
+        job = enqueue('stop_worker', self.teacher1, 'Stop')
+        self.assertIn('Job %d queued again.' % job.pk, self.run_worker())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.started), (Job.QUEUED, None))
+
+    def test_delete_quiz(self):
+        get_question_ids(self.quiz1.pk)
+        response = self.client.post(reverse('teachers:quiz_delete', args=[self.quiz1.pk]))
+        job = Job.objects.get(kind='delete_quiz')
+        self.assertRedirects(response, reverse('teachers:job_detail', args=[job.pk]))
+        self.assertTrue(Quiz.objects.filter(pk=self.quiz1.pk).exists())
+        # Hidden until the worker deletes it.
+        self.assertNotContains(self.client.get(reverse('teachers:quiz_change_list')), 'quiz1')
+        self.assertEqual(self.client.get(reverse('teachers:quiz_results', args=[self.quiz1.pk])).status_code, 404)
+        self.assertEqual(available_quizzes([self.subject1.pk], set()), [self.quiz2])
+        student = Student.objects.create(user=User.objects.create(username='student', is_student=True))
+        self.client.force_login(student.user)
+        self.assertEqual(self.client.get(reverse('students:take_quiz', args=[self.quiz1.pk])).status_code, 404)
+        self.client.force_login(self.teacher1)
+
+        self.assertIn('Job %d done: The quiz was deleted.' % job.pk, self.run_worker())
+        job.refresh_from_db()
+        self.assertIsNone(job.quiz)
+        # 9 selected choices, 9 answers, 3 attempts, 6 choices and 3 questions.
+        self.assertEqual((job.progress, job.total, job.percent), (30, 30, 100))
+        self.assertFalse(Quiz.objects.filter(pk=self.quiz1.pk).exists())
+        self.assertFalse(StudentAnswer.objects.exists())
+        self.assertFalse(StudentAnswer.answer.through.objects.exists())
+        self.assertEqual(Question.objects.get().quiz, self.quiz2)
+        self.assertEqual(get_question_ids(self.quiz1.pk), [])
+
+        response = self.client.get(reverse('teachers:job_detail', args=[job.pk]))
+        self.assertContains(response, 'Delete the quiz quiz1')
+        self.assertContains(response, '30 / 30')
+
+    def test_quiz_isnt_hidden_when_its_delete_isnt_queued(self):
+        with mock.patch('Quiz.views.enqueue', side_effect=DatabaseError('database is locked')), \
+                self.assertRaises(DatabaseError):
+            self.client.post(reverse('teachers:quiz_delete', args=[self.quiz1.pk]))
+        self.quiz1.refresh_from_db()
+        self.assertFalse(self.quiz1.deleting)
+        self.assertContains(self.client.get(reverse('teachers:quiz_change_list')), 'quiz1')
+
+    @override_settings(QUIZ_JOBS={**BACKGROUND, 'INLINE_ATTEMPTS': 3})
+    def test_small_quiz_is_deleted_in_the_request(self):
+        self.client.post(reverse('teachers:quiz_delete', args=[self.quiz1.pk]))
+        self.assertFalse(Quiz.objects.filter(pk=self.quiz1.pk).exists())
+        self.assertFalse(Job.objects.exists())
+
+    def test_question_change_regrades_in_background(self):
+        question, correct, wrong = self.questions[0], self.correct_choices[0], self.wrong_choices[0]
+        data = {
+            'text': question.text,
+            'choices-TOTAL_FORMS': 2, 'choices-INITIAL_FORMS': 2,
+            'choices-MIN_NUM_FORMS': 0, 'choices-MAX_NUM_FORMS': 1000,
+            'choices-0-id': correct.pk, 'choices-0-text': 'correct',
+            'choices-1-id': wrong.pk, 'choices-1-text': 'wrong', 'choices-1-is_correct': 'on',
+        }
+        self.client.post(reverse('teachers:question_change', args=[self.quiz1.pk, question.pk]), data)
+        job = Job.objects.get(kind='regrade_quiz')
+        self.assertEqual(set(TakenQuiz.objects.values_list('score', flat=True)), {100.0})
+        self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.progress), (Job.DONE, '3 attempts were regraded.', 3))
+        self.assertEqual(set(TakenQuiz.objects.values_list('score', flat=True)), {66.67})
+
+    def test_export_results(self):
+        url = reverse('teachers:quiz_results_export', args=[self.quiz1.pk])
+        self.assertContains(self.client.get(url, {'background': '1', 'score_min': 50}), 'Export in background')
+        with tempfile.TemporaryDirectory() as directory, \
+                self.settings(QUIZ_JOBS={**BACKGROUND, 'OUTPUT_DIR': directory}):
+            self.client.post(url + '?score_min=50', {'format': 'csv'})
+            job = Job.objects.get(kind='export_results')
+            self.assertEqual(job.params, {'export_format': 'csv', 'per_question': False,
+                                          'filters': {'score_min': '50'}})
+            self.run_worker()
+            job.refresh_from_db()
+            self.assertEqual(job.result, '3 attempts were exported.')
+            self.assertTrue(os.path.exists(os.path.join(directory, job.output)))
+            response = self.client.get(reverse('teachers:job_output', args=[job.pk]))
+            self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 4)
+            response.close()
+            # Jobs are private to their teacher.
+            self.client.force_login(self.teacher2)
+            self.assertEqual(self.client.get(reverse('teachers:job_output', args=[job.pk])).status_code, 404)
+            self.assertEqual(self.client.get(reverse('teachers:job_detail', args=[job.pk])).status_code, 404)
+
+    def test_failed_job(self):
+        job = enqueue('export_results', self.teacher1, 'Export', quiz=self.quiz1, export_format='xml')
+        with self.assertLogs('Quiz.jobs', 'ERROR'):
+            self.assertIn('Job %d failed: Invalid export parameters' % job.pk, self.run_worker())
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.FAILED)
@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from Quiz.leaderboard import get_percentile, get_rank, get_sorted_scores
+from Quiz.models import (Quiz, Question, Student,
+                              Subject, User, TakenQuiz)
+
+class LeaderboardTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.quiz2 = Quiz.objects.create(owner=self.teacher1, name='quiz2', subject=self.subject1)
+        Question.objects.create(quiz=self.quiz1, text='question1')
+        self.students = [
+            Student.objects.create(user=User.objects.create(username='student%d' % i, is_student=True))
+            for i in range(5)
+        ]
+        for student, score in zip(self.students, (50.0, 100.0, 50.0, 0.0)):
+            TakenQuiz.objects.create(student=student, quiz=self.quiz1, score=score)
+        TakenQuiz.objects.create(student=self.students[0], quiz=self.quiz2, score=10.0)
+
+    def test_rank_and_percentile(self):
+        scores = [0.0, 50.0, 50.0, 100.0]
+        self.assertEqual([get_rank(scores, score) for score in (100.0, 50.0, 0.0, 75.0)], [1, 2, 4, 2])
+        self.assertEqual([get_percentile(scores, score) for score in (100.0, 50.0, 0.0)], [87.5, 50.0, 12.5])
+        self.assertIsNone(get_percentile([], 10.0))
+
+    def test_sorted_scores_are_cached_and_updated(self):
+        with self.assertNumQueries(1):
+            scores = get_sorted_scores([self.quiz1.pk, self.quiz2.pk])
+        self.assertEqual(scores, {self.quiz1.pk: [0.0, 50.0, 50.0, 100.0], self.quiz2.pk: [10.0]})
+        # Inserted on commit.
+        with self.captureOnCommitCallbacks(execute=True):
+            TakenQuiz.objects.create(student=self.students[4], quiz=self.quiz1, score=75.0)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_sorted_scores([self.quiz1.pk])[self.quiz1.pk], [0.0, 50.0, 50.0, 75.0, 100.0])
+        # A list missing an attempt is loaded again.
+        self.assertEqual(len(get_sorted_scores([self.quiz2.pk], {self.quiz2.pk: 2})[self.quiz2.pk]), 1)
+        TakenQuiz.objects.filter(quiz=self.quiz2).delete()
+        self.assertEqual(get_sorted_scores([self.quiz2.pk])[self.quiz2.pk], [])
+
+    def test_taken_quiz_list(self):
+        self.client.force_login(self.students[0].user)
+        url = reverse('students:taken_quiz_list')
+        self.client.get(url)
+        # Session, user and student, interests (header), taken quizzes, versions of their quizzes: the ranks don't
+        # cost any query.
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertContains(response, '<td>2 / 4</td>')
+        self.assertContains(response, '<td>50.0</td>')
+        self.assertContains(response, '<td>1 / 1</td>')
+
+    def test_leaderboard(self):
+        self.client.force_login(self.teacher1)
+        response = self.client.get(reverse('teachers:quiz_leaderboard', args=[self.quiz1.pk]))
+        self.assertEqual([(taken_quiz.rank, taken_quiz.score) for taken_quiz in response.context['taken_quizzes']],
+                         [(1, 100.0), (2, 50.0), (2, 50.0), (4, 0.0)])
+        self.assertContains(response, 'Total respondents: <strong>4</strong>')
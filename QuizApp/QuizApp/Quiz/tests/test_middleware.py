@@ -0,0 +1,58 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from Quiz.middleware import QueryInstrumentationMiddleware
+from Quiz.models import Quiz, Question, Student, Subject, User
+
+class QueryInstrumentationTestCase(TestCase):
+    def setUp(self):
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.client.force_login(self.teacher1)
+
+    def test_server_timing(self):
+        response = self.client.get(reverse('teachers:quiz_change_list'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="6 queries", total;dur=[\d.]+$')
+
+    @override_settings(ROOT_URLCONF='Quiz.async_urls')
+    async def test_server_timing_of_async_views(self):
+        # The queries run in the thread of sync_to_async are recorded.
+        student = await sync_to_async(User.objects.create)(username='student1', is_student=True)
+        await sync_to_async(Student.objects.create)(user=student)
+        await sync_to_async(self.async_client.force_login)(student)
+        for name in ('students:quiz_list', 'students:taken_quiz_list'):
+            response = await self.async_client.get(reverse(name))
+            self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="[1-9]\d* queries"')
+
+    def log_request(self, run_queries):
+        def view(request):
+            run_queries()
+            return HttpResponse()
+
+        with self.assertLogs('Quiz.queries', 'INFO') as logs:
+            QueryInstrumentationMiddleware(view)(RequestFactory().get('/quizzes/'))
+        return logs.records[0].levelname, json.loads(logs.records[0].getMessage())
+
+    @override_settings(QUIZ_QUERY_INSTRUMENTATION={'N_PLUS_ONE_THRESHOLD': 3})
+    def test_repeated_statements_are_flagged(self):
+        questions = [Question.objects.create(quiz=self.quiz1, text='question%d' % i) for i in range(3)]
+        level, record = self.log_request(lambda: [Question.objects.get(pk=question.pk) for question in questions[:2]])
+        self.assertEqual((level, record['queries'], record['n_plus_one']), ('INFO', 2, []))
+
+        # A query per question.
+        level, record = self.log_request(lambda: [Question.objects.get(pk=question.pk) for question in questions])
+        self.assertEqual(level, 'WARNING')
+        self.assertEqual(record['path'], '/quizzes/')
+        self.assertEqual(record['n_plus_one'][0]['count'], 3)
+        self.assertIn('Quiz_question', record['n_plus_one'][0]['sql'])
+
+    @override_settings(QUIZ_QUERY_INSTRUMENTATION={'SLOW_QUERY_MS': 0, 'SLOWEST_QUERIES': 1})
+    def test_slow_queries_are_flagged(self):
+        level, record = self.log_request(lambda: (Quiz.objects.count(), Subject.objects.count()))
+        self.assertEqual((level, record['queries'], record['status']), ('WARNING', 2, 200))
+        self.assertEqual(len(record['slowest']), 1)
+        self.assertGreaterEqual(record['slowest'][0]['ms'], 0)
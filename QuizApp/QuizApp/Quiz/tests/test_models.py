@@ -20,7 +20,7 @@ class ModelsTestCase(TestCase):
         self.choice22 = Choice.objects.create(question=self.question2, text='choice22', is_correct=True)
         self.choice23 = Choice.objects.create(question=self.question2, text='choice23', is_correct=False)
         self.choice24 = Choice.objects.create(question=self.question2, text='choice24', is_correct=True)
-        self.studentanswer1 = StudentAnswer.objects.create(student=self.student1)
+        self.studentanswer1 = StudentAnswer.objects.create(student=self.student1, quiz=self.quiz1, question=self.question1)
         self.studentanswer1.answer.add(self.choice11)
         self.studentanswer1.answer.add(self.choice12)
         self.studentanswer1.save()
@@ -31,8 +31,26 @@ class ModelsTestCase(TestCase):
         self.assertEqual(unanswered_questions, [self.question2])
 
         # Student now attempted question2 as well.
-        studentanswer2 = StudentAnswer.objects.create(student=self.student1)
+        studentanswer2 = StudentAnswer.objects.create(student=self.student1, quiz=self.quiz1, question=self.question2)
         studentanswer2.answer.add(self.choice21)
         studentanswer2.answer.add(self.choice22)
         unanswered_questions = list(self.student1.get_unanswered_questions(self.quiz1))
-        self.assertEqual(unanswered_questions, [])
\ No newline at end of file
+        self.assertEqual(unanswered_questions, [])
+
+class QuizAccessTestCase(TestCase):
+    def setUp(self):
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.teacher2 = User.objects.create(username='teacher2', is_teacher=True)
+        self.teacher3 = User.objects.create(username='teacher3', is_teacher=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.quiz2 = Quiz.objects.create(owner=self.teacher2, name='quiz2', subject=self.subject1)
+        self.quiz3 = Quiz.objects.create(owner=self.teacher3, name='quiz3', subject=self.subject1)
+        self.quiz1.shared_owners.add(self.teacher2, self.teacher3)
+        self.quiz3.shared_owners.add(self.teacher1)
+
+    def test_editable_by(self):
+        with self.assertNumQueries(1):
+            quizzes = list(Quiz.objects.editable_by(self.teacher1).order_by('name'))
+        self.assertEqual(quizzes, [self.quiz1, self.quiz3])
+        self.assertEqual(list(Quiz.objects.editable_by(self.teacher2).order_by('name')), [self.quiz1, self.quiz2])
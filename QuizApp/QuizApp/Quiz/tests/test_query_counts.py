@@ -0,0 +1,93 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from Quiz.benchmarks.data import seed
+from Quiz.benchmarks.views import student_urls, teacher_urls
+
+# Queries run by a request to every view, whatever the number of questions and attempts of the quiz. The requests
+# are repeated: the quiz change and results pages (attempts, leaderboard) are then served from the response cache,
+# after reading the version of the quiz, and the item analysis from the cache of the analysis. The student profile
+# is loaded with the user (see Quiz.backends). Every answer of the quiz but the last one is a
+# 'students:take_quiz (answer)' request, all of them must run the same number of queries.
+EXPECTED_QUERIES = {
+    'students:quiz_list': 6,
+    'students:taken_quiz_list': 5,
+    'students:student_interests': 4,
+    'students:take_quiz': 5,
+    'students:take_quiz (answer)': 14,
+    'students:take_quiz (complete)': 21,
+    'teachers:quiz_change_list': 4,
+    'teachers:quiz_add': 3,
+    'teachers:quiz_change': 3,
+    'teachers:quiz_delete': 3,
+    'teachers:quiz_results': 3,
+    'teachers:quiz_results_export': 4,
+    'teachers:quiz_item_analysis': 5,
+    'teachers:quiz_leaderboard': 3,
+    'teachers:question_add': 3,
+    'teachers:quiz_import': 3,
+    'teachers:quiz_share': 3,
+    'teachers:question_change': 5,
+    'teachers:question_delete': 3,
+}
+
+class QueryCountTestCase(TestCase):
+    '''
+        Counts the queries of every view at several data sizes. A view whose count depends on the number of
+        questions or attempts (e.g. a query per row) is reported with its counts at each size.
+    '''
+    def count_queries(self, client, method, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(client, method)(url, data)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertIn(response.status_code, (200, 302), url)
+        return len(context.captured_queries)
+
+    def measure(self, questions, attempts):
+        '''
+            Returns {view name: [number of queries of every request]} on a seeded data set. A page is requested
+            once (after warming up), every question of the quiz is answered.
+        '''
+        # The first student took every other quiz, and not the second one.
+        data = seed(teachers=2, students=2 * attempts, subjects=2, quizzes=4, questions=questions, attempts=attempts)
+        quiz = data['quizzes'][1]
+        student_client, teacher_client = self.client_class(), self.client_class()
+        student_client.force_login(data['students'][0].user)
+        teacher_client.force_login(quiz.owner)
+        urls = [(student_client, name, url) for name, url in student_urls(quiz)]
+        urls += [(teacher_client, name, url) for name, url in teacher_urls(quiz, quiz.questions.first())]
+        counts = {}
+        for client, name, url in urls:
+            # The first request fills the session and the caches.
+            client.get(url)
+            counts[name] = [self.count_queries(client, 'get', url)]
+        take_quiz_url = dict(student_urls(quiz))['students:take_quiz']
+        questions = list(quiz.questions.filter(choices__is_correct=True).order_by('text').values_list('pk', 'choices'))
+        for position, (question, choice) in enumerate(questions, start=1):
+            # The last answer also scores the attempt.
+            name = 'students:take_quiz (%s)' % ('complete' if position == len(questions) else 'answer')
+            count = self.count_queries(student_client, 'post', take_quiz_url, {'question': question, 'answer': choice})
+            counts.setdefault(name, []).append(count)
+        return counts
+
+    def assertConstantQueries(self, dimension, sizes):
+        counts = {size: self.measure(**{'questions': 10, 'attempts': 1, dimension: size}) for size in sizes}
+        report = []
+        for view, expected in EXPECTED_QUERIES.items():
+            # The distinct counts of the requests at every size, e.g. of every answered question.
+            view_counts = [(size, sorted(set(counts[size][view]))) for size in sizes if view in counts[size]]
+            if any(size_counts != [expected] for _, size_counts in view_counts):
+                report.append('%s: expected %d queries, got %s (%+d from %d to %d %s)' % (
+                    view, expected, ', '.join('%s with %d %s' % ('/'.join(map(str, size_counts)), size, dimension)
+                                              for size, size_counts in view_counts),
+                    view_counts[-1][1][-1] - view_counts[0][1][-1], view_counts[0][0], view_counts[-1][0], dimension,
+                ))
+        if report:
+            self.fail('Query counts changed:\n' + '\n'.join(report))
+
+    def test_questions(self):
+        self.assertConstantQueries('questions', (1, 10, 100))
+
+    def test_attempts(self):
+        self.assertConstantQueries('attempts', (1, 100, 1000))
@@ -0,0 +1,52 @@
+import re
+from unittest import skipUnless
+from django.db import connection
+from django.test import TestCase
+from Quiz.models import (Choice, Question, Quiz, Student, StudentAnswer,
+                              Subject, TakenQuiz, User)
+from Quiz.scoring import answer_key_rows, load_selections
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is specific to SQLite')
+class QueryPlanTestCase(TestCase):
+    '''
+        The queries run on every quiz submission and results page must find their rows through an index: a
+        "SCAN <table>" without index in the plan is a full table scan.
+    '''
+    def setUp(self):
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.user = User.objects.create(username='student1', is_student=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.student1 = Student.objects.create(user=self.user)
+        self.question1 = Question.objects.create(quiz=self.quiz1, text='question1')
+        self.choice11 = Choice.objects.create(question=self.question1, text='choice11', is_correct=True)
+        answer = StudentAnswer.objects.create(student=self.student1, quiz=self.quiz1, question=self.question1)
+        answer.answer.add(self.choice11)
+        TakenQuiz.objects.create(student=self.student1, quiz=self.quiz1, score=100.0)
+
+    def assertUsesIndexes(self, queryset):
+        plan = queryset.explain()
+        # The whole table name, as "SCAN Quiz_choice" or "SCAN TABLE Quiz_choice" on older SQLite versions: without
+        # the word boundary the name backtracks and "SCAN Quiz_choice USING INDEX" matches "SCAN Quiz_choic".
+        table_scans = re.findall(r'SCAN (?:TABLE )?(?!TABLE )(\w+)\b(?! USING)', plan)
+        self.assertEqual(table_scans, [], plan)
+
+    def test_already_taken(self):
+        self.assertUsesIndexes(self.student1.quizzes.filter(pk=self.quiz1.pk))
+
+    def test_results(self):
+        self.assertUsesIndexes(self.quiz1.taken_quizzes.order_by('-date', '-pk'))
+
+    def test_unanswered_questions(self):
+        self.assertUsesIndexes(self.student1.get_unanswered_questions(self.quiz1))
+
+    def test_scoring(self):
+        # The query loading the answer key (see get_answer_key).
+        self.assertEqual(list(answer_key_rows(self.quiz1.pk)), [(self.question1.pk, self.choice11.pk, True)])
+        self.assertUsesIndexes(answer_key_rows(self.quiz1.pk))
+        self.assertUsesIndexes(StudentAnswer.answer.through.objects
+                               .filter(studentanswer__student=self.student1, studentanswer__quiz=self.quiz1))
+        self.assertEqual(load_selections(self.student1, self.quiz1), {self.question1.pk: {self.choice11.pk}})
+
+    def test_share_with_teacher(self):
+        self.assertUsesIndexes(User.objects.filter(username='teacher1', is_teacher=True))
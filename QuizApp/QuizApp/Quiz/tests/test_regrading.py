@@ -0,0 +1,118 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from Quiz.models import (Quiz, Question, Choice, Student, StudentAnswer,
+                              QuizStats, Subject, User, TakenQuiz)
+from Quiz.regrading import regrade_quiz
+from Quiz.scoring import (AllOrNothingScheme, NegativeMarkingScheme, PartialScheme,
+                               get_answer_key, invalidate_answer_key, score_quiz)
+
+class RegradingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.student1 = Student.objects.create(user=User.objects.create(username='student1', is_student=True))
+        self.student2 = Student.objects.create(user=User.objects.create(username='student2', is_student=True))
+        self.question1 = Question.objects.create(quiz=self.quiz1, text='question1')
+        self.choice11 = Choice.objects.create(question=self.question1, text='choice11', is_correct=True)
+        self.choice12 = Choice.objects.create(question=self.question1, text='choice12', is_correct=False)
+        self.choice13 = Choice.objects.create(question=self.question1, text='choice13', is_correct=True)
+        self.question2 = Question.objects.create(quiz=self.quiz1, text='question2')
+        self.choice21 = Choice.objects.create(question=self.question2, text='choice21', is_correct=True)
+        self.choice22 = Choice.objects.create(question=self.question2, text='choice22', is_correct=False)
+        self.answer(self.student1, self.choice11, self.choice13)
+        self.answer(self.student1, self.choice22)
+        self.answer(self.student2, self.choice12)
+        self.answer(self.student2, self.choice21)
+        for student in (self.student1, self.student2):
+            TakenQuiz.objects.create(student=student, quiz=self.quiz1, score=score_quiz(student, self.quiz1))
+
+    def answer(self, student, *choices):
+        student_answer = StudentAnswer.objects.create(student=student, quiz=self.quiz1, question=choices[0].question)
+        student_answer.answer.add(*choices)
+
+    def scores(self):
+        return list(TakenQuiz.objects.order_by('student').values_list('score', flat=True))
+
+    def test_compiled_answer_key(self):
+        answer_key = get_answer_key(self.quiz1)
+        selections = {self.question1.pk: {self.choice11.pk, self.choice12.pk}, self.question2.pk: {self.choice21.pk}}
+        self.assertEqual(answer_key.score(selections, AllOrNothingScheme()), 50.0)
+        self.assertEqual(answer_key.score(selections, PartialScheme()), 50.0)
+        self.assertEqual(answer_key.score(selections, NegativeMarkingScheme(penalty=0.5)), 25.0)
+        self.assertEqual(answer_key.score(selections, AllOrNothingScheme(), [self.question2.pk]), 100.0)
+        self.assertEqual(answer_key.score({}, AllOrNothingScheme(), []), 0.0)
+
+    def test_answer_key_is_cached_and_versioned(self):
+        self.quiz1.refresh_from_db()
+        get_answer_key(self.quiz1)
+        with self.assertNumQueries(0):
+            get_answer_key(self.quiz1)
+        self.choice12.is_correct = True
+        self.choice12.save()
+        # The cached key isn't deleted, the quiz has a new version in the database.
+        quiz = Quiz.objects.get(pk=self.quiz1.pk)
+        self.assertNotEqual(quiz.answer_key_version, self.quiz1.answer_key_version)
+        self.assertEqual(get_answer_key(quiz).score({self.question1.pk: {self.choice12.pk}}, PartialScheme()), 16.67)
+        # Saving a quiz loaded before the change doesn't revert its version.
+        self.quiz1.name = 'renamed'
+        self.quiz1.save()
+        self.assertEqual(Quiz.objects.get(pk=self.quiz1.pk).answer_key_version, quiz.answer_key_version)
+
+    def test_regrade_quiz(self):
+        self.assertEqual(self.scores(), [50.0, 50.0])
+        Choice.objects.filter(pk=self.choice22.pk).update(is_correct=True)
+        Choice.objects.filter(pk=self.choice21.pk).update(is_correct=False)
+        invalidate_answer_key(self.quiz1.pk)
+        self.assertEqual(regrade_quiz(self.quiz1, chunk_size=1), 2)
+        self.assertEqual(self.scores(), [100.0, 0.0])
+        self.assertEqual(QuizStats.objects.get(quiz=self.quiz1).score_sum, 100.0)
+        self.assertEqual(regrade_quiz(self.quiz1), 0)
+
+    def test_question_change_regrades(self):
+        self.client.force_login(self.teacher1)
+        data = {
+            'text': 'question2',
+            'choices-TOTAL_FORMS': 2, 'choices-INITIAL_FORMS': 2,
+            'choices-MIN_NUM_FORMS': 0, 'choices-MAX_NUM_FORMS': 1000,
+            'choices-0-id': self.choice21.pk, 'choices-0-text': 'choice21',
+            'choices-1-id': self.choice22.pk, 'choices-1-text': 'choice22', 'choices-1-is_correct': 'on',
+        }
+        url = reverse('teachers:question_change', args=[self.quiz1.pk, self.question2.pk])
+        response = self.client.post(url, data, follow=True)
+        self.assertContains(response, '2 attempts were regraded.')
+        self.assertEqual(self.scores(), [100.0, 0.0])
+
+        data['choices-1-text'] = 'renamed'
+        response = self.client.post(url, data, follow=True)
+        self.assertNotContains(response, 'regraded')
+
+    def test_added_question_isnt_graded(self):
+        self.client.force_login(self.teacher1)
+        response = self.client.post(reverse('teachers:question_add', args=[self.quiz1.pk]), {'text': 'question3'})
+        question3 = Question.objects.get(text='question3')
+        self.assertRedirects(response, reverse('teachers:question_change', args=[self.quiz1.pk, question3.pk]))
+        data = {
+            'text': 'question3',
+            'choices-TOTAL_FORMS': 2, 'choices-INITIAL_FORMS': 0,
+            'choices-MIN_NUM_FORMS': 0, 'choices-MAX_NUM_FORMS': 1000,
+            'choices-0-text': 'choice31', 'choices-0-is_correct': 'on',
+            'choices-1-text': 'choice32',
+        }
+        url = reverse('teachers:question_change', args=[self.quiz1.pk, question3.pk])
+        response = self.client.post(url, data, follow=True)
+        self.assertEqual(question3.choices.count(), 2)
+        self.assertNotContains(response, 'regraded')
+        self.assertEqual(self.scores(), [50.0, 50.0])
+
+    def test_command(self):
+        TakenQuiz.objects.update(score=0.0)
+        out = StringIO()
+        call_command('regrade_quiz', self.quiz1.pk, stdout=out)
+        self.assertIn('Regraded 1 quizzes, 2 scores changed.', out.getvalue())
+        self.assertEqual(self.scores(), [50.0, 50.0])
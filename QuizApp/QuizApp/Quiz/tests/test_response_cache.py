@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from Quiz.models import (Quiz, Question, Choice, Student,
+                              Subject, User, TakenQuiz, new_version)
+
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.teacher2 = User.objects.create(username='teacher2', is_teacher=True)
+        self.user = User.objects.create(username='student1', is_student=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.quiz1.shared_owners.add(self.teacher2)
+        self.question1 = Question.objects.create(quiz=self.quiz1, text='question1')
+        self.choice11 = Choice.objects.create(question=self.question1, text='choice11', is_correct=True)
+        self.student1 = Student.objects.create(user=self.user)
+        self.results_url = reverse('teachers:quiz_results', args=[self.quiz1.pk])
+        self.change_url = reverse('teachers:quiz_change', args=[self.quiz1.pk])
+        self.client.force_login(self.teacher1)
+
+    def test_repeat_views_are_cached(self):
+        # The first response sets the CSRF cookie its form is rendered with, it isn't cached.
+        response = self.client.get(self.change_url)
+        self.assertNotIn('ETag', response)
+        response = self.client.get(self.change_url)
+        etag = response['ETag']
+        # Only the session, the user and the version of the quiz are loaded.
+        with self.assertNumQueries(3):
+            response = self.client.get(self.change_url)
+        self.assertEqual(response['ETag'], etag)
+        self.assertContains(response, 'question1')
+        self.assertIn('private', response['Cache-Control'])
+
+        response = self.client.get(self.change_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_versions_are_stored_in_the_database(self):
+        etag = self.client.get(self.results_url)['ETag']
+        # As changed by another process: its cache isn't shared with this one.
+        Quiz.objects.filter(pk=self.quiz1.pk).update(version=new_version())
+        self.assertEqual(self.client.get(self.results_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_cached_per_teacher(self):
+        self.client.get(self.results_url)
+        self.client.force_login(self.teacher2)
+        response = self.client.get(self.results_url)
+        self.assertContains(response, 'teacher2')
+
+    def test_writes_invalidate(self):
+        etag = self.client.get(self.results_url)['ETag']
+        TakenQuiz.objects.create(student=self.student1, quiz=self.quiz1, score=100.0)
+        response = self.client.get(self.results_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'student1')
+
+        self.client.get(self.change_url)
+        Choice.objects.filter(pk=self.choice11.pk).update(text='updated')
+        Choice.objects.get(pk=self.choice11.pk).save()
+        Question.objects.create(quiz=self.quiz1, text='question2')
+        self.assertContains(self.client.get(self.change_url), 'question2')
+
+        self.client.get(reverse('teachers:quiz_change_list'))
+        Quiz.objects.create(owner=self.teacher1, name='quiz2', subject=self.subject1)
+        self.assertContains(self.client.get(reverse('teachers:quiz_change_list')), 'quiz2')
+
+    def test_unshared_quiz_not_served(self):
+        self.client.force_login(self.teacher2)
+        self.assertEqual(self.client.get(self.change_url).status_code, 200)
+        self.quiz1.shared_owners.remove(self.teacher2)
+        self.assertEqual(self.client.get(self.change_url).status_code, 404)
+
+    def test_messages_not_cached(self):
+        self.client.get(self.change_url)
+        self.client.post(reverse('teachers:quiz_share', args=[self.quiz1.pk]), {'username': 'teacher2'})
+        response = self.client.get(self.change_url)
+        self.assertNotIn('ETag', response)
+        self.assertContains(response, 'Quiz successfully shared with teacher2')
+        response = self.client.get(self.change_url)
+        self.assertIn('ETag', response)
+        self.assertNotContains(response, 'Quiz successfully shared with teacher2')
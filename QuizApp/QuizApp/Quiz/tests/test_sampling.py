@@ -0,0 +1,91 @@
+import random
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from Quiz.attempts import QuizAttempt
+from Quiz.models import (Quiz, Question, Choice, Student,
+                              Subject, User, TakenQuiz)
+from Quiz.sampling import get_question_ids, sample_questions
+
+class SampleQuestionsTestCase(TestCase):
+    def test_sample(self):
+        sample = sample_questions(list(range(100)), 10, rng=random.Random(1))
+        self.assertEqual(len(set(sample)), 10)
+        self.assertTrue(set(sample) <= set(range(100)))
+
+    def test_answered_questions_count_towards_the_sample(self):
+        sample = sample_questions(list(range(10)), 4, answered_ids=[3, 4], rng=random.Random(1))
+        self.assertEqual(len(sample), 2)
+        self.assertFalse({3, 4} & set(sample))
+        self.assertEqual(sample_questions(list(range(10)), 2, answered_ids=[3, 4]), [])
+
+    def test_sample_larger_than_the_pool(self):
+        self.assertEqual(sorted(sample_questions([1, 2, 3], 5)), [1, 2, 3])
+
+
+class SampledQuizTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.user = User.objects.create(username='student1', is_student=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1, sample_size=3)
+        self.student1 = Student.objects.create(user=self.user)
+        self.student1.interests.add(self.subject1)
+        self.questions = [Question.objects.create(quiz=self.quiz1, text='question%d' % i) for i in range(10)]
+        self.correct_choices = {
+            question.pk: Choice.objects.create(question=question, text='correct', is_correct=True)
+            for question in self.questions
+        }
+        for question in self.questions:
+            Choice.objects.create(question=question, text='wrong', is_correct=False)
+        self.url = reverse('students:take_quiz', args=[self.quiz1.pk])
+        self.client.force_login(self.user)
+
+    def test_question_ids_are_cached(self):
+        self.assertEqual(get_question_ids(self.quiz1.pk), [question.pk for question in self.questions])
+        with self.assertNumQueries(0):
+            get_question_ids(self.quiz1.pk)
+        question = Question.objects.create(quiz=self.quiz1, text='question10')
+        self.assertEqual(get_question_ids(self.quiz1.pk)[-1], question.pk)
+        question.delete()
+        self.assertNotIn(question.pk, get_question_ids(self.quiz1.pk))
+
+    def test_take_sampled_quiz(self):
+        response = self.client.get(self.url)
+        question_ids = QuizAttempt.from_session(self.client.session, self.quiz1.pk).question_ids
+        self.assertEqual(len(set(question_ids)), 3)
+        self.assertEqual(response.context['question'].pk, question_ids[0])
+        for question_pk in question_ids:
+            self.assertEqual(self.client.get(self.url).context['question'].pk, question_pk)
+            self.client.post(self.url, {'question': question_pk, 'answer': [self.correct_choices[question_pk].pk]})
+        # Scored over the sampled questions only.
+        self.assertEqual(TakenQuiz.objects.get(student=self.student1, quiz=self.quiz1).score, 100.0)
+
+    def test_sampled_exam(self):
+        self.quiz1.exam_mode = True
+        self.quiz1.save()
+        response = self.client.get(self.url)
+        question_ids = QuizAttempt.from_session(self.client.session, self.quiz1.pk).question_ids
+        self.assertEqual(len(response.context['form'].fields), 3)
+        # The sample is kept across reloads.
+        response = self.client.get(self.url)
+        self.assertEqual(sorted(int(name.split('_')[1]) for name in response.context['form'].fields),
+                         sorted(question_ids))
+        data = {'question_%d' % pk: [self.correct_choices[pk].pk] for pk in question_ids}
+        self.assertRedirects(self.client.post(self.url, data), reverse('students:quiz_list'))
+        self.assertEqual(TakenQuiz.objects.get(student=self.student1, quiz=self.quiz1).score, 100.0)
+        self.assertIsNone(QuizAttempt.from_session(self.client.session, self.quiz1.pk))
+
+    def test_catalog_shows_the_sample_size(self):
+        self.assertContains(self.client.get(reverse('students:quiz_list')), '3 questions')
+
+    @override_settings(ROOT_URLCONF='Quiz.async_urls')
+    async def test_async_take_quiz(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.get(self.url)
+        self.assertIn(response.context['question'].pk, [question.pk for question in self.questions])
+        # First question out of 3.
+        self.assertEqual(response.context['progress'], 33)
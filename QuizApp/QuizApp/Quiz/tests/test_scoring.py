@@ -0,0 +1,61 @@
+from django.test import TestCase
+from Quiz.models import (Quiz, Question, Choice, Student, StudentAnswer,
+                              Subject, User)
+from Quiz.scoring import (AllOrNothingScheme, NegativeMarkingScheme, PartialScheme,
+                               get_answer_key, load_selections, score_quiz)
+
+class ScoringTestCase(TestCase):
+    def setUp(self):
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.student1 = Student.objects.create(user=User.objects.create(username='student1', is_student=True))
+        self.student2 = Student.objects.create(user=User.objects.create(username='student2', is_student=True))
+        self.question1 = Question.objects.create(quiz=self.quiz1, text='question1')
+        self.choice11 = Choice.objects.create(question=self.question1, text='choice11', is_correct=True)
+        self.choice12 = Choice.objects.create(question=self.question1, text='choice12', is_correct=True)
+        self.choice13 = Choice.objects.create(question=self.question1, text='choice13', is_correct=False)
+        self.question2 = Question.objects.create(quiz=self.quiz1, text='question2')
+        self.choice21 = Choice.objects.create(question=self.question2, text='choice21', is_correct=False)
+        self.choice22 = Choice.objects.create(question=self.question2, text='choice22', is_correct=True)
+
+    def answer(self, student, *choices):
+        student_answer = StudentAnswer.objects.create(student=student, quiz=self.quiz1, question=choices[0].question)
+        student_answer.answer.add(*choices)
+
+    def test_answer_key(self):
+        with self.assertNumQueries(1):
+            answer_key = get_answer_key(self.quiz1)
+        self.assertEqual(answer_key.choices_count, {self.question1.pk: 3, self.question2.pk: 2})
+        self.assertTrue(answer_key.is_correct(self.question1.pk, {self.choice11.pk, self.choice12.pk}))
+        self.assertFalse(answer_key.is_correct(self.question1.pk, {self.choice11.pk}))
+        self.assertFalse(answer_key.is_correct(self.question1.pk, {self.choice11.pk, self.choice12.pk,
+                                                                  self.choice13.pk}))
+        self.assertTrue(answer_key.is_correct(self.question2.pk, {self.choice22.pk}))
+
+    def test_selections_are_limited_to_the_student(self):
+        self.answer(self.student1, self.choice11)
+        self.answer(self.student2, self.choice12, self.choice13)
+        with self.assertNumQueries(1):
+            selections = load_selections(self.student1, self.quiz1)
+        self.assertEqual(selections, {self.question1.pk: {self.choice11.pk}})
+
+    def test_all_or_nothing(self):
+        self.answer(self.student1, self.choice11, self.choice12)
+        self.answer(self.student1, self.choice21, self.choice22)
+        # Another student's answers must not leak into the score.
+        self.answer(self.student2, self.choice11, self.choice12)
+        self.answer(self.student2, self.choice22)
+        with self.assertNumQueries(2):
+            self.assertEqual(score_quiz(self.student1, self.quiz1, AllOrNothingScheme()), 50.0)
+
+    def test_partial(self):
+        self.answer(self.student1, self.choice11)
+        self.answer(self.student1, self.choice22)
+        self.assertEqual(score_quiz(self.student1, self.quiz1, PartialScheme()), 75.0)
+
+    def test_negative_marking(self):
+        self.answer(self.student1, self.choice13)
+        self.answer(self.student1, self.choice22)
+        self.assertEqual(score_quiz(self.student1, self.quiz1, NegativeMarkingScheme(penalty=0.5)), 25.0)
+        self.assertEqual(score_quiz(self.student2, self.quiz1, NegativeMarkingScheme()), 0.0)
@@ -0,0 +1,48 @@
+import logging
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from Quiz.benchmarks import quiet_query_log, views as views_benchmark
+from Quiz.catalog import get_subject_catalogs
+from Quiz.models import (Choice, Question, Quiz, QuizStats, Student,
+                              Subject, TakenQuiz, User)
+
+class SeedBenchmarkTestCase(TestCase):
+    def test_seed(self):
+        call_command('seed_benchmark', teachers=2, students=10, subjects=3, quizzes=4, questions=5, choices=3,
+                     attempts=6, stdout=StringIO())
+        self.assertEqual(User.objects.filter(is_teacher=True).count(), 2)
+        self.assertEqual(Student.objects.count(), 10)
+        self.assertEqual(Subject.objects.filter(name__startswith='seed-').count(), 3)
+        self.assertEqual(Question.objects.count(), 20)
+        self.assertEqual(Choice.objects.filter(is_correct=True).count(), 20)
+        self.assertEqual(Choice.objects.count(), 60)
+        self.assertEqual(TakenQuiz.objects.count(), 24)
+        for quiz in Quiz.objects.all():
+            stats = QuizStats.objects.get(quiz=quiz)
+            self.assertEqual(stats.questions_count, 5)
+            self.assertEqual(stats.attempts_count, quiz.taken_quizzes.count())
+        # The quizzes are listed to the students.
+        catalogs = get_subject_catalogs(Subject.objects.values_list('pk', flat=True))
+        self.assertEqual(sum(len(catalog) for catalog in catalogs.values()), 4)
+
+    def test_seed_needs_a_teacher_and_a_subject(self):
+        with self.assertRaises(CommandError):
+            call_command('seed_benchmark', teachers=0, stdout=StringIO())
+
+    def test_regressions(self):
+        rows = [(100, 'students:quiz_list', 7, 5.0, 10.0, 12.0)]
+        baseline = {'100 students:quiz_list': {'queries': 6, 'p95_ms': 4.0}}
+        self.assertEqual(len(views_benchmark.regressions(rows, baseline)), 1)
+        self.assertEqual(len(views_benchmark.slowdowns(rows, baseline, tolerance=0.5)), 1)
+        baseline = {'100 students:quiz_list': {'queries': 7, 'p95_ms': 9.0}}
+        self.assertEqual(views_benchmark.regressions(rows, baseline), [])
+        self.assertEqual(views_benchmark.slowdowns(rows, baseline, tolerance=0.5), [])
+
+    def test_query_log_is_restored_when_a_benchmark_fails(self):
+        logger = logging.getLogger('Quiz.queries')
+        with self.assertRaises(RuntimeError), quiet_query_log():
+            self.assertTrue(logger.disabled)
+            raise RuntimeError
+        self.assertFalse(logger.disabled)
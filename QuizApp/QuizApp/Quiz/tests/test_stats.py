@@ -0,0 +1,106 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.db.models.signals import pre_delete
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from Quiz.deletion import delete_quiz
+from Quiz.models import (Quiz, Question, Choice, QuizStats, Student,
+                              Subject, User, TakenQuiz)
+
+class QuizStatsTestCase(TestCase):
+    def setUp(self):
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.students = [
+            Student.objects.create(user=User.objects.create(username='student%d' % i, is_student=True))
+            for i in range(3)
+        ]
+
+    def stats(self):
+        return QuizStats.objects.get(quiz=self.quiz1)
+
+    def test_questions_count(self):
+        question1 = Question.objects.create(quiz=self.quiz1, text='question1')
+        Question.objects.create(quiz=self.quiz1, text='question2')
+        self.assertEqual(self.stats().questions_count, 2)
+        question1.delete()
+        self.assertEqual(self.stats().questions_count, 1)
+
+    def test_attempts(self):
+        for student, score in zip(self.students, (50.0, 100.0, 0.0)):
+            TakenQuiz.objects.create(student=student, quiz=self.quiz1, score=score)
+        stats = self.stats()
+        self.assertEqual(stats.attempts_count, 3)
+        self.assertEqual(stats.average_score, 50.0)
+        self.assertEqual((stats.score_min, stats.score_max), (0.0, 100.0))
+        self.assertAlmostEqual(stats.score_stddev, 40.8248, places=4)
+
+        TakenQuiz.objects.filter(score=0.0).delete()
+        stats = self.stats()
+        self.assertEqual((stats.attempts_count, stats.score_min, stats.score_max), (2, 50.0, 100.0))
+
+    def test_rebuild(self):
+        Question.objects.create(quiz=self.quiz1, text='question1')
+        TakenQuiz.objects.create(student=self.students[0], quiz=self.quiz1, score=25.0)
+        QuizStats.objects.filter(quiz=self.quiz1).update(questions_count=0, attempts_count=0, score_sum=0.0)
+        call_command('rebuild_quiz_stats', stdout=StringIO())
+        stats = self.stats()
+        self.assertEqual((stats.questions_count, stats.attempts_count, stats.score_sum), (1, 1, 25.0))
+
+    def test_missing_stats_are_rebuilt(self):
+        # E.g. a quiz loaded with loaddata: raw saves don't create its statistics.
+        TakenQuiz.objects.create(student=self.students[0], quiz=self.quiz1, score=25.0)
+        QuizStats.objects.filter(quiz=self.quiz1).delete()
+        self.client.force_login(self.teacher1)
+        response = self.client.get(reverse('teachers:quiz_results', args=[self.quiz1.pk]))
+        self.assertEqual(response.context['total_taken_quizzes'], 1)
+        self.assertEqual(self.client.get(reverse('teachers:quiz_leaderboard', args=[self.quiz1.pk])).status_code, 200)
+        self.assertEqual(self.stats().attempts_count, 1)
+        QuizStats.objects.filter(quiz=self.quiz1).delete()
+        self.client.force_login(self.students[0].user)
+        self.assertContains(self.client.get(reverse('students:taken_quiz_list')), 'quiz1')
+
+    def test_quiz_delete_does_not_update_rows_one_by_one(self):
+        def delete_quiz(rows):
+            quiz = Quiz.objects.create(owner=self.teacher1, name='quiz', subject=self.subject1)
+            for i in range(rows):
+                question = Question.objects.create(quiz=quiz, text='question%d' % i)
+                Choice.objects.create(question=question, text='choice', is_correct=True)
+                TakenQuiz.objects.create(student=self.students[i], quiz=quiz, score=50.0)
+            with CaptureQueriesContext(connection) as context:
+                quiz.delete()
+            self.assertFalse(Question.objects.filter(quiz_id=quiz.pk).exists())
+            return len(context.captured_queries)
+
+        self.assertEqual(delete_quiz(1), delete_quiz(3))
+        self.assertEqual(self.stats().questions_count, 0)
+
+    def test_failed_quiz_delete(self):
+        def fail(sender, **kwargs):
+            raise DatabaseError('database is locked')
+
+        self.client.force_login(self.teacher1)
+        questions = [Question.objects.create(quiz=self.quiz1, text='question%d' % i) for i in range(3)]
+        choice = Choice.objects.create(question=questions[0], text='choice', is_correct=True)
+        # Fails once the quiz is marked as being deleted.
+        pre_delete.connect(fail, sender=Quiz)
+        try:
+            with self.assertRaises(DatabaseError), transaction.atomic():
+                self.client.post(reverse('teachers:quiz_delete', args=[self.quiz1.pk]))
+            with self.assertRaises(DatabaseError), transaction.atomic():
+                delete_quiz(self.quiz1)
+        finally:
+            pre_delete.disconnect(fail, sender=Quiz)
+        self.quiz1.refresh_from_db()
+        # The rows of the quiz update its statistics and caches again.
+        questions[2].delete()
+        self.assertEqual(self.stats().questions_count, 2)
+        answer_key_version = self.quiz1.answer_key_version
+        choice.is_correct = False
+        choice.save()
+        self.quiz1.refresh_from_db()
+        self.assertNotEqual(self.quiz1.answer_key_version, answer_key_version)
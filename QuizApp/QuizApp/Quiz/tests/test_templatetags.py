@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from Quiz.models import (Quiz, Question, Student,
+                              Subject, User, TakenQuiz, render_badge)
+
+class RowFragmentCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.user1 = User.objects.create(username='student1', is_student=True)
+        self.user2 = User.objects.create(username='student2', is_student=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        Question.objects.create(quiz=self.quiz1, text='question1')
+        self.student1 = Student.objects.create(user=self.user1)
+        self.student2 = Student.objects.create(user=self.user2)
+        self.student1.interests.add(self.subject1)
+
+    def test_rows_follow_quiz_changes(self):
+        self.client.force_login(self.user1)
+        url = reverse('students:quiz_list')
+        self.assertContains(self.client.get(url), '1 questions')
+        Question.objects.create(quiz=self.quiz1, text='question2')
+        self.assertContains(self.client.get(url), '2 questions')
+        self.subject1.name = 'renamed'
+        self.subject1.save()
+        self.assertContains(self.client.get(url), '>renamed</span>')
+
+        self.client.force_login(self.teacher1)
+        url = reverse('teachers:quiz_change_list')
+        self.assertContains(self.client.get(url), '<td class="align-middle">2</td>')
+        Question.objects.create(quiz=self.quiz1, text='question3')
+        self.assertContains(self.client.get(url), '<td class="align-middle">3</td>')
+
+    def test_taken_quiz_rows_per_student(self):
+        url = reverse('students:taken_quiz_list')
+        TakenQuiz.objects.create(student=self.student1, quiz=self.quiz1, score=25.0)
+        TakenQuiz.objects.create(student=self.student2, quiz=self.quiz1, score=75.0)
+        self.client.force_login(self.user1)
+        self.assertContains(self.client.get(url), '<td>25.0</td>')
+        self.client.force_login(self.user2)
+        self.assertContains(self.client.get(url), '<td>75.0</td>')
+
+    def test_badge_is_escaped_and_memoized(self):
+        self.subject1.name = '<b>'
+        self.assertEqual(self.subject1.get_html_badge(), render_badge('<b>', '#007bff'))
+        self.assertIs(self.subject1.get_html_badge(), self.subject1.get_html_badge())
+        self.assertIn('&lt;b&gt;', self.subject1.get_html_badge())
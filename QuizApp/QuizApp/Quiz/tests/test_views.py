@@ -0,0 +1,294 @@
+import json
+from datetime import timedelta
+from unittest import mock
+from urllib.parse import urlencode
+
+from django.contrib.messages import get_messages
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from Quiz.attempts import QuizAttempt
+from Quiz.models import (Quiz, Question, Choice, Student, StudentAnswer,
+                              Subject, User, TakenQuiz)
+from Quiz.views import QuizResultsView
+
+class TakeQuizTestCase(TestCase):
+    def setUp(self):
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.user = User.objects.create(username='student1', is_student=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.student1 = Student.objects.create(user=self.user)
+        self.student1.interests.add(self.subject1)
+        self.question1 = Question.objects.create(quiz=self.quiz1, text='question1')
+        self.choice11 = Choice.objects.create(question=self.question1, text='choice11', is_correct=True)
+        self.choice12 = Choice.objects.create(question=self.question1, text='choice12', is_correct=False)
+        self.question2 = Question.objects.create(quiz=self.quiz1, text='question2')
+        self.choice21 = Choice.objects.create(question=self.question2, text='choice21', is_correct=False)
+        self.choice22 = Choice.objects.create(question=self.question2, text='choice22', is_correct=True)
+        self.url = reverse('students:take_quiz', args=[self.quiz1.pk])
+        self.client.force_login(self.user)
+
+    def answer(self, question, *choices):
+        return self.client.post(self.url, {'question': question.pk, 'answer': [choice.pk for choice in choices]})
+
+    def test_take_quiz(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['question'], self.question1)
+        self.assertEqual(response.context['progress'], 50)
+
+        self.assertRedirects(self.answer(self.question1, self.choice11), self.url)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['question'], self.question2)
+        self.assertEqual(response.context['progress'], 100)
+
+        self.assertRedirects(self.answer(self.question2, self.choice21), reverse('students:quiz_list'))
+        self.assertEqual(TakenQuiz.objects.get(student=self.student1, quiz=self.quiz1).score, 50.0)
+        self.assertNotIn(str(self.quiz1.pk), self.client.session[QuizAttempt.SESSION_KEY])
+
+    def test_attempt_survives_reloads_and_double_submits(self):
+        self.client.get(self.url)
+        self.answer(self.question1, self.choice11)
+        self.assertRedirects(self.answer(self.question1, self.choice12), self.url)
+        self.assertEqual(StudentAnswer.objects.filter(student=self.student1).count(), 1)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['question'], self.question2)
+
+    def test_attempt_resumes_from_stored_answers(self):
+        student_answer = StudentAnswer.objects.create(student=self.student1, quiz=self.quiz1, question=self.question1)
+        student_answer.answer.add(self.choice11)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['question'], self.question2)
+        self.assertEqual(response.context['progress'], 100)
+
+    def test_question_added_during_the_attempt_is_not_scored(self):
+        self.client.get(self.url)
+        question3 = Question.objects.create(quiz=self.quiz1, text='question3')
+        Choice.objects.create(question=question3, text='choice31', is_correct=True)
+        self.answer(self.question1, self.choice11)
+        self.answer(self.question2, self.choice22)
+        self.assertEqual(TakenQuiz.objects.get(student=self.student1, quiz=self.quiz1).score, 100.0)
+
+    def test_quiz_without_questions(self):
+        quiz2 = Quiz.objects.create(owner=self.teacher1, name='quiz2', subject=self.subject1)
+        response = self.client.get(reverse('students:take_quiz', args=[quiz2.pk]), follow=True)
+        self.assertRedirects(response, reverse('students:quiz_list'))
+        self.assertContains(response, 'The quiz quiz2 has no questions yet.')
+        self.assertFalse(TakenQuiz.objects.filter(quiz=quiz2).exists())
+
+    def test_steps_do_not_count_questions(self):
+        self.client.get(self.url)
+        # Session, user and student, quiz, question, choices.
+        with self.assertNumQueries(5):
+            self.client.get(self.url)
+
+
+class ExamModeTestCase(TestCase):
+    def setUp(self):
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.user = User.objects.create(username='student1', is_student=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1, exam_mode=True)
+        self.student1 = Student.objects.create(user=self.user)
+        self.questions = [Question.objects.create(quiz=self.quiz1, text='question%d' % i) for i in range(3)]
+        self.correct_choices = [
+            Choice.objects.create(question=question, text='correct', is_correct=True) for question in self.questions
+        ]
+        self.wrong_choices = [
+            Choice.objects.create(question=question, text='wrong', is_correct=False) for question in self.questions
+        ]
+        self.url = reverse('students:take_quiz', args=[self.quiz1.pk])
+        self.client.force_login(self.user)
+
+    def test_renders_all_questions(self):
+        # Session, user and student, quiz, taken check, questions, choices.
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
+        for question in self.questions:
+            self.assertContains(response, question.text)
+
+    def test_submit_exam(self):
+        data = {'question_%d' % choice.question_id: [choice.pk] for choice in self.correct_choices[:2]}
+        data['question_%d' % self.questions[2].pk] = [self.wrong_choices[2].pk]
+        response = self.client.post(self.url, data)
+        self.assertRedirects(response, reverse('students:quiz_list'), fetch_redirect_response=False)
+        self.assertEqual(StudentAnswer.objects.filter(student=self.student1, quiz=self.quiz1).count(), 3)
+        self.assertEqual(TakenQuiz.objects.get(student=self.student1, quiz=self.quiz1).score, 66.67)
+
+    def test_unanswered_question(self):
+        data = {'question_%d' % choice.question_id: [choice.pk] for choice in self.correct_choices[:2]}
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(StudentAnswer.objects.exists())
+
+    def test_exam_already_taken(self):
+        TakenQuiz.objects.create(student=self.student1, quiz=self.quiz1, score=50.0)
+        response = self.client.get(self.url, follow=True)
+        self.assertRedirects(response, reverse('students:taken_quiz_list'))
+        self.assertContains(response, 'You already took the quiz quiz1.')
+
+    def test_exam_without_questions(self):
+        quiz2 = Quiz.objects.create(owner=self.teacher1, name='quiz2', subject=self.subject1, exam_mode=True)
+        url = reverse('students:take_quiz', args=[quiz2.pk])
+        self.assertRedirects(self.client.get(url), reverse('students:quiz_list'), fetch_redirect_response=False)
+        self.assertRedirects(self.client.post(url), reverse('students:quiz_list'), fetch_redirect_response=False)
+        self.assertFalse(TakenQuiz.objects.filter(quiz=quiz2).exists())
+
+
+class QuizResultsTestCase(TestCase):
+    def setUp(self):
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.taken_quizzes = [
+            TakenQuiz.objects.create(
+                student=Student.objects.create(user=User.objects.create(username='student%d' % i, is_student=True)),
+                quiz=self.quiz1,
+                score=i * 10.0)
+            for i in range(5)
+        ]
+        self.url = reverse('teachers:quiz_results', args=[self.quiz1.pk])
+        self.client.force_login(self.teacher1)
+
+    def test_keyset_pagination(self):
+        seen = []
+        query = ''
+        with mock.patch.object(QuizResultsView, 'page_size', 2):
+            while query is not None:
+                response = self.client.get(self.url + '?' + query)
+                seen.extend(response.context['taken_quizzes'])
+                query = response.context['next_page_query']
+        self.assertEqual(seen, sorted(self.taken_quizzes, key=lambda taken_quiz: (taken_quiz.date, taken_quiz.pk), reverse=True))
+
+    def test_filters(self):
+        response = self.client.get(self.url, {'score_min': 15, 'score_max': 35})
+        self.assertEqual({taken_quiz.score for taken_quiz in response.context['taken_quizzes']}, {20.0, 30.0})
+        today = self.taken_quizzes[0].date.date()
+        response = self.client.get(self.url, {'date_to': today - timedelta(days=1)})
+        self.assertEqual(list(response.context['taken_quizzes']), [])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(self.url, {'cursor': 'nope'}).status_code, 404)
+
+
+class QuizResultsExportTestCase(TestCase):
+    def setUp(self):
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.teacher2 = User.objects.create(username='teacher2', is_teacher=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.question1 = Question.objects.create(quiz=self.quiz1, text='question1')
+        self.choice11 = Choice.objects.create(question=self.question1, text='choice11', is_correct=True)
+        self.choice12 = Choice.objects.create(question=self.question1, text='choice12', is_correct=False)
+        for i, choice in enumerate((self.choice11, self.choice12)):
+            student = Student.objects.create(user=User.objects.create(username='student%d' % i, is_student=True))
+            StudentAnswer.objects.create(student=student, quiz=self.quiz1, question=self.question1).answer.add(choice)
+            TakenQuiz.objects.create(student=student, quiz=self.quiz1, score=100.0 if choice.is_correct else 0.0)
+        self.url = reverse('teachers:quiz_results_export', args=[self.quiz1.pk])
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode().splitlines()
+
+    def test_csv(self):
+        self.client.force_login(self.teacher1)
+        lines = self.export(per_question='1')
+        self.assertEqual(lines[0], 'student,date,score,question1')
+        self.assertEqual([line.split(',')[::2] for line in lines[1:]], [['student0', '100.0'], ['student1', '0.0']])
+        self.assertTrue(lines[1].endswith(',1') and lines[2].endswith(',0'))
+
+    def test_jsonl_with_filters(self):
+        self.quiz1.shared_owners.add(self.teacher2)
+        self.client.force_login(self.teacher2)
+        lines = self.export(format='jsonl', per_question='1', score_max='50')
+        self.assertEqual(len(lines), 1)
+        result = json.loads(lines[0])
+        self.assertEqual((result['student'], result['correct']), ('student1', {str(self.question1.pk): 0}))
+
+    def test_other_teacher(self):
+        self.client.force_login(self.teacher2)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class QuestionDeleteTestCase(TestCase):
+    def setUp(self):
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.teacher2 = User.objects.create(username='teacher2', is_teacher=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quizzes = [
+            Quiz.objects.create(owner=self.teacher2, name='quiz%d' % i, subject=self.subject1) for i in range(10)
+        ]
+        for quiz in self.quizzes:
+            quiz.shared_owners.add(self.teacher1)
+        self.question1 = Question.objects.create(quiz=self.quizzes[-1], text='question1')
+        self.url = reverse('teachers:question_delete', args=[self.question1.quiz_id, self.question1.pk])
+
+    def test_shared_owner_can_delete(self):
+        self.client.force_login(self.teacher1)
+        # Session, user, question with its quiz.
+        with self.assertNumQueries(3):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        response = self.client.post(self.url)
+        self.assertRedirects(response, reverse('teachers:quiz_change', args=[self.question1.quiz_id]),
+                             fetch_redirect_response=False)
+        self.assertFalse(Question.objects.filter(pk=self.question1.pk).exists())
+        self.assertEqual([str(message) for message in get_messages(response.wsgi_request)],
+                         ['The question question1 was deleted with success!'])
+
+    def test_other_teacher_cannot_delete(self):
+        self.client.force_login(User.objects.create(username='teacher3', is_teacher=True))
+        self.assertEqual(self.client.post(self.url).status_code, 404)
+
+
+@override_settings(ROOT_URLCONF='Quiz.async_urls')
+class AsyncStudentViewsTestCase(TestCase):
+    def setUp(self):
+        self.teacher1 = User.objects.create(username='teacher1', is_teacher=True)
+        self.user = User.objects.create(username='student1', is_student=True)
+        self.subject1 = Subject.objects.create(name='subject1')
+        self.quiz1 = Quiz.objects.create(owner=self.teacher1, name='quiz1', subject=self.subject1)
+        self.quiz2 = Quiz.objects.create(owner=self.teacher1, name='quiz2', subject=self.subject1)
+        self.student1 = Student.objects.create(user=self.user)
+        self.student1.interests.add(self.subject1)
+        self.question1 = Question.objects.create(quiz=self.quiz1, text='question1')
+        self.choice11 = Choice.objects.create(question=self.question1, text='choice11', is_correct=True)
+        self.choice12 = Choice.objects.create(question=self.question1, text='choice12', is_correct=False)
+        self.question2 = Question.objects.create(quiz=self.quiz1, text='question2')
+        self.choice21 = Choice.objects.create(question=self.question2, text='choice21', is_correct=False)
+        self.choice22 = Choice.objects.create(question=self.question2, text='choice22', is_correct=True)
+        Question.objects.create(quiz=self.quiz2, text='question1')
+        self.url = reverse('students:take_quiz', args=[self.quiz1.pk])
+        self.async_client.force_login(self.user)
+
+    async def answer(self, question, *choices):
+        # Form-encoded: the multipart body of AsyncClient can't be parsed by ASGIRequest on Django 4.1.
+        data = urlencode({'question': question.pk, 'answer': [choice.pk for choice in choices]}, doseq=True)
+        return await self.async_client.post(self.url, data, content_type='application/x-www-form-urlencoded')
+
+    async def test_take_quiz(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.context['question'], self.question1)
+        self.assertEqual(response.context['progress'], 50)
+
+        response = await self.answer(self.question1, self.choice11)
+        self.assertRedirects(response, self.url, fetch_redirect_response=False)
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.context['question'], self.question2)
+
+        response = await self.answer(self.question2, self.choice21)
+        self.assertRedirects(response, reverse('students:quiz_list'), fetch_redirect_response=False)
+        taken_quiz = await TakenQuiz.objects.aget(student=self.student1, quiz=self.quiz1)
+        self.assertEqual(taken_quiz.score, 50.0)
+
+        response = await self.async_client.get(reverse('students:quiz_list'))
+        self.assertEqual(response.context['quizzes'], [self.quiz2])
+        response = await self.async_client.get(reverse('students:taken_quiz_list'))
+        self.assertEqual(response.context['taken_quizzes'], [taken_quiz])
+        response = await self.async_client.get(self.url)
+        self.assertRedirects(response, reverse('students:taken_quiz_list'), fetch_redirect_response=False)
+
+    def test_student_required(self):
+        self.client.force_login(self.teacher1)
+        response = self.client.get(self.url)
+        self.assertRedirects(response, '%s?next=%s' % (reverse('login'), self.url), fetch_redirect_response=False)
@@ -1,15 +1,26 @@
+from django.conf import settings
 from django.urls import include, path
 
-from . import views
+from . import async_views, views
+
+
+def student_urlpatterns(asynchronous=False):
+    if asynchronous:
+        quiz_list, taken_quiz_list, take_quiz = async_views.quiz_list, async_views.taken_quiz_list, async_views.take_quiz
+    else:
+        quiz_list, taken_quiz_list, take_quiz = \
+            views.StudentQuizListView.as_view(), views.TakenQuizListView.as_view(), views.take_quiz
+    return [
+        path('', quiz_list, name='quiz_list'),
+        path('interests/', views.StudentInterestsView.as_view(), name='student_interests'),
+        path('taken/', taken_quiz_list, name='taken_quiz_list'),
+        path('quiz/<int:pk>/', take_quiz, name='take_quiz'),
+    ]
+
 
 urlpatterns = [
     path('', views.main, name='main'),
-    path('students/', include(([
-        path('', views.StudentQuizListView.as_view(), name='quiz_list'),
-        path('interests/', views.StudentInterestsView.as_view(), name='student_interests'),
-        path('taken/', views.TakenQuizListView.as_view(), name='taken_quiz_list'),
-        path('quiz/<int:pk>/', views.take_quiz, name='take_quiz'),
-    ], 'classroom'), namespace='students')),
+    path('students/', include((student_urlpatterns(settings.QUIZ_ASYNC_VIEWS), 'classroom'), namespace='students')),
 
     path('teachers/', include(([
         path('', views.QuizListView.as_view(), name='quiz_change_list'),
@@ -17,9 +28,16 @@ urlpatterns = [
         path('quiz/<int:pk>/', views.QuizUpdateView.as_view(), name='quiz_change'),
         path('quiz/<int:pk>/delete/', views.QuizDeleteView.as_view(), name='quiz_delete'), # yet to test shared quiz delete operation
         path('quiz/<int:pk>/results/', views.QuizResultsView.as_view(), name='quiz_results'),
+        path('quiz/<int:pk>/results/export/', views.QuizResultsExportView.as_view(), name='quiz_results_export'),
+        path('quiz/<int:pk>/results/items/', views.QuizItemAnalysisView.as_view(), name='quiz_item_analysis'),
+        path('quiz/<int:pk>/results/leaderboard/', views.QuizLeaderboardView.as_view(), name='quiz_leaderboard'),
         path('quiz/<int:pk>/question/add/', views.question_add, name='question_add'),
+        path('quiz/<int:pk>/import/', views.quiz_import, name='quiz_import'),
         path('quiz/<int:quiz_pk>/question/<int:question_pk>/', views.question_change, name='question_change'),
         path('quiz/<int:pk>/share/', views.share_with_teacher, name='quiz_share'),
         path('quiz/<int:quiz_pk>/question/<int:question_pk>/delete/', views.QuestionDeleteView.as_view(), name='question_delete'),
+        path('jobs/', views.JobListView.as_view(), name='job_list'),
+        path('jobs/<int:pk>/', views.JobDetailView.as_view(), name='job_detail'),
+        path('jobs/<int:pk>/output/', views.job_output, name='job_output'),
     ], 'classroom'), namespace='teachers')),
 ]
\ No newline at end of file
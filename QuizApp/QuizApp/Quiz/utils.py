@@ -1,5 +1,10 @@
-from django.contrib.auth import REDIRECT_FIELD_NAME
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import REDIRECT_FIELD_NAME, get_user
 from django.contrib.auth.decorators import user_passes_test
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import resolve_url
 
 
 def student_required(function=None, redirect_field_name=REDIRECT_FIELD_NAME, login_url='login'):
@@ -24,3 +29,15 @@ def teacher_required(function=None, redirect_field_name=REDIRECT_FIELD_NAME, log
     if function:
         return actual_decorator(function)
     return actual_decorator
+
+
+def async_student_required(function, redirect_field_name=REDIRECT_FIELD_NAME, login_url='login'):
+    # login_required and student_required for async views. The session and the user are loaded in a thread, so
+    # that the view can then read request.session and request.user without any blocking query.
+    @wraps(function)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await sync_to_async(get_user)(request)
+        if not (request.user.is_active and request.user.is_student):
+            return redirect_to_login(request.get_full_path(), resolve_url(login_url), redirect_field_name)
+        return await function(request, *args, **kwargs)
+    return wrapper
@@ -1,17 +1,35 @@
+import io
+
 from django.contrib import messages
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
-from django.db import transaction
-from django.db.models import Avg, Count
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Count
 from django.forms import inlineformset_factory
-from django.http import HttpResponseNotFound
+from django.http import FileResponse, Http404, HttpResponseBadRequest, HttpResponseNotFound, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
 from django.utils.decorators import method_decorator
 from django.views.generic import CreateView, DeleteView, DetailView, ListView, TemplateView, UpdateView
 
-from Quiz.forms import BaseAnswerInlineFormSet, QuestionForm, ShareTeacherForm, StudentInterestsForm, StudentSignUpForm, TakeQuizForm, TeacherSignUpForm
-from Quiz.models import Choice, Quiz, Question, Student, StudentAnswer, TakenQuiz, User
+from Quiz.analysis import get_item_analysis, get_last_item_analysis
+from Quiz.answer_buffer import flush_answers, get_answer_buffer
+from Quiz.attempts import QuizAttempt
+from Quiz.catalog import available_quizzes
+from Quiz.deletion import hide_quiz
+from Quiz.exports import EXPORT_FORMATS, export_results
+from Quiz.forms import MAX_CHOICES, MIN_CHOICES, BaseAnswerInlineFormSet, QuestionForm, QuizImportForm, QuizResultsFilterForm, ShareTeacherForm, StudentInterestsForm, StudentSignUpForm, TakeExamForm, TakeQuizForm, TeacherSignUpForm
+from Quiz.importers import import_questions
+from Quiz.jobs import enqueue, find_job, get_output_path, runs_in_background
+from Quiz.leaderboard import get_rank, get_sorted_scores, rank_taken_quizzes
+from Quiz.models import Choice, Job, Quiz, Question, Student, TakenQuiz, User
+from Quiz.pagination import DateKeysetPaginator
+from Quiz.regrading import regrade_quiz
+from Quiz.response_cache import CachedResponseMixin
+from Quiz.scoring import score_quiz
+from Quiz.signals import end_quiz_deletion
+from Quiz.stats import get_quiz_stats
 from Quiz.utils import student_required, teacher_required
 
 class SignUpView(TemplateView):
@@ -58,14 +76,13 @@ class StudentQuizListView(ListView):
     template_name = 'students/quiz_list.html'
 
     def get_queryset(self):
+        '''
+            The cached catalogs of the subjects of interest (see Quiz.catalog), minus the quizzes already taken.
+        '''
         student = self.request.user.student
-        student_interests = student.interests.values_list('pk', flat=True)
-        taken_quizzes = student.quizzes.values_list('pk', flat=True)
-        queryset = Quiz.objects.filter(subject__in=student_interests) \
-            .exclude(pk__in=taken_quizzes) \
-            .annotate(questions_count=Count('questions')) \
-            .filter(questions_count__gt=0)
-        return queryset
+        student_interests = list(student.interests.values_list('pk', flat=True))
+        taken_quizzes = set(student.quizzes.values_list('pk', flat=True))
+        return available_quizzes(student_interests, taken_quizzes)
 
 
 @method_decorator([login_required, student_required], name='dispatch')
@@ -76,46 +93,78 @@ class TakenQuizListView(ListView):
 
     def get_queryset(self):
         queryset = self.request.user.student.taken_quizzes \
-            .select_related('quiz', 'quiz__subject') \
+            .select_related('quiz', 'quiz__subject', 'quiz__stats') \
             .order_by('quiz__name')
-        return queryset
+        return rank_taken_quizzes(queryset)
 
 
 @login_required
 @student_required
 def take_quiz(request, pk):
-    quiz = get_object_or_404(Quiz, pk=pk)
+    '''
+        Serves the quiz one question at a time. The order of the questions and the next one to answer are kept in
+        a QuizAttempt stored in the session when the student starts the quiz.
+    '''
+    quiz = get_object_or_404(Quiz, pk=pk, deleting=False)
     student = request.user.student
-    if student.quizzes.filter(pk=pk).exists():
-        return render(request, 'students/taken_quiz.html')
-
-    total_questions = quiz.questions.count()
-    unanswered_questions = student.get_unanswered_questions(quiz)
-    total_unanswered_questions = unanswered_questions.count()
-    progress = 100 - round(((total_unanswered_questions - 1) / total_questions) * 100)
-    question = unanswered_questions.first()
-
+    if quiz.exam_mode:
+        return _take_exam(request, student, quiz)
+    attempt = QuizAttempt.from_session(request.session, quiz.pk)
+    if attempt is None:
+        if student.quizzes.filter(pk=pk).exists():
+            return _already_taken(request, quiz)
+        # The unanswered questions are read from the database.
+        flush_answers(student.pk)
+        attempt = QuizAttempt.start(student, quiz)
+        if not attempt.question_ids:
+            return _quiz_without_questions(request, quiz)
+        attempt.save(request.session)
+
+    if attempt.finished:
+        flush_answers(student.pk)
+        with transaction.atomic():
+            return _complete_quiz(request, student, quiz, attempt)
+
+    question = Question.objects.filter(pk=attempt.question_id, quiz=quiz).first()
+    if not question:
+        # The question was deleted since the attempt started.
+        QuizAttempt.start(student, quiz).save(request.session)
+        return redirect('students:take_quiz', pk)
+    return _answer_question(request, student, quiz, attempt, question)
+
+
+def _answer_question(request, student, quiz, attempt, question):
+    '''
+        Shows the current question of the attempt and saves its answer.
+    '''
     if request.method == 'POST':
+        if request.POST.get('question') != str(question.pk):
+            # The form of an already answered question was submitted again.
+            return redirect('students:take_quiz', quiz.pk)
         form = TakeQuizForm(question=question, data=request.POST)
         if form.is_valid():
-            with transaction.atomic():
-                student_answer = form.save(commit=True, student=student)
-                if student.get_unanswered_questions(quiz).exists():
-                    return redirect('students:take_quiz', pk)
-                else:
-                    '''
-                        Scoring Schema should be implemented here. Currently there is no partial/negative marking.
-                    '''
-                    student_correct_answers = 0
-                    for question in quiz.questions.values_list('pk', flat=True):
-                        if set(Choice.objects.filter(question=question, is_correct=True).values_list('pk', flat=True))\
-                            == set(StudentAnswer.objects.filter(answer__question=question).distinct(). \
-                                   first().answer.values_list('pk', flat=True)):
-                            student_correct_answers += 1
-                    score = round((student_correct_answers / total_questions) * 100.0, 2)
-                    TakenQuiz.objects.create(student=student, quiz=quiz, score=score)
-                    messages.success(request, 'You completed the quiz %s with %s points' % (quiz.name, score))
-                    return redirect('students:quiz_list')
+            answer_buffer = get_answer_buffer()
+            if answer_buffer is not None:
+                # Written in batches by the buffer (see Quiz.answer_buffer), flushed before the attempt is scored.
+                choice_ids = [choice.pk for choice in form.cleaned_data['answer']]
+                answer_buffer.add(student.pk, quiz.pk, question.pk, choice_ids)
+                attempt.advance()
+                if attempt.finished:
+                    answer_buffer.flush(student.pk)
+                    return _complete_quiz(request, student, quiz, attempt)
+            else:
+                with transaction.atomic():
+                    try:
+                        with transaction.atomic():
+                            form.save(student=student)
+                    except IntegrityError:
+                        # Already answered, e.g. from another tab.
+                        pass
+                    attempt.advance()
+                    if attempt.finished:
+                        return _complete_quiz(request, student, quiz, attempt)
+            attempt.save(request.session)
+            return redirect('students:take_quiz', quiz.pk)
     else:
         form = TakeQuizForm(question=question)
 
@@ -123,9 +172,78 @@ def take_quiz(request, pk):
         'quiz': quiz,
         'question': question,
         'form': form,
-        'progress': progress
+        'progress': attempt.progress
     })
 
+
+def _take_exam(request, student, quiz):
+    '''
+        Exam mode: all the questions are served on a single page and submitted at once.
+    '''
+    if student.quizzes.filter(pk=quiz.pk).exists():
+        return _already_taken(request, quiz)
+    questions = student.get_unanswered_questions(quiz).prefetch_related('choices')
+    attempt = None
+    if quiz.sample_size:
+        # The sampled questions are kept in the session until the exam is submitted.
+        attempt = QuizAttempt.from_session(request.session, quiz.pk)
+        if attempt is None:
+            attempt = QuizAttempt.start(student, quiz)
+            attempt.save(request.session)
+        questions = questions.filter(pk__in=attempt.question_ids)
+
+    if request.method == 'POST':
+        form = TakeExamForm(questions=questions, data=request.POST)
+        if not form.questions and not student.quiz_answers.filter(quiz=quiz).exists():
+            return _quiz_without_questions(request, quiz)
+        if form.is_valid():
+            if attempt is not None:
+                attempt.discard(request.session)
+            try:
+                with transaction.atomic():
+                    form.save(student=student)
+                    score = score_quiz(student, quiz, question_ids=attempt and attempt.question_ids)
+                    TakenQuiz.objects.create(student=student, quiz=quiz, score=score)
+            except IntegrityError:
+                # The exam was submitted twice.
+                return redirect('students:quiz_list')
+            messages.success(request, 'You completed the quiz %s with %s points' % (quiz.name, score))
+            return redirect('students:quiz_list')
+    else:
+        form = TakeExamForm(questions=questions)
+        if not form.questions and not student.quiz_answers.filter(quiz=quiz).exists():
+            return _quiz_without_questions(request, quiz)
+
+    return render(request, 'students/take_exam_form.html', {
+        'quiz': quiz,
+        'form': form
+    })
+
+
+def _already_taken(request, quiz):
+    messages.info(request, 'You already took the quiz %s.' % quiz.name)
+    return redirect('students:taken_quiz_list')
+
+
+def _quiz_without_questions(request, quiz):
+    # Nothing to answer: no attempt is recorded.
+    messages.error(request, 'The quiz %s has no questions yet.' % quiz.name)
+    return redirect('students:quiz_list')
+
+
+def _complete_quiz(request, student, quiz, attempt):
+    # Scored over the questions of the attempt only: a question added to the quiz meanwhile wasn't asked.
+    score = score_quiz(student, quiz, question_ids=attempt.question_ids)
+    attempt.discard(request.session)
+    try:
+        with transaction.atomic():
+            TakenQuiz.objects.create(student=student, quiz=quiz, score=score)
+    except IntegrityError:
+        # Already completed, e.g. from another tab.
+        return redirect('students:quiz_list')
+    messages.success(request, 'You completed the quiz %s with %s points' % (quiz.name, score))
+    return redirect('students:quiz_list')
+
 class TeacherSignUpView(CreateView):
     model = User
     form_class = TeacherSignUpForm
@@ -142,7 +260,7 @@ class TeacherSignUpView(CreateView):
 
 
 @method_decorator([login_required, teacher_required], name='dispatch')
-class QuizListView(ListView):
+class QuizListView(CachedResponseMixin, ListView):
     '''
         Basic view of all the quizzes created by or shared with the teacher.
     '''
@@ -151,12 +269,11 @@ class QuizListView(ListView):
     context_object_name = 'quizzes'
     template_name = 'teachers/quiz_change_list.html'
 
+    def get_cached_quiz_ids(self):
+        return list(Quiz.objects.editable_by(self.request.user).values_list('pk', flat=True))
+
     def get_queryset(self):
-        queryset = self.request.user.quizzes.select_related('subject')
-        shared_quizzes_queryset = self.request.user.shared_quizzes.select_related('subject')
-        
-        return (queryset | shared_quizzes_queryset) \
-            .annotate(questions_count=Count('questions', distinct=True)).annotate(taken_count=Count('taken_quizzes', distinct=True))
+        return Quiz.objects.editable_by(self.request.user).select_related('subject', 'stats')
 
 
 @method_decorator([login_required, teacher_required], name='dispatch')
@@ -165,7 +282,7 @@ class QuizCreateView(CreateView):
         Basic view for creating a quiz.
     '''
     model = Quiz
-    fields = ('name', 'subject', )
+    fields = ('name', 'subject', 'exam_mode', 'sample_size', )
     template_name = 'teachers/quiz_add_form.html'
 
     def form_valid(self, form):
@@ -177,22 +294,22 @@ class QuizCreateView(CreateView):
 
 
 @method_decorator([login_required, teacher_required], name='dispatch')
-class QuizUpdateView(UpdateView):
+class QuizUpdateView(CachedResponseMixin, UpdateView):
     '''
         View for updating a quiz. Delete button is not visible to Shared owners.
     '''
     model = Quiz
-    fields = ('name', 'subject', )
+    fields = ('name', 'subject', 'exam_mode', 'sample_size', )
     context_object_name = 'quiz'
     template_name = 'teachers/quiz_change_form.html'
 
     def get_context_data(self, **kwargs):
-        kwargs['questions'] = self.get_object().questions.annotate(choices_count=Count('choices'))
-        kwargs['shared_quiz'] = (self.get_object() in self.request.user.shared_quizzes.all())
+        kwargs['questions'] = self.object.questions.annotate(choices_count=Count('choices'))
+        kwargs['shared_quiz'] = (self.object.owner_id != self.request.user.pk)
         return super().get_context_data(**kwargs)
 
     def get_queryset(self):
-        return (self.request.user.quizzes.all() | self.request.user.shared_quizzes.all())
+        return Quiz.objects.editable_by(self.request.user)
 
     def get_success_url(self):
         return reverse('teachers:quiz_change', kwargs={'pk': self.object.pk})
@@ -207,17 +324,29 @@ class QuizDeleteView(DeleteView):
     template_name = 'teachers/quiz_delete_confirm.html'
     success_url = reverse_lazy('teachers:quiz_change_list')
 
-    def delete(self, request, *args, **kwargs):
-        quiz = self.get_object()
-        messages.success(request, 'The quiz %s was deleted with success!' % quiz.name)
-        return super().delete(request, *args, **kwargs)
+    def form_valid(self, form):
+        quiz = self.object
+        if runs_in_background(quiz):
+            # Hidden before the job deletes any row, and only if the job is queued: it couldn't be retried otherwise.
+            with transaction.atomic():
+                hide_quiz(quiz)
+                job = enqueue('delete_quiz', self.request.user, 'Delete the quiz %s' % quiz.name, quiz=quiz)
+            messages.success(self.request, 'The quiz %s is being deleted.' % quiz.name)
+            return redirect('teachers:job_detail', job.pk)
+        messages.success(self.request, 'The quiz %s was deleted with success!' % quiz.name)
+        # Deleting the quiz clears its pk.
+        quiz_pk = quiz.pk
+        try:
+            return super().form_valid(form)
+        finally:
+            end_quiz_deletion(quiz_pk)
 
     def get_queryset(self):
-        return (self.request.user.quizzes.all() | self.request.user.shared_quizzes.all())
+        return Quiz.objects.editable_by(self.request.user)
 
 
 @method_decorator([login_required, teacher_required], name='dispatch')
-class QuizResultsView(DetailView):
+class QuizResultsView(CachedResponseMixin, DetailView):
     '''
         Basic view for quiz results. Shared owners can also view this.
     '''
@@ -225,21 +354,146 @@ class QuizResultsView(DetailView):
     context_object_name = 'quiz'
     template_name = 'teachers/quiz_results.html'
 
+    page_size = 50
+
     def get_context_data(self, **kwargs):
-        quiz = self.get_object()
-        taken_quizzes = quiz.taken_quizzes.select_related('student__user').order_by('-date')
-        total_taken_quizzes = taken_quizzes.count()
-        quiz_score = quiz.taken_quizzes.aggregate(average_score=Avg('score'))
+        '''
+            Attempts are listed from the most recent one, a page at a time (keyset pagination on date and id).
+        '''
+        quiz = self.object
+        filter_form = QuizResultsFilterForm(self.request.GET)
+        taken_quizzes = quiz.taken_quizzes.select_related('student__user')
+        if filter_form.is_valid():
+            taken_quizzes = filter_form.filter(taken_quizzes)
+        taken_quizzes, next_cursor = DateKeysetPaginator(taken_quizzes, self.page_size) \
+            .page(self.request.GET.get('cursor'))
+        query = self.request.GET.copy()
+        query.pop('cursor', None)
+        first_page_query = query.urlencode()
+        next_page_query = None
+        if next_cursor:
+            query['cursor'] = next_cursor
+            next_page_query = query.urlencode()
         extra_context = {
             'taken_quizzes': taken_quizzes,
-            'total_taken_quizzes': total_taken_quizzes,
-            'quiz_score': quiz_score
+            'first_page_query': first_page_query,
+            'next_page_query': next_page_query,
+            'filter_form': filter_form,
+            'total_taken_quizzes': get_quiz_stats(quiz).attempts_count,
+            'quiz_stats': get_quiz_stats(quiz)
         }
         kwargs.update(extra_context)
         return super().get_context_data(**kwargs)
 
     def get_queryset(self):
-        return (self.request.user.quizzes.all() | self.request.user.shared_quizzes.all())
+        return Quiz.objects.editable_by(self.request.user).select_related('stats')
+
+
+@method_decorator([login_required, teacher_required], name='dispatch')
+class QuizItemAnalysisView(DetailView):
+    '''
+        Item analysis of the quiz (see Quiz.analysis). Shared owners can also view this. Not served from the response
+        cache: the analysis computed by a job changes the page without changing the version of the quiz.
+    '''
+    model = Quiz
+    context_object_name = 'quiz'
+    template_name = 'teachers/quiz_item_analysis.html'
+
+    def get_context_data(self, **kwargs):
+        quiz = self.object
+        if runs_in_background(quiz):
+            questions, up_to_date = get_last_item_analysis(quiz)
+            if not up_to_date:
+                # A job already running is waited for, rather than queuing another one on every view of the page.
+                kwargs['analysis_job'] = find_job('item_analysis', quiz, [Job.QUEUED, Job.RUNNING]) or enqueue(
+                    'item_analysis', self.request.user, 'Item analysis of the quiz %s' % quiz.name, quiz=quiz
+                )
+        else:
+            questions = get_item_analysis(quiz)
+        kwargs['questions'] = questions
+        return super().get_context_data(**kwargs)
+
+    def get_queryset(self):
+        return Quiz.objects.editable_by(self.request.user).select_related('stats')
+
+
+@method_decorator([login_required, teacher_required], name='dispatch')
+class QuizLeaderboardView(CachedResponseMixin, DetailView):
+    '''
+        The best attempts of the quiz. Shared owners can also view this.
+    '''
+    model = Quiz
+    context_object_name = 'quiz'
+    template_name = 'teachers/quiz_leaderboard.html'
+
+    size = 10
+
+    def get_context_data(self, **kwargs):
+        '''
+            The best attempts are read from the score index of TakenQuiz, their ranks from the sorted scores.
+        '''
+        quiz = self.object
+        scores = get_sorted_scores([quiz.pk], {quiz.pk: get_quiz_stats(quiz).attempts_count})[quiz.pk]
+        taken_quizzes = list(
+            quiz.taken_quizzes.select_related('student__user').order_by('-score', 'date', 'pk')[:self.size]
+        )
+        for taken_quiz in taken_quizzes:
+            taken_quiz.rank = get_rank(scores, taken_quiz.score)
+        kwargs.update({'taken_quizzes': taken_quizzes, 'total_taken_quizzes': len(scores)})
+        return super().get_context_data(**kwargs)
+
+    def get_queryset(self):
+        return Quiz.objects.editable_by(self.request.user).select_related('stats')
+
+
+@method_decorator([login_required, teacher_required], name='dispatch')
+class QuizResultsExportView(QuizResultsView):
+    '''
+        Streams the results of a quiz as CSV or JSON lines, with the filters of the results page. Shared owners can
+        also export them.
+    '''
+    chunk_size = 2000
+
+    def get(self, request, *args, **kwargs):
+        quiz = self.get_object()
+        export_format = request.GET.get('format', 'csv')
+        filter_form = QuizResultsFilterForm(request.GET)
+        if export_format not in EXPORT_FORMATS or not filter_form.is_valid():
+            return HttpResponseBadRequest('Invalid export parameters')
+        if request.GET.get('background') == '1':
+            # The results page links here without a form: it is cached, and can't embed a CSRF token.
+            return render(request, 'teachers/quiz_results_export_confirm.html', {
+                'quiz': quiz,
+                'export_formats': EXPORT_FORMATS,
+                'query': request.GET.urlencode(),
+            })
+        lines = export_results(
+            quiz,
+            filter_form.filter(quiz.taken_quizzes.all()),
+            export_format,
+            per_question=(request.GET.get('per_question') == '1'),
+            chunk_size=self.chunk_size
+        )
+        response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[export_format])
+        response['Content-Disposition'] = 'attachment; filename="quiz-%d-results.%s"' % (quiz.pk, export_format)
+        return response
+
+    def post(self, request, *args, **kwargs):
+        '''
+            Queues the export as a job, downloaded from the job page once written.
+        '''
+        quiz = self.get_object()
+        export_format = request.POST.get('format', 'csv')
+        filter_form = QuizResultsFilterForm(request.GET)
+        if export_format not in EXPORT_FORMATS or not filter_form.is_valid():
+            return HttpResponseBadRequest('Invalid export parameters')
+        job = enqueue(
+            'export_results', request.user, 'Export the results of %s' % quiz.name, quiz=quiz,
+            export_format=export_format,
+            per_question=(request.POST.get('per_question') == '1'),
+            filters={name: value for name, value in request.GET.items() if name in filter_form.fields},
+        )
+        return redirect('teachers:job_detail', job.pk)
 
 
 @login_required
@@ -248,9 +502,7 @@ def question_add(request, pk):
     '''
         View for adding a question. Shared owners of the quiz can add a question.
     '''
-    quiz = Quiz.objects.filter(pk=pk, owner=request.user).first()
-    if not quiz:
-        quiz = request.user.shared_quizzes.filter(pk=pk).first()
+    quiz = Quiz.objects.editable_by(request.user).filter(pk=pk).first()
     if not quiz:
         return HttpResponseNotFound("Can't add question to this quiz")
 
@@ -267,6 +519,34 @@ def question_add(request, pk):
     return render(request, 'teachers/question_add_form.html', {'quiz': quiz, 'form': form})
 
 
+@login_required
+@teacher_required
+def quiz_import(request, pk):
+    '''
+        View for importing questions into a quiz from a file. Shared owners of the quiz can import questions.
+    '''
+    quiz = Quiz.objects.editable_by(request.user).filter(pk=pk).first()
+    if not quiz:
+        return HttpResponseNotFound("Can't import questions to this quiz")
+
+    if request.method == 'POST':
+        form = QuizImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            file = io.TextIOWrapper(form.cleaned_data['file'], encoding='utf-8', newline='')
+            try:
+                result = import_questions(quiz, file, form.cleaned_data['format'])
+            except (ValidationError, UnicodeDecodeError) as error:
+                form.add_error('file', error)
+            else:
+                messages.success(request, 'Imported %d questions and %d choices in %.2f s (%d questions/s).'
+                                 % (result.questions, result.choices, result.seconds, result.questions_per_second))
+                return redirect('teachers:quiz_change', quiz.pk)
+    else:
+        form = QuizImportForm()
+
+    return render(request, 'teachers/quiz_import_form.html', {'quiz': quiz, 'form': form})
+
+
 @login_required
 @teacher_required
 def share_with_teacher(request, pk):
@@ -298,9 +578,7 @@ def question_change(request, quiz_pk, question_pk):
     '''
         View for changing a question. Shared owners of the quiz can change a question.
     '''
-    quiz = Quiz.objects.filter(pk=quiz_pk, owner=request.user).first()
-    if not quiz:
-        quiz = request.user.shared_quizzes.filter(pk=quiz_pk).first()
+    quiz = Quiz.objects.editable_by(request.user).filter(pk=quiz_pk).first()
     if not quiz:
         return HttpResponseNotFound("Can't add question to this quiz")
     question = get_object_or_404(Question, pk=question_pk, quiz=quiz)
@@ -310,9 +588,9 @@ def question_change(request, quiz_pk, question_pk):
         Choice,
         formset=BaseAnswerInlineFormSet,
         exclude=[],
-        min_num=2,
+        min_num=MIN_CHOICES,
         validate_min=True,
-        max_num=5,
+        max_num=MAX_CHOICES,
         validate_max=True
     )
 
@@ -323,7 +601,26 @@ def question_change(request, quiz_pk, question_pk):
             with transaction.atomic():
                 form.save()
                 formset.save()
-            messages.success(request, 'Question and choices saved with success!')
+                regraded = 0
+                regrade_job = None
+                if formset.new_objects or formset.deleted_objects or any(
+                    'is_correct' in fields for _, fields in formset.changed_objects
+                ):
+                    # The answer key changed, the scores of the attempts are stale.
+                    if runs_in_background(quiz):
+                        regrade_job = enqueue('regrade_quiz', request.user, 'Regrade the quiz %s' % quiz.name,
+                                              quiz=quiz)
+                    else:
+                        regraded = regrade_quiz(quiz)
+            if regrade_job:
+                messages.success(request, 'Question and choices saved with success! The attempts are being '
+                                 'regraded.')
+                return redirect('teachers:job_detail', regrade_job.pk)
+            elif regraded:
+                messages.success(request, 'Question and choices saved with success! %d attempts were regraded.'
+                                 % regraded)
+            else:
+                messages.success(request, 'Question and choices saved with success!')
             return redirect('teachers:quiz_change', quiz.pk)
     else:
         form = QuestionForm(instance=question)
@@ -347,25 +644,59 @@ class QuestionDeleteView(DeleteView):
     pk_url_kwarg = 'question_pk'
 
     def get_context_data(self, **kwargs):
-        question = self.get_object()
-        kwargs['quiz'] = question.quiz
+        kwargs['quiz'] = self.object.quiz
         return super().get_context_data(**kwargs)
 
-    def delete(self, request, *args, **kwargs):
-        question = self.get_object()
-        messages.success(request, 'The question %s was deleted with success!' % question.text)
-        return super().delete(request, *args, **kwargs)
+    def form_valid(self, form):
+        messages.success(self.request, 'The question %s was deleted with success!' % self.object.text)
+        return super().form_valid(form)
 
     def get_queryset(self):
-        queryset = Question.objects.filter(quiz__owner=self.request.user)
-        shared_quizzes = self.request.user.shared_quizzes.all()
-        for shared_quiz in shared_quizzes:
-            queryset = (queryset | Question.objects.filter(quiz=shared_quiz))
-        return queryset
+        return Question.objects \
+            .filter(quiz__in=Quiz.objects.editable_by(self.request.user)) \
+            .select_related('quiz')
 
     def get_success_url(self):
-        question = self.get_object()
-        return reverse('teachers:quiz_change', kwargs={'pk': question.quiz_id})
+        return reverse('teachers:quiz_change', kwargs={'pk': self.object.quiz_id})
+
+
+@method_decorator([login_required, teacher_required], name='dispatch')
+class JobListView(ListView):
+    '''
+        The background jobs (see Quiz.jobs) of the teacher, most recent first.
+    '''
+    context_object_name = 'jobs'
+    template_name = 'teachers/job_list.html'
+    paginate_by = 50
+
+    def get_queryset(self):
+        return Job.objects.filter(owner=self.request.user).order_by('-pk')
+
+
+@method_decorator([login_required, teacher_required], name='dispatch')
+class JobDetailView(DetailView):
+    '''
+        Status and progress of a background job, reloaded until it is finished.
+    '''
+    context_object_name = 'job'
+    template_name = 'teachers/job_detail.html'
+
+    def get_queryset(self):
+        return Job.objects.filter(owner=self.request.user)
+
+
+@login_required
+@teacher_required
+def job_output(request, pk):
+    '''
+        Downloads the file written by a job, e.g. an export of results.
+    '''
+    job = get_object_or_404(Job.objects.exclude(output=''), pk=pk, owner=request.user, status=Job.DONE)
+    try:
+        return FileResponse(open(get_output_path(job), 'rb'), as_attachment=True, filename=job.output)
+    except FileNotFoundError:
+        raise Http404('The file of this job was removed.')
+
 
 def main(request):
     # Homepage
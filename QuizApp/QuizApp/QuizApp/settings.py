@@ -45,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'Quiz.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,12 +57,24 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'QuizApp.urls'
 
+# QUIZ_CACHED_TEMPLATES=0 reloads the templates on every render (e.g. while editing them). Otherwise they are
+# compiled once per process by the cached loader.
+QUIZ_CACHED_TEMPLATES = os.environ.get('QUIZ_CACHED_TEMPLATES', '1') == '1'
+
+QUIZ_TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
+        # The app directories are searched by the loaders.
+        'APP_DIRS': False,
         'OPTIONS': {
+            'loaders': [('django.template.loaders.cached.Loader', QUIZ_TEMPLATE_LOADERS)] if QUIZ_CACHED_TEMPLATES
+            else QUIZ_TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -78,13 +91,98 @@ WSGI_APPLICATION = 'QuizApp.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# QUIZ_DB_PROFILE selects the database: 'sqlite' (default) or 'postgres', configured with the QUIZ_DB_* variables.
+
+DATABASE_PROFILES = {
+    'sqlite': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('QUIZ_DB_NAME', str(BASE_DIR / 'db.sqlite3')),
+    },
+    'postgres': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('QUIZ_DB_NAME', 'quizapp'),
+        'USER': os.environ.get('QUIZ_DB_USER', ''),
+        'PASSWORD': os.environ.get('QUIZ_DB_PASSWORD', ''),
+        'HOST': os.environ.get('QUIZ_DB_HOST', ''),
+        'PORT': os.environ.get('QUIZ_DB_PORT', ''),
+        # Connections are kept open between requests and checked before being reused.
+        'CONN_MAX_AGE': int(os.environ.get('QUIZ_DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+    },
+}
+
 DATABASES = {
+    'default': DATABASE_PROFILES[os.environ.get('QUIZ_DB_PROFILE', 'sqlite')],
+}
+
+# PRAGMAs run on every new SQLite connection (Quiz.db). In WAL mode readers don't block the writer, and
+# concurrent writers wait up to busy_timeout (ms) for the lock instead of failing with "database is locked".
+# An empty dictionary keeps the SQLite defaults.
+
+QUIZ_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 128 * 1024 * 1024,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# QUIZ_CACHE_BACKEND selects a backend working without any external service: 'file' (default, shared by the
+# processes of the host, stored in QUIZ_CACHE_LOCATION) or 'locmem' (per process: a change only invalidates the
+# cache of the process making it, use it with a single process).
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'quizapp',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('QUIZ_CACHE_LOCATION', os.path.join(BASE_DIR, 'django_cache')),
+    },
+}
+
+QUIZ_CACHE_BACKEND = os.environ.get('QUIZ_CACHE_BACKEND', 'file')
+
+CACHES = {
+    'default': CACHE_BACKENDS[QUIZ_CACHE_BACKEND],
+}
+
+# Tests and benchmarks run against a cache of their own, in memory, so that they neither read nor wipe the cache of
+# the server (see Quiz.test_runner).
+QUIZ_TEST_CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': str(BASE_DIR / 'db.sqlite3'),
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'quizapp-tests',
+    },
+}
+
+TEST_RUNNER = 'Quiz.test_runner.QuizTestRunner'
+
+# Lifetime of the cached quiz catalogs (seconds), they are also invalidated on every change. Kept short with the
+# locmem backend, where the other processes only see a change once their copy expires.
+QUIZ_CATALOG_TIMEOUT = 60 * 60 * 24 if QUIZ_CACHE_BACKEND != 'locmem' else 60
+
+# Lifetime of the cached teacher pages (seconds), they are also versioned by the quizzes they show.
+QUIZ_RESPONSE_CACHE_TIMEOUT = 60 * 10
+
+# Lifetime of the cached rows of the quiz lists (seconds), they are also versioned by their quizzes.
+QUIZ_FRAGMENT_CACHE_TIMEOUT = 60 * 10
+
+# QUIZ_SESSION_ENGINE selects where sessions are stored: 'db' (default), 'cached_db' (read from the cache, written
+# through to the database) or 'signed_cookies' (no server-side storage; the quiz attempts in progress are then sent
+# with every request, which limits the size of the quizzes to what fits in a cookie).
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
 }
 
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get('QUIZ_SESSION_ENGINE', 'db')]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -131,6 +229,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'Quiz.User'
 
+# Loads the student profile with the user of the request. ModelBackend is kept for the sessions opened with it,
+# before QuizBackend: they would otherwise be logged out. Logins go through QuizBackend.
+AUTHENTICATION_BACKENDS = ['Quiz.backends.QuizBackend', 'django.contrib.auth.backends.ModelBackend']
+
 LOGIN_URL = 'login'
 
 LOGOUT_URL = 'logout'
@@ -148,4 +250,71 @@ MESSAGE_TAGS = {
 }
 
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
-CRISPY_TEMPLATE_PACK = 'bootstrap5'
\ No newline at end of file
+CRISPY_TEMPLATE_PACK = 'bootstrap5'
+
+
+# Scoring scheme used when a student completes a quiz.
+# Available schemes: Quiz.scoring.AllOrNothingScheme, Quiz.scoring.PartialScheme, Quiz.scoring.NegativeMarkingScheme
+
+QUIZ_SCORING_SCHEME = 'Quiz.scoring.AllOrNothingScheme'
+
+
+# Serve the student quiz list, taken quizzes and quiz-taking pages with the asynchronous views of Quiz.async_views,
+# for ASGI deployments (QuizApp.asgi).
+
+QUIZ_ASYNC_VIEWS = os.environ.get('QUIZ_ASYNC_VIEWS') == '1'
+
+
+# Write-behind buffering of the answers submitted in take_quiz (Quiz.answer_buffer): answers are kept in the process
+# and written by a background thread every FLUSH_INTERVAL seconds, or once BATCH_SIZE answers are waiting, with one
+# transaction of bulk inserts. The requests of a student must all be served by the same process, and the answers
+# still buffered when the process is killed are lost.
+
+QUIZ_ANSWER_BUFFER = {
+    'ENABLED': os.environ.get('QUIZ_ANSWER_BUFFER') == '1',
+    'FLUSH_INTERVAL': 0.2,
+    'BATCH_SIZE': 500,
+}
+
+
+# Background jobs (Quiz.jobs), run by `python manage.py run_worker`. Deleting a quiz or regrading it after its answer
+# key changed is queued as a job when the quiz has more than INLINE_ATTEMPTS attempts; results can also be exported
+# by a job, to a file of OUTPUT_DIR. Workers poll the queue every POLL_INTERVAL seconds and process CHUNK_SIZE rows
+# per statement. A running job without progress for STALE_AFTER seconds is assumed lost with its worker (e.g. killed)
+# and queued again.
+
+QUIZ_JOBS = {
+    'INLINE_ATTEMPTS': 1000,
+    'POLL_INTERVAL': 1.0,
+    'CHUNK_SIZE': 2000,
+    'STALE_AFTER': 60 * 10,
+    'OUTPUT_DIR': os.path.join(BASE_DIR, 'job_output'),
+}
+
+
+# Per-request SQL instrumentation (Quiz.middleware.QueryInstrumentationMiddleware).
+# Requests are logged on the Quiz.queries logger: at INFO level, or at WARNING level when a query takes at least
+# SLOW_QUERY_MS or the same statement runs N_PLUS_ONE_THRESHOLD times or more.
+
+QUIZ_QUERY_INSTRUMENTATION = {
+    'SLOWEST_QUERIES': 3,
+    'SLOW_QUERY_MS': 100,
+    'N_PLUS_ONE_THRESHOLD': 10,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'Quiz.queries': {
+            'handlers': ['console'],
+            'level': os.environ.get('QUIZ_QUERY_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}